@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from "react";
 import axios from "axios";
 import PetCard from "../Components/Pets/PetCard";
+import { fetchAllPages } from "../services/pagination";
 import "./SearchPets.css";
 
 const API_URL = process.env.REACT_APP_API_URL || "http://localhost:8000/api";
@@ -28,10 +29,10 @@ const SearchPets = () => {
       if (filters.type) params.append("type", filters.type);
       if (filters.status) params.append("status", filters.status);
 
-      const response = await axios.get(
+      let petsData = await fetchAllPages(
+        axios,
         `${API_URL}/pets/all/?${params.toString()}`
       );
-      let petsData = response.data;
 
       if (filters.search) {
         const keyword = filters.search.toLowerCase();
@@ -1,10 +1,8 @@
 import apiClient from '../api/apiClients';
+import { fetchAllPages, pageResults } from './pagination';
 
 const petService = {
-    getAllPets: async () => {
-        const response = await apiClient.get('/pets/');
-        return response.data;
-    },
+    getAllPets: async () => fetchAllPages(apiClient, '/pets/'),
 
     getPetById: async (petId) => {
         const response = await apiClient.get(`/pets/${petId}/`);
@@ -28,7 +26,7 @@ const petService = {
 
     searchPets: async (query) => {
         const response = await apiClient.get(`/pets/search/?q=${query}`);
-        return response.data;
+        return pageResults(response.data);
     }
 };
 
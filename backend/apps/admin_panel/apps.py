@@ -2,4 +2,8 @@ from django.apps import AppConfig
 
 class AdminPanelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.admin_panel'
\ No newline at end of file
+    name = 'apps.admin_panel'
+
+    def ready(self):
+        from . import signals
+        signals.connect()
@@ -0,0 +1,82 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from apps.chat.models import Message
+from apps.chat.views import ChatHistoryView
+from apps.notifications.models import Notification
+from apps.notifications.views import NotificationListView
+from apps.pets.models import Pet
+from apps.pets.views import PetDetailView, PetListView
+
+User = get_user_model()
+
+# Keep the response cache out of the measurement
+NO_RESPONSE_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'responses': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare CPU time per request of the hot read endpoints served through '
+        'djongo (MONGO_NATIVE_READS off) and through native PyMongo reads, and '
+        'check that both return the same bytes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--page-size', type=int, default=50)
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        page = {'page_size': options['page_size']}
+        cases = []
+
+        pet = Pet.objects.order_by('-created_at').values_list('_id', flat=True).first()
+        if pet is None:
+            raise CommandError('No pets to read; load some data first.')
+        cases.append(('pet list', PetListView, factory.get('/api/pets/all/', page), {}, None))
+        cases.append(('pet detail', PetDetailView, factory.get(f'/api/pets/{pet}/'), {'pk': pet}, None))
+
+        recipient = Notification.objects.order_by('-created_at').values_list('recipient_id', flat=True).first()
+        if recipient is not None:
+            request = factory.get('/api/notifications/', page)
+            cases.append(('notifications', NotificationListView, request, {}, User.objects.get(pk=recipient)))
+
+        message = Message.objects.order_by('-timestamp').values_list('sender_id', 'receiver_id').first()
+        if message is not None:
+            sender, receiver = message
+            request = factory.get(f'/api/chat/history/{receiver}/', page)
+            cases.append(('chat history', ChatHistoryView, request, {'user_id': str(receiver)},
+                          User.objects.get(pk=sender)))
+
+        self.stdout.write(f"{'endpoint':<16}{'djongo ms':>12}{'native ms':>12}{'saved':>9}  same output")
+        with override_settings(CACHES=NO_RESPONSE_CACHE):
+            for label, view_class, request, kwargs, user in cases:
+                view = view_class.as_view()
+                if user is not None:
+                    force_authenticate(request, user=user)
+                results = {}
+                for native in (False, True):
+                    with override_settings(MONGO_NATIVE_READS=native):
+                        results[native] = self.measure(view, request, kwargs, options['iterations'])
+                (orm_cpu, orm_body), (native_cpu, native_body) = results[False], results[True]
+                self.stdout.write(
+                    f'{label:<16}{orm_cpu:12.2f}{native_cpu:12.2f}'
+                    f'{(1 - native_cpu / orm_cpu) * 100:8.0f}%  {orm_body == native_body}'
+                )
+
+    @staticmethod
+    def measure(view, request, kwargs, iterations):
+        """Mean CPU milliseconds per request, and the last response body."""
+        view(request, **kwargs).render()  # warm up
+        started = time.process_time()
+        for _ in range(iterations):
+            response = view(request, **kwargs)
+            response.render()
+        return (time.process_time() - started) / iterations * 1000, response.content
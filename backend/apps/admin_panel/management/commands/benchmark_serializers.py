@@ -0,0 +1,126 @@
+import time
+from datetime import timedelta
+
+from bson import ObjectId
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from apps.notifications.models import Notification
+from apps.notifications.serializers import NotificationSerializer
+from apps.pets.models import AdoptionRequest, Pet
+from apps.pets.serializers import AdoptionRequestSerializer, PetSearchSerializer, PetSerializer
+from petrescue_backend.serializer_plans import plan_for
+
+User = get_user_model()
+
+
+class ObjectIdEncoder(JSONEncoder):
+    # Notification.recipient renders the raw user ObjectId
+    def default(self, obj):
+        if isinstance(obj, ObjectId):
+            return str(obj)
+        return super().default(obj)
+
+
+class Renderer(JSONRenderer):
+    encoder_class = ObjectIdEncoder
+
+
+def as_row(obj, plan):
+    """The ``.values()`` row ``plan.rows()`` would load for ``obj``."""
+    row = {column: getattr(obj, column) for column in plan.columns}
+    for key, _, related_plan in plan.relations:
+        related = getattr(obj, key)
+        row[key] = as_row(related, related_plan) if related is not None else None
+    return row
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare CPU time of the DRF serializers and their compiled plans on '
+        'in-memory rows (model instances and .values() dicts), and check that '
+        'all three render the same bytes. Needs no database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        datasets = self.build(options['rows'])
+        renderer = Renderer()
+
+        self.stdout.write(
+            f"{'serializer':<28}{'DRF ms':>10}{'plan ms':>10}{'rows ms':>10}{'speedup':>9}  same output"
+        )
+        for serializer_class, objects in datasets:
+            plan = plan_for(serializer_class)
+            rows = [as_row(obj, plan) for obj in objects]
+            runs = [
+                lambda: serializers.ListSerializer(objects, child=serializer_class()).data,
+                lambda: serializer_class(objects, many=True).data,
+                lambda: serializer_class(rows, many=True).data,
+            ]
+            timings, bodies = zip(*(self.measure(run, options['repeat'], renderer) for run in runs))
+            drf, planned, from_rows = timings
+            self.stdout.write(
+                f'{serializer_class.__name__:<28}{drf:10.1f}{planned:10.1f}{from_rows:10.1f}'
+                f'{drf / from_rows:8.1f}x  {len(set(bodies)) == 1}'
+            )
+
+    @staticmethod
+    def measure(run, repeat, renderer):
+        """Best CPU milliseconds of ``repeat`` runs, and the rendered output."""
+        best = None
+        for _ in range(repeat):
+            started = time.process_time()
+            data = run()
+            elapsed = (time.process_time() - started) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return best, renderer.render(data)
+
+    @staticmethod
+    def build(count):
+        """Unsaved, fully linked model instances; nothing touches the database."""
+        now = timezone.now().replace(microsecond=123000)
+        users = [
+            User(_id=ObjectId(), email=f'user{i}@example.com', name=f'User {i}', user_type='adopter',
+                 phone='5550100', address='12 Main St', created_at=now, updated_at=now)
+            for i in range(max(count // 50, 1))
+        ]
+        pets = [
+            Pet(
+                _id=str(ObjectId()), name=f'Pet {i}', pet_type=('dog', 'cat', 'other')[i % 3],
+                breed='Mixed', color='Brown', gender='male', size='medium', age=i % 15,
+                description='Friendly and house trained. ' * 4, status='available', location='Pune',
+                images=[f'/media/pets/{i}.jpg'], primary_thumbnail=f'/media/thumbs/{i}.webp' if i % 2 else '',
+                created_by=users[i % len(users)], created_at=now - timedelta(minutes=i), updated_at=now,
+            )
+            for i in range(count)
+        ]
+        adoptions = [
+            AdoptionRequest(
+                _id=str(ObjectId()), pet=pets[i], requester=users[(i + 1) % len(users)],
+                message='We have a garden.', status='pending', created_at=now - timedelta(seconds=i),
+            )
+            for i in range(count)
+        ]
+        notifications = [
+            Notification(
+                _id=str(ObjectId()), recipient=users[i % len(users)], recipient_role='user',
+                title='Adoption request', message=f'Someone asked to adopt Pet {i}.', type='adoption',
+                related_entity_id=pets[i]._id, is_read=bool(i % 2), count=1,
+                created_at=now - timedelta(seconds=i),
+            )
+            for i in range(count)
+        ]
+        return [
+            (PetSerializer, pets),
+            (PetSearchSerializer, pets),
+            (AdoptionRequestSerializer, adoptions),
+            (NotificationSerializer, notifications),
+        ]
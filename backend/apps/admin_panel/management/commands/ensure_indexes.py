@@ -0,0 +1,128 @@
+from bson import ObjectId
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from pymongo.errors import DuplicateKeyError
+
+from petrescue_backend.mongo import get_collection, index_specs
+
+_USER = ObjectId()
+_OTHER = ObjectId()
+
+# Representative shapes of the hot read paths: (label, model, filter, sort)
+HOT_QUERIES = (
+    ('Pet list', 'pets.Pet', {}, [('created_at', -1), ('_id', -1)]),
+    ('Pets by owner', 'pets.Pet', {'created_by_id': _USER}, [('created_at', -1)]),
+    ('Pet search filters', 'pets.Pet', {'status': 'available', 'pet_type': 'dog'}, [('created_at', -1)]),
+    ('Pet reports by status', 'pets.PetReport', {'status': 'pending'}, [('created_at', -1)]),
+    ('Pet photos', 'pets.PetPhoto', {'pet_id': ''}, None),
+    (
+        'Pending adoption request check',
+        'pets.AdoptionRequest',
+        {'pet_id': '', 'requester_id': _USER, 'status': 'pending'},
+        None,
+    ),
+    ('Adoption requests by user', 'pets.AdoptionRequest', {'requester_id': _USER}, [('created_at', -1)]),
+    ('Reviews for pet', 'pets.Review', {'pet_id': ''}, [('created_at', -1)]),
+    (
+        'Notifications for user',
+        'notifications.Notification',
+        {'recipient_id': _USER},
+        [('created_at', -1), ('_id', -1)],
+    ),
+    ('Unread notifications', 'notifications.Notification', {'recipient_id': _USER, 'is_read': False}, None),
+    (
+        'Chat history',
+        'chat.Message',
+        {'$or': [
+            {'sender_id': _USER, 'receiver_id': _OTHER},
+            {'sender_id': _OTHER, 'receiver_id': _USER},
+        ]},
+        [('timestamp', 1)],
+    ),
+)
+
+
+def _normalize(keys):
+    # Directions come back as floats from index_information(); text stays 'text'
+    return tuple(
+        (field, int(direction) if isinstance(direction, (int, float)) else direction)
+        for field, direction in keys
+    )
+
+
+def _plan_stages(plan):
+    """Yield every stage name in an explain() plan tree."""
+    if not isinstance(plan, dict):
+        return
+    if 'stage' in plan:
+        yield plan['stage']
+    for key in ('inputStage', 'queryPlan'):
+        if key in plan:
+            yield from _plan_stages(plan[key])
+    for child in plan.get('inputStages', []):
+        yield from _plan_stages(child)
+
+
+class Command(BaseCommand):
+    help = (
+        'Create the MongoDB indexes declared in model Meta.indexes (idempotent) '
+        'and report hot queries whose plans still scan the collection.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report missing indexes.')
+        parser.add_argument('--skip-explain', action='store_true', help='Do not explain() hot queries.')
+
+    def handle(self, *args, **options):
+        created = 0
+        for model in apps.get_models():
+            specs = index_specs(model)
+            if not specs:
+                continue
+            collection = get_collection(model)
+            existing = collection.index_information()
+            existing_keys = {_normalize(info['key']) for info in existing.values()}
+            for name, keys, index_options in specs:
+                # Same key pattern under another name would conflict on create
+                if name in existing or _normalize(keys) in existing_keys:
+                    continue
+                if options['dry_run']:
+                    self.stdout.write(f'missing  {collection.name}.{name} {keys}')
+                    continue
+                try:
+                    collection.create_index(keys, name=name, background=True, **index_options)
+                except DuplicateKeyError:
+                    self.stdout.write(self.style.ERROR(
+                        f'failed   {collection.name}.{name} {keys}: duplicate values '
+                        f'(for users, run dedupe_users first)'
+                    ))
+                    continue
+                created += 1
+                self.stdout.write(self.style.SUCCESS(f'created  {collection.name}.{name} {keys}'))
+
+        if not options['dry_run']:
+            self.stdout.write(f'{created} index(es) created.')
+
+        if not options['skip_explain']:
+            self.report_unindexed()
+
+    def report_unindexed(self):
+        unindexed = 0
+        for label, model_label, query, sort in HOT_QUERIES:
+            cursor = get_collection(apps.get_model(model_label)).find(query)
+            if sort:
+                cursor = cursor.sort(sort)
+            plan = cursor.limit(50).explain().get('queryPlanner', {}).get('winningPlan', {})
+            stages = set(_plan_stages(plan))
+            problems = []
+            if 'COLLSCAN' in stages:
+                problems.append('collection scan')
+            if sort and 'SORT' in stages:
+                problems.append('in-memory sort')
+            if problems:
+                unindexed += 1
+                self.stdout.write(self.style.WARNING(f'UNINDEXED  {label}: {", ".join(problems)}'))
+            else:
+                self.stdout.write(f'indexed    {label}')
+        if unindexed:
+            self.stdout.write(self.style.WARNING(f'{unindexed} hot query(ies) not served by an index.'))
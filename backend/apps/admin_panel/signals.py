@@ -0,0 +1,34 @@
+from django.db.models.signals import post_init, post_save, post_delete
+
+from . import stats
+
+_COUNTED_ATTR = '_admin_stats_counted'
+
+
+def _remember_counted(sender, instance, **kwargs):
+    setattr(instance, _COUNTED_ATTR, stats.instance_stats(instance))
+
+
+def _apply_save(sender, instance, created, **kwargs):
+    current = stats.instance_stats(instance)
+    previous = {} if created else getattr(instance, _COUNTED_ATTR, None)
+    if current is None or previous is None:
+        # Partially loaded instance; the snapshot timeout will correct it
+        return
+    stats.adjust({key: current[key] - previous.get(key, 0) for key in current})
+    setattr(instance, _COUNTED_ATTR, current)
+
+
+def _apply_delete(sender, instance, **kwargs):
+    counted = getattr(instance, _COUNTED_ATTR, None)
+    if counted is None:
+        return
+    stats.adjust({key: -value for key, value in counted.items()})
+
+
+def connect():
+    for model in stats.MODEL_STATS:
+        uid = f'admin_stats_{model._meta.label_lower}'
+        post_init.connect(_remember_counted, sender=model, dispatch_uid=uid + '_init')
+        post_save.connect(_apply_save, sender=model, dispatch_uid=uid + '_save')
+        post_delete.connect(_apply_delete, sender=model, dispatch_uid=uid + '_delete')
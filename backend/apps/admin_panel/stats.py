@@ -0,0 +1,138 @@
+"""
+Admin dashboard statistics.
+
+Counts are computed with one ``$group`` aggregation per collection and kept
+in the cache as a snapshot. Model signals (see ``signals.py``) apply +/-1
+deltas to the cached counters, so serving the dashboard is a single cache
+read. A missing counter, e.g. after eviction or expiry, triggers a full
+rebuild on the next read. The timeout bounds drift from writes the signals
+never see, such as raw Mongo writes or other processes on a local cache.
+"""
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+
+from apps.users.models import User
+from apps.pets.models import Pet, AdoptionRequest, Review, PetReport
+from apps.notifications.models import Notification
+from petrescue_backend.mongo import get_collection
+
+CACHE_PREFIX = 'admin_stats:'
+SNAPSHOT_TIMEOUT = getattr(settings, 'ADMIN_STATS_SNAPSHOT_TIMEOUT', 300)
+
+# key, field, value, negate -- counts documents where ``field == value``
+# (or ``!=`` when negated); a stat without a field counts every document.
+Stat = namedtuple('Stat', ['key', 'field', 'value', 'negate'], defaults=[None, None, False])
+
+MODEL_STATS = {
+    User: (
+        Stat('total_users'),
+        # is_disabled is not stored on older documents; missing means active
+        Stat('active_users', 'is_disabled', True, negate=True),
+        Stat('inactive_users', 'is_disabled', True),
+    ),
+    Pet: (
+        Stat('total_pets'),
+        Stat('approved_pets', 'is_approved', True),
+        Stat('pending_pet_approvals', 'is_approved', False),
+    ),
+    AdoptionRequest: (
+        Stat('pending_adoption_requests', 'status', 'pending'),
+        Stat('approved_adoptions', 'status', 'approved'),
+        Stat('total_adoption_requests'),
+    ),
+    Review: (
+        Stat('total_reviews'),
+    ),
+    Notification: (
+        Stat('total_notifications'),
+    ),
+    PetReport: (
+        Stat('total_reports'),
+        Stat('pending_reports', 'status', 'pending'),
+        Stat('approved_reports', 'status', 'approved'),
+        Stat('rejected_reports', 'status', 'rejected'),
+    ),
+}
+
+STAT_KEYS = [stat.key for stats in MODEL_STATS.values() for stat in stats]
+
+
+def _column(model, field):
+    try:
+        return model._meta.get_field(field).column
+    except FieldDoesNotExist:
+        return field
+
+
+def _group_stage(model, stats):
+    group = {'_id': None}
+    for stat in stats:
+        if stat.field is None:
+            group[stat.key] = {'$sum': 1}
+            continue
+        op = '$ne' if stat.negate else '$eq'
+        condition = {op: ['$' + _column(model, stat.field), stat.value]}
+        group[stat.key] = {'$sum': {'$cond': [condition, 1, 0]}}
+    return {'$group': group}
+
+
+def compute_stats():
+    """Run one aggregation per collection and return every dashboard count."""
+    result = {}
+    for model, stats in MODEL_STATS.items():
+        rows = list(get_collection(model).aggregate([_group_stage(model, stats)]))
+        row = rows[0] if rows else {}
+        for stat in stats:
+            result[stat.key] = row.get(stat.key, 0)
+    return result
+
+
+def get_stats():
+    """Return the cached snapshot, rebuilding it if any counter is missing."""
+    cached = cache.get_many([CACHE_PREFIX + key for key in STAT_KEYS])
+    if len(cached) == len(STAT_KEYS):
+        return {key: cached[CACHE_PREFIX + key] for key in STAT_KEYS}
+
+    stats = compute_stats()
+    cache.set_many({CACHE_PREFIX + key: value for key, value in stats.items()}, SNAPSHOT_TIMEOUT)
+    return stats
+
+
+def instance_stats(instance):
+    """
+    Return the counters a single model instance contributes to, or ``None``
+    when a tracked field is deferred and reading it would hit the database.
+    """
+    stats = MODEL_STATS.get(type(instance), ())
+    deferred = instance.get_deferred_fields()
+    if any(stat.field in deferred for stat in stats):
+        return None
+    counted = {}
+    for stat in stats:
+        if stat.field is None:
+            counted[stat.key] = 1
+            continue
+        matches = getattr(instance, stat.field, None) == stat.value
+        counted[stat.key] = int(matches != stat.negate)
+    return counted
+
+
+def adjust(deltas):
+    """
+    Apply counter deltas to the cached snapshot. Counters that are not
+    cached are left alone; the next read rebuilds them from Mongo.
+    """
+    for key, delta in deltas.items():
+        if not delta:
+            continue
+        try:
+            cache.incr(CACHE_PREFIX + key, delta)
+        except ValueError:
+            pass
+
+
+def invalidate():
+    cache.delete_many([CACHE_PREFIX + key for key in STAT_KEYS])
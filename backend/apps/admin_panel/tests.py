@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from apps.pets.models import Pet, PetReport
+from petrescue_backend.mongo_backend import base as mongo_backend
+from petrescue_backend.mongo_pool import PoolMetrics, available_compressors
+from . import stats
+from .signals import _apply_save
+
+
+class DashboardStatsTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_group_stage_counts_every_stat_in_one_pass(self):
+        stage = stats._group_stage(PetReport, stats.MODEL_STATS[PetReport])
+        group = stage['$group']
+        self.assertEqual(group['total_reports'], {'$sum': 1})
+        self.assertEqual(
+            group['pending_reports'],
+            {'$sum': {'$cond': [{'$eq': ['$status', 'pending']}, 1, 0]}},
+        )
+
+    def test_instance_stats(self):
+        pet = Pet(name='Rex', is_approved=False)
+        self.assertEqual(
+            stats.instance_stats(pet),
+            {'total_pets': 1, 'approved_pets': 0, 'pending_pet_approvals': 1},
+        )
+
+    def test_adjust_updates_cached_snapshot_only(self):
+        cache.set(stats.CACHE_PREFIX + 'total_pets', 5)
+        stats.adjust({'total_pets': 2, 'approved_pets': 1})
+        self.assertEqual(cache.get(stats.CACHE_PREFIX + 'total_pets'), 7)
+        self.assertIsNone(cache.get(stats.CACHE_PREFIX + 'approved_pets'))
+
+    def test_saving_an_approval_moves_the_counters(self):
+        cache.set_many({
+            stats.CACHE_PREFIX + 'approved_pets': 1,
+            stats.CACHE_PREFIX + 'pending_pet_approvals': 1,
+        })
+        pet = Pet(name='Rex', is_approved=False)
+        pet.is_approved = True
+        _apply_save(Pet, pet, created=False)
+        self.assertEqual(cache.get(stats.CACHE_PREFIX + 'approved_pets'), 2)
+        self.assertEqual(cache.get(stats.CACHE_PREFIX + 'pending_pet_approvals'), 0)
+
+
+class PoolMetricsTests(SimpleTestCase):
+    address = ('db', 27017)
+
+    def event(self):
+        return SimpleNamespace(address=self.address)
+
+    def test_counts_open_and_checked_out_connections(self):
+        metrics = PoolMetrics()
+        metrics.connection_created(self.event())
+        metrics.connection_created(self.event())
+        metrics.connection_check_out_started(self.event())
+        metrics.connection_checked_out(self.event())
+        metrics.connection_check_out_started(self.event())
+        metrics.connection_checked_out(self.event())
+        metrics.connection_checked_in(self.event())
+        metrics.connection_closed(self.event())
+
+        pool = metrics.snapshot()['db:27017']
+        self.assertEqual((pool['open'], pool['checked_out'], pool['checkouts']), (1, 1, 2))
+        self.assertEqual((pool['created'], pool['closed']), (2, 1))
+        self.assertGreaterEqual(pool['wait_ms_max'], pool['wait_ms_avg'])
+
+    def test_failed_checkout_is_counted_and_not_timed(self):
+        metrics = PoolMetrics()
+        metrics.connection_check_out_started(self.event())
+        metrics.connection_check_out_failed(self.event())
+        metrics.connection_checked_out(self.event())
+
+        pool = metrics.snapshot()['db:27017']
+        self.assertEqual(pool['checkout_failures'], 1)
+        self.assertEqual(pool['wait_ms_total'], 0.0)
+
+    def test_available_compressors_skips_missing_modules(self):
+        with mock.patch('importlib.util.find_spec', side_effect=lambda name: name == 'zlib' or None):
+            self.assertEqual(available_compressors('zstd, snappy,zlib,bogus'), ['zlib'])
+
+    def test_threads_share_one_client_per_set_of_options(self):
+        with mock.patch.dict(mongo_backend._clients, clear=True), \
+                mock.patch.object(mongo_backend, 'MongoClient', side_effect=lambda **options: object()):
+            first = mongo_backend.shared_client({'host': 'db', 'maxPoolSize': 50})
+            self.assertIs(mongo_backend.shared_client({'maxPoolSize': 50, 'host': 'db'}), first)
+            self.assertIsNot(mongo_backend.shared_client({'host': 'db', 'maxPoolSize': 10}), first)
@@ -8,6 +8,8 @@ from .views import (
     AdminReviewListView,
     AdminUserStatusUpdateView,
     AdminPetReportStatusUpdateView,
+    AdminThrottleMetricsView,
+    AdminDatabasePoolView,
 )
 from apps.pets.views import AdminPetReportListView
 
@@ -23,4 +25,6 @@ urlpatterns = [
     path('reviews/', AdminReviewListView.as_view(), name='admin-reviews'),
     path('users/<str:pk>/status/', AdminUserStatusUpdateView.as_view(), name='admin-user-status'),
     path('reports/<str:pk>/status/', AdminPetReportStatusUpdateView.as_view(), name='admin-report-status'),
+    path('throttles/', AdminThrottleMetricsView.as_view(), name='admin-throttles'),
+    path('db-pool/', AdminDatabasePoolView.as_view(), name='admin-db-pool'),
 ]
\ No newline at end of file
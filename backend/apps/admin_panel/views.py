@@ -1,55 +1,84 @@
+from django.conf import settings
+from pymongo.errors import PyMongoError
 from rest_framework import generics
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from apps.users.models import User
 from apps.pets.models import Pet, AdoptionRequest, Review, PetReport
-from apps.notifications.models import Notification
 from apps.users.serializers import UserSerializer
+from apps.users.throttling import rejection_counts
+from petrescue_backend.mongo_pool import pool_metrics, warm_pool
+from petrescue_backend.pagination import KeysetCursorPagination
+from petrescue_backend.serializer_plans import PlannedListMixin
 from apps.pets.serializers import (
     PetSerializer,
     AdoptionRequestSerializer,
     ReviewSerializer,
     PetReportSerializer,
+    ADOPTION_REQUEST_PREFETCH,
 )
 from apps.notifications.utils import create_notification
+from . import stats as dashboard_stats
+
+# Client options reported by the pool endpoint
+POOL_SETTINGS = (
+    'maxPoolSize', 'minPoolSize', 'maxIdleTimeMS', 'waitQueueTimeoutMS',
+    'serverSelectionTimeoutMS', 'connectTimeoutMS', 'socketTimeoutMS', 'compressors',
+)
 
 
 class AdminDashboardView(generics.GenericAPIView):
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        stats = {
-            'total_users': User.objects.count(),
-            'active_users': User.objects.filter(is_active=True).count(),
-            'inactive_users': User.objects.filter(is_active=False).count(),
-            'total_pets': Pet.objects.count(),
-            'approved_pets': Pet.objects.filter(is_approved=True).count(),
-            'pending_pet_approvals': Pet.objects.filter(is_approved=False).count(),
-            'pending_adoption_requests': AdoptionRequest.objects.filter(status='pending').count(),
-            'approved_adoptions': AdoptionRequest.objects.filter(status='approved').count(),
-            'total_adoption_requests': AdoptionRequest.objects.count(),
-            'total_reviews': Review.objects.count(),
-            'total_notifications': Notification.objects.count(),
-            'total_reports': PetReport.objects.count(),
-            'pending_reports': PetReport.objects.filter(status='pending').count(),
-            'approved_reports': PetReport.objects.filter(status='approved').count(),
-            'rejected_reports': PetReport.objects.filter(status='rejected').count(),
-        }
+        # Served from a cached snapshot kept current by model signals
+        stats = dashboard_stats.get_stats()
         return Response(stats)
 
 
+class AdminThrottleMetricsView(generics.GenericAPIView):
+    """
+    GET /api/admin/throttles
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({'rejected': rejection_counts()})
+
+
+class AdminDatabasePoolView(generics.GenericAPIView):
+    """
+    GET /api/admin/db-pool
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        client = settings.DATABASES['default']['CLIENT']
+        try:
+            ping_ms = round(warm_pool(connections=0), 3)
+        except PyMongoError as exc:
+            return Response({'healthy': False, 'error': str(exc), 'pools': pool_metrics.snapshot()}, status=503)
+        return Response({
+            'healthy': True,
+            'ping_ms': ping_ms,
+            'config': {name: client.get(name) for name in POOL_SETTINGS},
+            'pools': pool_metrics.snapshot(),
+        })
+
+
 class ManageUsersView(generics.ListAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAdminUser]
 
 
-class AdminPetListView(generics.ListAPIView):
+class AdminPetListView(PlannedListMixin, generics.ListAPIView):
     """
     GET /api/admin/pets
     """
-    queryset = Pet.objects.all().order_by('-created_at')
+    queryset = Pet.objects.all().prefetch_related('created_by').order_by('-created_at')
     serializer_class = PetSerializer
+    pagination_class = KeysetCursorPagination
     permission_classes = [IsAdminUser]
 
 
@@ -76,17 +105,23 @@ class AdminPetStatusUpdateView(generics.UpdateAPIView):
 
         # Notify owner if approval state changed
         try:
-            from apps.notifications.utils import create_notification
+            from apps.notifications.utils import enqueue_notification
 
             if old_is_approved is False and pet.is_approved:
-                create_notification(
+                enqueue_notification(
                     pet.created_by,
+                    "Pet approved",
                     f"Your pet '{pet.name}' has been approved and is now visible to adopters.",
+                    notif_type='pet',
+                    related_id=pet._id,
                 )
             elif old_is_approved and pet.is_approved is False:
-                create_notification(
+                enqueue_notification(
                     pet.created_by,
+                    "Pet unapproved",
                     f"Your pet '{pet.name}' has been unapproved by an admin.",
+                    notif_type='pet',
+                    related_id=pet._id,
                 )
         except Exception:
             # Avoid breaking admin flow if notifications fail
@@ -96,12 +131,15 @@ class AdminPetStatusUpdateView(generics.UpdateAPIView):
         return Response(serializer.data)
 
 
-class AdminAdoptionRequestListView(generics.ListAPIView):
+class AdminAdoptionRequestListView(PlannedListMixin, generics.ListAPIView):
     """
     GET /api/admin/adoptions
     """
-    queryset = AdoptionRequest.objects.all().order_by('-created_at')
+    queryset = AdoptionRequest.objects.all().prefetch_related(
+        *ADOPTION_REQUEST_PREFETCH
+    ).order_by('-created_at')
     serializer_class = AdoptionRequestSerializer
+    pagination_class = KeysetCursorPagination
     permission_classes = [IsAdminUser]
 
 
@@ -109,7 +147,7 @@ class AdminReviewListView(generics.ListAPIView):
     """
     GET /api/admin/reviews
     """
-    queryset = Review.objects.all().order_by('-created_at')
+    queryset = Review.objects.all().prefetch_related('user').order_by('-created_at')
     serializer_class = ReviewSerializer
     permission_classes = [IsAdminUser]
 
@@ -0,0 +1,55 @@
+"""
+WebSocket chat: ``/ws/chat/<user_id>/?token=<access token>``
+
+Both participants of a conversation subscribe to the same pub/sub channel.
+Clients send ``{"type": "message", "content": "..."}`` to chat and
+``{"type": "ack", "ids": [...]}`` once messages are displayed; acks mark
+the messages read and fan a ``read`` receipt out to the sender. Messages
+posted through ``SendMessageView`` are pushed the same way.
+"""
+from asgiref.sync import sync_to_async
+from bson import ObjectId
+from django.contrib.auth import get_user_model
+
+from petrescue_backend.pubsub import pubsub
+from petrescue_backend.websocket import CLOSE_NOT_FOUND, CLOSE_UNAUTHORIZED, authenticate, pump
+from .utils import conversation_channel, mark_read, send_message
+
+User = get_user_model()
+
+MAX_MESSAGE_LENGTH = 5000
+
+
+async def chat_socket(socket):
+    user = await authenticate(socket)
+    if user is None:
+        await socket.close(CLOSE_UNAUTHORIZED)
+        return
+    user_id = socket.kwargs['user_id']
+    other = None
+    if ObjectId.is_valid(user_id):
+        other = await sync_to_async(User.objects.filter(_id=ObjectId(user_id)).first)()
+    if other is None:
+        await socket.close(CLOSE_NOT_FOUND)
+        return
+
+    await socket.accept()
+
+    async def handle(data):
+        kind = data.get('type')
+        if kind == 'message':
+            content = str(data.get('content') or '').strip()
+            if not content or len(content) > MAX_MESSAGE_LENGTH:
+                await socket.send_json({'type': 'error', 'detail': 'Invalid message content.'})
+                return
+            # The stored message comes back to this socket through pub/sub
+            await sync_to_async(send_message)(user, other, content)
+        elif kind == 'ack':
+            ids = data.get('ids')
+            if isinstance(ids, list):
+                await sync_to_async(mark_read)(user, other.pk, ids)
+        else:
+            await socket.send_json({'type': 'error', 'detail': f'Unknown event type {kind!r}.'})
+
+    with pubsub.subscribe(conversation_channel(user.pk, other.pk)) as subscription:
+        await pump(socket, subscription, handle)
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.chat.models import Conversation, Message
+from petrescue_backend.mongo import get_collection
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the Conversation summaries from the stored messages.'
+
+    def handle(self, *args, **options):
+        summaries = {}
+        rows = Message.objects.order_by('timestamp', '_id').values_list(
+            '_id', 'sender_id', 'receiver_id', 'content', 'timestamp', 'is_read',
+        )
+        for message_id, sender_id, receiver_id, content, timestamp, is_read in rows.iterator(chunk_size=2000):
+            key = Conversation.key(sender_id, receiver_id)
+            user_a, user_b = sorted([sender_id, receiver_id], key=str)
+            summary = summaries.setdefault(key, {
+                '_id': key, 'user_a_id': user_a, 'user_b_id': user_b,
+                'unread_a': 0, 'unread_b': 0, 'created_at': timezone.now(),
+            })
+            summary.update({
+                'last_message': content[:Conversation.PREVIEW_LENGTH],
+                'last_message_id': message_id,
+                'last_sender_id': sender_id,
+                'last_timestamp': timestamp,
+            })
+            if not is_read:
+                summary['unread_a' if str(receiver_id) == str(user_a) else 'unread_b'] += 1
+
+        collection = get_collection(Conversation)
+        collection.delete_many({})
+        if summaries:
+            collection.insert_many(list(summaries.values()))
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {len(summaries)} conversation(s).'))
@@ -14,6 +14,11 @@ class Message(models.Model):
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            # Serves both branches of the history $or (A->B and B->A)
+            models.Index(fields=['sender', 'receiver', 'timestamp'], name='msg_conversation_idx'),
+            models.Index(fields=['receiver', 'is_read'], name='msg_receiver_unread_idx'),
+        ]
 
     @property
     def id(self):
@@ -26,3 +31,45 @@ class Message(models.Model):
 
     def __str__(self):
         return f"Message from {self.sender.email} to {self.receiver.email}"
+
+
+class Conversation(models.Model):
+    """
+    Denormalized summary of the messages between two users, one document
+    per pair, kept current on every send and read (see ``utils.py``).
+
+    ``user_a`` is the participant whose id sorts first; ``unread_a`` counts
+    messages ``user_a`` has not read yet, likewise for ``user_b``.
+    """
+    PREVIEW_LENGTH = 200
+
+    _id = models.CharField(max_length=64, primary_key=True, db_column='_id')
+    user_a = models.ForeignKey(User, related_name='+', on_delete=models.CASCADE)
+    user_b = models.ForeignKey(User, related_name='+', on_delete=models.CASCADE)
+    last_message = models.CharField(max_length=PREVIEW_LENGTH, blank=True, default='')
+    last_message_id = models.CharField(max_length=24, blank=True, default='')
+    last_sender = models.ForeignKey(User, related_name='+', null=True, on_delete=models.SET_NULL)
+    last_timestamp = models.DateTimeField(null=True)
+    unread_a = models.IntegerField(default=0)
+    unread_b = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Contacts list: each branch of (user_a = me OR user_b = me) by recency
+            models.Index(fields=['user_a', '-last_timestamp'], name='conv_user_a_recent_idx'),
+            models.Index(fields=['user_b', '-last_timestamp'], name='conv_user_b_recent_idx'),
+        ]
+
+    @staticmethod
+    def key(user_a, user_b):
+        return ':'.join(sorted([str(user_a), str(user_b)]))
+
+    def counterpart_id(self, user_id):
+        return self.user_b_id if str(self.user_a_id) == str(user_id) else self.user_a_id
+
+    def unread_for(self, user_id):
+        return self.unread_a if str(self.user_a_id) == str(user_id) else self.unread_b
+
+    def __str__(self):
+        return f"Conversation {self._id}"
@@ -0,0 +1,36 @@
+"""Native PyMongo reads of chat history (see apps/pets/repository.py)."""
+from petrescue_backend.mongo import RowLoader, get_collection, object_id
+from apps.users.repository import attach_users
+from .models import Message
+
+message_rows = RowLoader(Message)
+
+
+def history_filter(user_id, other_user_id):
+    """Messages either way between two users; each branch uses msg_conversation_idx."""
+    other_user_id = object_id(other_user_id)
+    return {'$or': [
+        {'sender_id': user_id, 'receiver_id': other_user_id},
+        {'sender_id': other_user_id, 'receiver_id': user_id},
+    ]}
+
+
+def _find(query, sort, limit):
+    docs = get_collection(Message).find(query, message_rows.projection).sort(sort).limit(limit)
+    return message_rows.load(docs)
+
+
+def message_position(user_id, other_user_id, message_id):
+    """``(timestamp, _id)`` of a message in the conversation, or ``None``."""
+    query = {'$and': [history_filter(user_id, other_user_id), {'_id': message_id}]}
+    doc = get_collection(Message).find_one(query, message_rows.projection)
+    if doc is None:
+        return None
+    row = message_rows(doc)
+    return row['timestamp'], row['_id']
+
+
+def history_window(user_id, other_user_id, seek, sort, limit):
+    """Up to ``limit`` messages after ``seek`` in ``sort`` order, participants attached."""
+    query = history_filter(user_id, other_user_id)
+    return attach_users(_find({'$and': [query, seek]} if seek else query, sort, limit), 'sender', 'receiver')
@@ -0,0 +1,5 @@
+from .consumers import chat_socket
+
+websocket_routes = [
+    (r'/ws/chat/(?P<user_id>[^/]+)/', chat_socket),
+]
@@ -0,0 +1,192 @@
+import asyncio
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from petrescue_backend.pubsub import MongoRelay, PubSub
+from petrescue_backend.websocket import CLOSE_NOT_FOUND, WebSocketRouter
+from .consumers import chat_socket
+from .models import Conversation, Message
+from .utils import conversation_channel, send_message
+
+User = get_user_model()
+
+
+class PubSubTests(SimpleTestCase):
+    def test_fan_out_reaches_every_subscriber_of_a_channel(self):
+        hub = PubSub()
+
+        async def scenario():
+            with hub.subscribe('chat:a:b') as first, hub.subscribe('chat:a:b') as second, \
+                    hub.subscribe('chat:a:c') as other:
+                self.assertEqual(hub.publish('chat:a:b', {'n': 1}), 2)
+                self.assertEqual(await first.get(), {'n': 1})
+                self.assertEqual(await second.get(), {'n': 1})
+                self.assertTrue(other.queue.empty())
+            self.assertEqual(hub.subscriber_count('chat:a:b'), 0)
+
+        asyncio.run(scenario())
+
+    def test_publish_from_another_thread(self):
+        hub = PubSub()
+
+        async def scenario():
+            with hub.subscribe('chat:x') as subscription:
+                await asyncio.get_running_loop().run_in_executor(None, hub.publish, 'chat:x', 'hi')
+                return await asyncio.wait_for(subscription.get(), 1)
+
+        self.assertEqual(asyncio.run(scenario()), 'hi')
+
+    def test_relayed_publish_reaches_other_processes_and_local_subscribers(self):
+        hub = PubSub()
+        hub.relay = mock.Mock()
+
+        async def scenario():
+            with hub.subscribe('chat:a:b') as subscription:
+                hub.publish('chat:a:b', {'n': 1})
+                return await asyncio.wait_for(subscription.get(), 1)
+
+        self.assertEqual(asyncio.run(scenario()), {'n': 1})
+        hub.relay.send.assert_called_once_with('chat:a:b', {'n': 1})
+        self.assertTrue(hub.may_reach('chat:nobody'))
+
+    def test_relay_resumes_after_the_last_event_in_insertion_order(self):
+        # _ids from other publishers need not increase in insertion order
+        docs = [
+            {'_id': 5, 'origin': 'web', 'channel': 'c', 'event': 'seen'},
+            {'_id': 3, 'origin': 'web', 'channel': 'c', 'event': 'late clock'},
+            {'_id': 4, 'origin': 'self', 'channel': 'c', 'event': 'own'},
+            {'_id': 9, 'origin': 'jobs', 'channel': 'c', 'event': 'new'},
+        ]
+        cursor = mock.MagicMock(alive=True)
+        cursor.__iter__.side_effect = lambda: (setattr(cursor, 'alive', False), iter(docs))[1]
+        collection = mock.Mock()
+        collection.find.return_value = cursor
+        collection.find_one.return_value = {'_id': 5}
+        hub = mock.Mock()
+
+        relay = MongoRelay(hub, size=1024)
+        relay.origin, relay._last_id = 'self', 5
+        relay._follow(collection)
+        self.assertEqual([c.args for c in hub.deliver.call_args_list], [('c', 'late clock'), ('c', 'new')])
+        self.assertEqual(relay._last_id, 9)
+
+    def test_conversation_channel_is_symmetric(self):
+        self.assertEqual(conversation_channel('b', 'a'), conversation_channel('a', 'b'))
+
+
+class WebSocketRouterTests(SimpleTestCase):
+    def test_unknown_path_is_closed(self):
+        sent = []
+
+        async def receive():
+            return {'type': 'websocket.connect'}
+
+        async def send(message):
+            sent.append(message)
+
+        router = WebSocketRouter([])
+        asyncio.run(router({'type': 'websocket', 'path': '/ws/nope/'}, receive, send))
+        self.assertEqual(sent, [{'type': 'websocket.close', 'code': CLOSE_NOT_FOUND}])
+
+    def test_chat_with_malformed_user_id_is_closed(self):
+        sent = []
+
+        async def receive():
+            return {'type': 'websocket.connect'}
+
+        async def send(message):
+            sent.append(message)
+
+        router = WebSocketRouter([(r'/ws/chat/(?P<user_id>[^/]+)/', chat_socket)])
+        with mock.patch('apps.chat.consumers.authenticate', mock.AsyncMock(return_value=User(email='a@b.c'))):
+            asyncio.run(router({'type': 'websocket', 'path': '/ws/chat/not-an-id/'}, receive, send))
+        self.assertEqual(sent, [{'type': 'websocket.close', 'code': CLOSE_NOT_FOUND}])
+
+
+class ChatHistorySyncTests(APITestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user(email='alice@example.com', password='testpassword')
+        self.bob = User.objects.create_user(email='bob@example.com', password='testpassword')
+        self.messages = [
+            Message.objects.create(
+                sender=self.alice if i % 2 else self.bob,
+                receiver=self.bob if i % 2 else self.alice,
+                content=f'message {i}',
+            )
+            for i in range(5)
+        ]
+        self.client.force_authenticate(self.alice)
+        self.url = reverse('chat-history', args=[str(self.bob.pk)])
+
+    def contents(self, response):
+        return [message['content'] for message in response.data['results']]
+
+    def test_since_returns_only_newer_messages(self):
+        response = self.client.get(self.url, {'since': self.messages[1]._id})
+        self.assertEqual(self.contents(response), ['message 2', 'message 3', 'message 4'])
+        self.assertFalse(response.data['has_more'])
+
+    def test_before_pages_backwards_in_timestamp_order(self):
+        response = self.client.get(self.url, {'before': 'latest', 'page_size': 2})
+        self.assertEqual(self.contents(response), ['message 3', 'message 4'])
+        self.assertTrue(response.data['has_more'])
+
+        response = self.client.get(self.url, {'before': self.messages[3]._id, 'page_size': 2})
+        self.assertEqual(self.contents(response), ['message 1', 'message 2'])
+        self.assertTrue(response.data['has_more'])
+
+    def test_default_page_is_the_latest_messages(self):
+        response = self.client.get(self.url, {'page_size': 2})
+        self.assertEqual(self.contents(response), ['message 3', 'message 4'])
+        self.assertTrue(response.data['has_more'])
+
+    def test_unknown_anchor_is_404(self):
+        response = self.client.get(self.url, {'since': 'ffffffffffffffffffffffff'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_malformed_user_id_is_404(self):
+        response = self.client.get(reverse('chat-history', args=['not-an-id']))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.post(reverse('chat-mark-read', args=['not-an-id']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_mark_conversation_read(self):
+        response = self.client.post(reverse('chat-mark-read', args=[str(self.bob.pk)]))
+        self.assertEqual(response.data, {'updated': 3})
+        self.assertFalse(Message.objects.filter(receiver=self.alice, is_read=False).exists())
+        self.assertEqual(Message.objects.filter(receiver=self.bob, is_read=False).count(), 2)
+
+
+class ConversationSummaryTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(email='alice@example.com', password='testpassword')
+        self.bob = User.objects.create_user(email='bob@example.com', password='testpassword')
+        self.carol = User.objects.create_user(email='carol@example.com', password='testpassword')
+
+    def test_sends_and_reads_maintain_the_summary(self):
+        send_message(self.alice, self.bob, 'hi bob')
+        send_message(self.alice, self.bob, 'are you there?')
+        conversation = Conversation.objects.get(pk=Conversation.key(self.alice.pk, self.bob.pk))
+        self.assertEqual(conversation.last_message, 'are you there?')
+        self.assertEqual(conversation.unread_for(self.bob.pk), 2)
+        self.assertEqual(conversation.unread_for(self.alice.pk), 0)
+
+        self.client.force_authenticate(self.bob)
+        self.client.post(reverse('chat-mark-read', args=[str(self.alice.pk)]))
+        conversation.refresh_from_db()
+        self.assertEqual(conversation.unread_for(self.bob.pk), 0)
+
+    def test_contacts_are_sorted_by_recency_with_unread_counts(self):
+        send_message(self.bob, self.alice, 'older')
+        send_message(self.carol, self.alice, 'newer')
+        self.client.force_authenticate(self.alice)
+        response = self.client.get(reverse('chat-contacts'))
+        self.assertEqual([c['email'] for c in response.data], ['carol@example.com', 'bob@example.com'])
+        self.assertEqual(response.data[0]['last_message'], 'newer')
+        self.assertEqual(response.data[0]['unread_count'], 1)
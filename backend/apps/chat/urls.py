@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import ChatHistoryView, SendMessageView, ChatContactsView
+from .views import ChatHistoryView, SendMessageView, ChatContactsView, MarkConversationReadView
 
 urlpatterns = [
     path('history/<str:user_id>/', ChatHistoryView.as_view(), name='chat-history'),
     path('send/', SendMessageView.as_view(), name='send-message'),
     path('contacts/', ChatContactsView.as_view(), name='chat-contacts'),
+    path('read/<str:user_id>/', MarkConversationReadView.as_view(), name='chat-mark-read'),
 ]
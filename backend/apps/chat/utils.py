@@ -0,0 +1,118 @@
+from django.utils import timezone
+
+from petrescue_backend.mongo import get_collection
+from petrescue_backend.pubsub import pubsub
+from .models import Conversation, Message
+
+
+def conversation_channel(user_a, user_b):
+    """Pub/sub channel shared by both sides of a conversation."""
+    return 'chat:' + Conversation.key(user_a, user_b)
+
+
+def _unread_field(reader_id, other_user_id):
+    return 'unread_a' if str(reader_id) < str(other_user_id) else 'unread_b'
+
+
+def record_message(message):
+    """
+    Fold a new message into its ``Conversation`` summary: bump the
+    receiver's unread count and, unless a newer message already landed,
+    replace the last-message preview.
+    """
+    collection = get_collection(Conversation)
+    key = Conversation.key(message.sender_id, message.receiver_id)
+    user_a, user_b = sorted([message.sender_id, message.receiver_id], key=str)
+    unread = _unread_field(message.receiver_id, message.sender_id)
+    other = 'unread_b' if unread == 'unread_a' else 'unread_a'
+
+    collection.update_one(
+        {'_id': key},
+        {
+            '$inc': {unread: 1},
+            '$setOnInsert': {
+                'user_a_id': user_a, 'user_b_id': user_b, other: 0,
+                'last_message': '', 'last_message_id': '', 'last_sender_id': None,
+                'last_timestamp': None, 'created_at': timezone.now(),
+            },
+        },
+        upsert=True,
+    )
+    collection.update_one(
+        {'_id': key, '$or': [
+            {'last_timestamp': None},
+            {'last_timestamp': {'$lte': message.timestamp}},
+        ]},
+        {'$set': {
+            'last_message': message.content[:Conversation.PREVIEW_LENGTH],
+            'last_message_id': message._id,
+            'last_sender_id': message.sender_id,
+            'last_timestamp': message.timestamp,
+        }},
+    )
+
+
+def _decrement_unread(reader_id, other_user_id, count):
+    """Lower the reader's unread count by ``count`` messages marked read."""
+    field = _unread_field(reader_id, other_user_id)
+    value = {'$max': [0, {'$subtract': ['$' + field, count]}]}
+    get_collection(Conversation).update_one(
+        {'_id': Conversation.key(reader_id, other_user_id)},
+        [{'$set': {field: value}}],
+    )
+
+
+def publish_message(message):
+    from .serializers import MessageSerializer
+    pubsub.publish(
+        conversation_channel(message.sender_id, message.receiver_id),
+        {'type': 'message', 'message': MessageSerializer(message).data},
+    )
+
+
+def deliver(message):
+    """Update the conversation summary and push a stored message."""
+    record_message(message)
+    publish_message(message)
+
+
+def send_message(sender, receiver, content):
+    """Store a message and push it to both participants' open sockets."""
+    message = Message.objects.create(sender=sender, receiver=receiver, content=content)
+    deliver(message)
+    return message
+
+
+def mark_read(reader, other_user_id, message_ids):
+    """
+    Mark messages ``reader`` received from ``other_user_id`` as read with a
+    single update, and push a read receipt to the conversation.
+    """
+    message_ids = [str(message_id) for message_id in message_ids][:500]
+    if not message_ids:
+        return 0
+    updated = Message.objects.filter(
+        _id__in=message_ids, sender_id=other_user_id, receiver=reader, is_read=False,
+    ).update(is_read=True)
+    if updated:
+        _decrement_unread(reader.pk, other_user_id, updated)
+        pubsub.publish(
+            conversation_channel(reader.pk, other_user_id),
+            {'type': 'read', 'reader_id': str(reader.pk), 'ids': message_ids},
+        )
+    return updated
+
+
+def mark_conversation_read(reader, other_user_id):
+    """Mark everything ``reader`` received from ``other_user_id`` as read."""
+    updated = Message.objects.filter(
+        sender_id=other_user_id, receiver=reader, is_read=False,
+    ).update(is_read=True)
+    if updated:
+        # Only what this update marked: a message arriving meanwhile stays unread
+        _decrement_unread(reader.pk, other_user_id, updated)
+        pubsub.publish(
+            conversation_channel(reader.pk, other_user_id),
+            {'type': 'read', 'reader_id': str(reader.pk), 'all': True},
+        )
+    return updated
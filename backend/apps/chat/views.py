@@ -1,15 +1,39 @@
+from bson import ObjectId
+from django.conf import settings
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
 from django.db.models import Q
 from django.contrib.auth import get_user_model
-from .models import Message
+from . import repository
+from .models import Conversation, Message
 from .serializers import MessageSerializer
+from petrescue_backend.pagination import KeysetCursorPagination
+from .utils import deliver, mark_conversation_read
 
 User = get_user_model()
 
+
+def validate_user_id(user_id):
+    """User ids are ObjectIds; anything else cannot name a chat partner."""
+    if not ObjectId.is_valid(user_id):
+        raise NotFound('Unknown user.')
+    return user_id
+
+
 class ChatHistoryView(generics.ListAPIView):
+    """
+    GET /api/chat/history/:user_id/
+    - ?since=<message id>: messages newer than that one (incremental sync)
+    - ?before=<message id|latest>: the page of messages older than that one
+    Both return ``{"results": [...], "has_more": bool}`` in timestamp order,
+    at most ``page_size`` messages. Without either, the newest page is
+    returned, as for ``before=latest``.
+    """
     serializer_class = MessageSerializer
+    pagination_class = KeysetCursorPagination
     permission_classes = [permissions.IsAuthenticated]
+    cursor_ordering = ('timestamp', '_id')
 
     def get_queryset(self):
         user = self.request.user
@@ -17,7 +41,65 @@ class ChatHistoryView(generics.ListAPIView):
         return Message.objects.filter(
             Q(sender=user, receiver_id=other_user_id) | 
             Q(sender_id=other_user_id, receiver=user)
-        ).order_by('timestamp')
+        ).prefetch_related('sender', 'receiver').order_by('timestamp')
+
+    def list(self, request, *args, **kwargs):
+        since = request.query_params.get('since')
+        before = request.query_params.get('before')
+        native = settings.MONGO_NATIVE_READS
+        other_user_id = validate_user_id(self.kwargs.get('user_id'))
+        if since is not None and before is not None:
+            raise ValidationError('Use either "since" or "before", not both.')
+        if since is None and before is None:
+            # Open on the latest messages, not the start of the conversation
+            before = 'latest'
+
+        paginator = self.paginator
+        paginator.ordering = self.cursor_ordering
+        limit = paginator.get_page_size(request)
+        reverse = since is None
+        anchor = since if since is not None else before
+
+        if native:
+            seek = None
+            if anchor != 'latest':
+                position = repository.message_position(request.user.pk, other_user_id, anchor)
+                if position is None:
+                    raise NotFound('Unknown message.')
+                seek = paginator.build_seek_document(position, reverse=reverse)
+            sort = [(field, -1 if reverse else 1) for field in self.cursor_ordering]
+            messages = repository.history_window(request.user.pk, other_user_id, seek, sort, limit + 1)
+        else:
+            queryset = self.get_queryset()
+            if anchor != 'latest':
+                position = queryset.filter(_id=anchor).values_list(*self.cursor_ordering).first()
+                if position is None:
+                    raise NotFound('Unknown message.')
+                # Same (timestamp, _id) seek the cursor pagination uses
+                queryset = queryset.filter(paginator.build_seek_filter(position, reverse=reverse))
+            order = self.cursor_ordering if not reverse else ['-' + f for f in self.cursor_ordering]
+            messages = list(queryset.order_by(*order)[:limit + 1])
+
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        if reverse:
+            messages.reverse()
+        return Response({
+            'results': self.get_serializer(messages, many=True).data,
+            'has_more': has_more,
+        })
+
+
+class MarkConversationReadView(generics.GenericAPIView):
+    """
+    POST /api/chat/read/:user_id/
+    Mark every unread message from that user as read with one update.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, user_id):
+        updated = mark_conversation_read(request.user, validate_user_id(user_id))
+        return Response({'updated': updated})
 
 class SendMessageView(generics.CreateAPIView):
     serializer_class = MessageSerializer
@@ -26,31 +108,49 @@ class SendMessageView(generics.CreateAPIView):
     def perform_create(self, serializer):
         receiver_id = self.request.data.get('receiver_id')
         receiver = User.objects.get(_id=receiver_id)
-        serializer.save(sender=self.request.user, receiver=receiver)
+        message = serializer.save(sender=self.request.user, receiver=receiver)
+        # Update the conversation summary and push to open chat sockets
+        deliver(message)
 
 class ChatContactsView(generics.ListAPIView):
     """
-    List of users the current user has chatted with, or admins if user is non-admin.
+    List of users the current user has chatted with, most recent first,
+    with the last message and unread count. Non-admin users also get every
+    admin as a contact.
     """
     permission_classes = [permissions.IsAuthenticated]
-    
+
     def list(self, request, *args, **kwargs):
         user = request.user
-        contacts = set()
-        
-        # Get all messages involving this user
-        sent = Message.objects.filter(sender=user).values_list('receiver_id', flat=True)
-        received = Message.objects.filter(receiver=user).values_list('sender_id', flat=True)
-        
-        contact_ids = set(sent) | set(received)
-        
+
+        # One indexed query over conversation summaries, not the messages
+        conversations = list(
+            Conversation.objects.filter(Q(user_a=user) | Q(user_b=user)).order_by('-last_timestamp')
+        )
+        contact_ids = [conversation.counterpart_id(user.pk) for conversation in conversations]
+
         # If user is normal user, also add all admins
         if user.role == 'user':
-            admins = User.objects.filter(role='admin').values_list('_id', flat=True)
-            contact_ids.update(admins)
+            from apps.notifications.utils import get_admin_recipient_ids
+            seen = {str(contact_id) for contact_id in contact_ids}
+            contact_ids += [
+                admin_id for admin_id in get_admin_recipient_ids()
+                if str(admin_id) not in seen and str(admin_id) != str(user.pk)
+            ]
+
+        users = User.objects.in_bulk(contact_ids)
+        summaries = {str(c.counterpart_id(user.pk)): c for c in conversations}
 
-        # Retrieve user objects
-        contact_users = User.objects.filter(_id__in=contact_ids)
-        
         from apps.users.serializers import UserSerializer
-        return Response(UserSerializer(contact_users, many=True).data)
+        results = []
+        for contact_id in contact_ids:
+            contact = users.get(contact_id)
+            if contact is None:
+                continue
+            data = UserSerializer(contact).data
+            conversation = summaries.get(str(contact_id))
+            data['last_message'] = conversation.last_message if conversation else None
+            data['last_timestamp'] = conversation.last_timestamp if conversation else None
+            data['unread_count'] = conversation.unread_for(user.pk) if conversation else 0
+            results.append(data)
+        return Response(results)
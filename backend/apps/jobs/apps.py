@@ -0,0 +1,25 @@
+import os
+import sys
+
+from django.apps import AppConfig
+from django.conf import settings
+from django.utils.module_loading import autodiscover_modules
+
+
+def _is_management_command():
+    """True for ``manage.py <command>`` other than ``runserver``."""
+    return os.path.basename(sys.argv[0]) == 'manage.py' and sys.argv[1:2] != ['runserver']
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.jobs'
+
+    def ready(self):
+        # Each app registers its background tasks in a ``jobs`` module
+        autodiscover_modules('jobs')
+        # Sweep retries and orphaned jobs from boot, not from the first
+        # enqueue, which may never come in this process
+        if getattr(settings, 'JOBS_MODE', 'thread') == 'thread' and not _is_management_command():
+            from .queue import local_runner
+            local_runner().ensure_poller()
@@ -0,0 +1,50 @@
+import logging
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.jobs.queue import run_due_jobs
+from petrescue_backend.pubsub import configure_relay
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs from the Mongo outbox (use with JOBS_MODE=worker).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=2, help='Worker threads in this process.')
+        parser.add_argument('--poll', type=float, default=1.0, help='Seconds to sleep when the queue is empty.')
+        parser.add_argument('--once', action='store_true', help='Drain due jobs once and exit.')
+
+    def handle(self, *args, **options):
+        # Jobs push notifications; relay them to the WebSocket process
+        configure_relay()
+        if options['once']:
+            ran = run_due_jobs()
+            self.stdout.write(f'Ran {ran} job(s).')
+            return
+
+        threads = [
+            threading.Thread(target=self.work, args=(options['poll'],), name=f'jobs-worker-{i}', daemon=True)
+            for i in range(max(options['threads'], 1))
+        ]
+        for thread in threads:
+            thread.start()
+        self.stdout.write(f'Running {len(threads)} job worker thread(s); Ctrl+C to stop.')
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping job workers.')
+
+    def work(self, poll):
+        while True:
+            try:
+                ran = run_due_jobs(limit=100)
+            except Exception:
+                logger.exception('Job worker iteration failed')
+                ran = 0
+            if not ran:
+                time.sleep(poll)
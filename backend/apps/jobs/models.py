@@ -0,0 +1,56 @@
+from django.db import models
+from bson import ObjectId
+
+
+class Job(models.Model):
+    """
+    Durable outbox entry for a background task.
+
+    Rows are written with the ORM but claimed and updated with atomic
+    pymongo ``find_one_and_update`` calls (see ``queue.py``), so several
+    worker threads and processes can share the collection safely.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    _id = models.CharField(max_length=24, primary_key=True, db_column='_id')
+    task = models.CharField(max_length=100)
+    payload = models.TextField(default='{}')  # JSON-encoded keyword arguments
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField()
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    # Finished jobs are removed by Mongo a week after completion
+    mongo_indexes = [
+        (
+            'job_done_ttl_idx',
+            [('finished_at', 1)],
+            {'expireAfterSeconds': 7 * 24 * 3600, 'partialFilterExpression': {'status': 'done'}},
+        ),
+    ]
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'),
+        ]
+
+    @property
+    def id(self):
+        return self._id
+
+    def save(self, *args, **kwargs):
+        if not self._id:
+            self._id = str(ObjectId())
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.task} ({self.status})"
@@ -0,0 +1,192 @@
+"""
+Background job queue with a Mongo-backed outbox.
+
+Tasks are plain functions registered with ``@task('name')`` in an app's
+``jobs`` module. ``enqueue`` stores a ``Job`` document and then, depending
+on ``JOBS_MODE``:
+
+* ``thread`` (default): the job is handed to an in-process thread pool
+  straight away. A daemon poller, started when the app loads, picks up
+  retries and jobs orphaned by crashed processes.
+* ``worker``: the job is only stored; ``manage.py run_jobs`` processes run it.
+* ``inline``: the job runs synchronously. Useful in tests and scripts.
+
+Failed jobs are retried with exponential backoff until ``max_attempts``,
+then left as ``failed`` with the last error.
+"""
+import json
+import logging
+import random
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from pymongo import ReturnDocument
+
+from petrescue_backend.mongo import get_collection
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def task(name):
+    """Register a function as a background task under ``name``."""
+    def decorator(func):
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def enqueue(task_name, *, delay=0, max_attempts=None, **kwargs):
+    """
+    Persist a job for ``task_name`` with JSON-serializable ``kwargs`` and
+    schedule it according to ``JOBS_MODE``. Returns the job id.
+    """
+    if task_name not in _registry:
+        raise KeyError(f'Unknown background task {task_name!r}')
+
+    job = Job.objects.create(
+        task=task_name,
+        payload=json.dumps(kwargs),
+        max_attempts=max_attempts or _setting('JOBS_MAX_ATTEMPTS', 5),
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+    mode = _setting('JOBS_MODE', 'thread')
+    if mode == 'inline':
+        doc = claim(job_id=job._id)
+        if doc is not None:
+            execute(doc)
+    elif mode == 'thread' and not delay:
+        local_runner().submit(job._id)
+    elif mode == 'thread':
+        local_runner().ensure_poller()
+    return job._id
+
+
+def claim(job_id=None):
+    """
+    Atomically move one due job (or the given one) to ``running`` and take
+    a lease on it. Jobs whose lease has expired count as due again.
+    Returns the claimed document or ``None``.
+    """
+    now = timezone.now()
+    if job_id is not None:
+        query = {'_id': job_id, 'status': 'pending'}
+    else:
+        query = {'$or': [
+            {'status': 'pending', 'run_at': {'$lte': now}},
+            {'status': 'running', 'locked_until': {'$lt': now}},
+        ]}
+    lease = timedelta(seconds=_setting('JOBS_LEASE_SECONDS', 300))
+    return get_collection(Job).find_one_and_update(
+        query,
+        {'$set': {'status': 'running', 'locked_until': now + lease}, '$inc': {'attempts': 1}},
+        sort=[('run_at', 1)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def execute(job_or_id):
+    """Run a claimed job and record success, a retry or the final failure."""
+    collection = get_collection(Job)
+    doc = job_or_id if isinstance(job_or_id, dict) else collection.find_one({'_id': job_or_id})
+    if doc is None:
+        return False
+
+    try:
+        func = _registry[doc['task']]
+        func(**json.loads(doc['payload'] or '{}'))
+    except Exception as exc:
+        attempts = doc['attempts']
+        error = ''.join(traceback.format_exception_only(type(exc), exc)).strip()
+        if attempts >= doc['max_attempts']:
+            logger.error('Job %s (%s) failed permanently: %s', doc['_id'], doc['task'], error)
+            update = {'status': 'failed', 'finished_at': timezone.now()}
+        else:
+            base = _setting('JOBS_RETRY_BASE_SECONDS', 10)
+            backoff = base * 2 ** (attempts - 1) * random.uniform(0.8, 1.2)
+            logger.warning('Job %s (%s) failed, retrying in %.0fs: %s', doc['_id'], doc['task'], backoff, error)
+            update = {'status': 'pending', 'run_at': timezone.now() + timedelta(seconds=backoff)}
+        update.update({'last_error': error, 'locked_until': None})
+        collection.update_one({'_id': doc['_id']}, {'$set': update})
+        return False
+
+    collection.update_one(
+        {'_id': doc['_id']},
+        {'$set': {'status': 'done', 'finished_at': timezone.now(), 'locked_until': None}},
+    )
+    return True
+
+
+def run_due_jobs(limit=None):
+    """Claim and run due jobs until none are left (or ``limit`` ran)."""
+    ran = 0
+    while limit is None or ran < limit:
+        doc = claim()
+        if doc is None:
+            break
+        execute(doc)
+        ran += 1
+    return ran
+
+
+class LocalRunner:
+    """Thread pool plus a sweeping poller for ``JOBS_MODE = 'thread'``."""
+
+    def __init__(self, threads, poll_seconds):
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='jobs')
+        self.poll_seconds = poll_seconds
+        self._poller = None
+        self._lock = threading.Lock()
+
+    def submit(self, job_id):
+        self.ensure_poller()
+        self.executor.submit(self._run_one, job_id)
+
+    def _run_one(self, job_id):
+        try:
+            doc = claim(job_id=job_id)
+            if doc is not None:
+                execute(doc)
+        except Exception:
+            logger.exception('Unable to run job %s', job_id)
+
+    def ensure_poller(self):
+        with self._lock:
+            if self._poller is None or not self._poller.is_alive():
+                self._poller = threading.Thread(target=self._poll, name='jobs-poller', daemon=True)
+                self._poller.start()
+
+    def _poll(self):
+        while True:
+            time.sleep(self.poll_seconds)
+            try:
+                run_due_jobs(limit=100)
+            except Exception:
+                logger.exception('Job poller failed')
+
+
+_local_runner = None
+_local_runner_lock = threading.Lock()
+
+
+def local_runner():
+    global _local_runner
+    with _local_runner_lock:
+        if _local_runner is None:
+            _local_runner = LocalRunner(
+                threads=_setting('JOBS_THREADS', 4),
+                poll_seconds=_setting('JOBS_POLL_SECONDS', 5),
+            )
+    return _local_runner
@@ -0,0 +1,79 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.apps import apps
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from .models import Job
+from .queue import claim, enqueue, execute, run_due_jobs, task
+
+calls = []
+
+
+@task('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task('tests.explode')
+def explode():
+    raise RuntimeError('boom')
+
+
+@override_settings(JOBS_MODE='inline', JOBS_RETRY_BASE_SECONDS=10)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_inline_job_runs_and_is_marked_done(self):
+        job_id = enqueue('tests.record', value=3)
+        self.assertEqual(calls, [3])
+        job = Job.objects.get(pk=job_id)
+        self.assertEqual(job.status, 'done')
+        self.assertEqual(job.attempts, 1)
+
+    def test_unknown_task_is_rejected(self):
+        with self.assertRaises(KeyError):
+            enqueue('tests.missing')
+
+    def test_failure_backs_off_then_fails_permanently(self):
+        before = timezone.now()
+        job_id = enqueue('tests.explode', max_attempts=2)
+        job = Job.objects.get(pk=job_id)
+        self.assertEqual(job.status, 'pending')
+        self.assertIn('boom', job.last_error)
+        self.assertGreaterEqual(job.run_at, before + timedelta(seconds=7))
+
+        # Not due yet, so a worker sweep leaves it alone
+        self.assertEqual(run_due_jobs(), 0)
+
+        Job.objects.filter(pk=job_id).update(run_at=timezone.now())
+        execute(claim())
+        job = Job.objects.get(pk=job_id)
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.attempts, 2)
+
+    @override_settings(JOBS_MODE='worker')
+    def test_worker_mode_only_stores_the_job(self):
+        job_id = enqueue('tests.record', value=1)
+        self.assertEqual(calls, [])
+        self.assertEqual(run_due_jobs(), 1)
+        self.assertEqual(calls, [1])
+        self.assertEqual(Job.objects.get(pk=job_id).status, 'done')
+
+
+class PollerStartupTests(SimpleTestCase):
+    def ready(self, argv, mode='thread'):
+        with override_settings(JOBS_MODE=mode), mock.patch('sys.argv', argv), \
+                mock.patch('apps.jobs.queue.local_runner') as local_runner:
+            apps.get_app_config('jobs').ready()
+        return local_runner.return_value.ensure_poller.called
+
+    def test_poller_starts_with_the_server(self):
+        self.assertTrue(self.ready(['gunicorn', 'petrescue_backend.wsgi']))
+        self.assertTrue(self.ready(['manage.py', 'runserver']))
+
+    def test_poller_skipped_for_commands_and_other_modes(self):
+        self.assertFalse(self.ready(['manage.py', 'migrate']))
+        self.assertFalse(self.ready(['gunicorn', 'petrescue_backend.wsgi'], mode='worker'))
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class MatchesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.matches'
\ No newline at end of file
+    name = 'apps.matches'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        if getattr(settings, 'MATCH_FEATURE_STORE_WARM', False):
+            from .feature_store import warm_in_background
+            warm_in_background()
@@ -1,32 +1,252 @@
-from django.db.models import Q
+import threading
+
+import numpy as np
+
 from apps.pets.models import Pet
-from apps.users.models import User
+
+# Categorical pet attributes, in feature-matrix column order
+CATEGORICAL_FIELDS = ('pet_type', 'breed', 'size', 'color', 'gender', 'location')
+FLAG_FIELDS = ('is_vaccinated', 'is_neutered')
+FEATURE_FIELDS = ('_id', 'created_by_id', 'age', 'created_at') + CATEGORICAL_FIELDS + FLAG_FIELDS
+
+# Code for preference values never seen on any pet (and for padding);
+# pet codes start at 0, so it matches nothing
+UNKNOWN = -1
+
+
+def _normalize(value):
+    return str(value).strip().lower()
+
+
+def is_matchable(pet):
+    """Only approved, still available pets are ever suggested."""
+    return pet.status == 'available' and pet.is_approved
+
+
+class PetFeatureMatrix:
+    """
+    Pets encoded column-wise for vectorized scoring.
+
+    Each categorical attribute is dictionary-encoded into an int32 column of
+    ``codes`` (rows x categorical fields); owners, ages, creation times and
+    the boolean flags live in their own arrays. Rows can be upserted and
+    removed in place (removal moves the last row into the hole), so callers
+    that read several arrays together should hold ``lock``.
+    """
+
+    def __init__(self, capacity=0):
+        self.lock = threading.RLock()
+        self.vocab = {field: {} for field in CATEGORICAL_FIELDS}
+        self.owner_codes = {}
+        self.index = {}
+        self.size = 0
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        self._ids = np.empty(capacity, dtype=object)
+        self._owners = np.empty(capacity, dtype=np.int32)
+        self._codes = np.empty((capacity, len(CATEGORICAL_FIELDS)), dtype=np.int32)
+        self._ages = np.empty(capacity, dtype=np.float32)
+        self._created = np.empty(capacity, dtype=np.float64)
+        self._flags = np.empty((capacity, len(FLAG_FIELDS)), dtype=bool)
+
+    def _arrays(self):
+        return (self._ids, self._owners, self._codes, self._ages, self._created, self._flags)
+
+    def _grow(self):
+        old_arrays = self._arrays()
+        self._allocate(max(16, 2 * len(self._ids)))
+        for old, new in zip(old_arrays, self._arrays()):
+            new[:self.size] = old[:self.size]
+
+    def __len__(self):
+        return self.size
+
+    ids = property(lambda self: self._ids[:self.size])
+    owners = property(lambda self: self._owners[:self.size])
+    codes = property(lambda self: self._codes[:self.size])
+    ages = property(lambda self: self._ages[:self.size])
+    created = property(lambda self: self._created[:self.size])
+    flags = property(lambda self: self._flags[:self.size])
+
+    def owner_code(self, owner_id):
+        return self.owner_codes.get(str(owner_id), UNKNOWN)
+
+    def upsert(self, record):
+        """Insert or overwrite one pet given a ``FEATURE_FIELDS`` mapping."""
+        with self.lock:
+            row = self.index.get(record['_id'])
+            if row is None:
+                if self.size == len(self._ids):
+                    self._grow()
+                row = self.size
+                self.size += 1
+                self.index[record['_id']] = row
+            self._ids[row] = record['_id']
+            self._owners[row] = self.owner_codes.setdefault(
+                str(record['created_by_id']), len(self.owner_codes)
+            )
+            self._ages[row] = record['age'] or 0
+            self._created[row] = record['created_at'].timestamp() if record['created_at'] else 0.0
+            self._codes[row] = [
+                self.vocab[field].setdefault(_normalize(record[field]), len(self.vocab[field]))
+                for field in CATEGORICAL_FIELDS
+            ]
+            self._flags[row] = [bool(record[field]) for field in FLAG_FIELDS]
+
+    def remove(self, pet_id):
+        with self.lock:
+            row = self.index.pop(pet_id, None)
+            if row is None:
+                return
+            last = self.size - 1
+            if row != last:
+                for array in self._arrays():
+                    array[row] = array[last]
+                self.index[self._ids[row]] = row
+            self._ids[last] = None
+            self.size = last
+
+    @classmethod
+    def from_rows(cls, rows, capacity=0):
+        """Build from ``FEATURE_FIELDS``-ordered tuples (``values_list`` rows)."""
+        matrix = cls(capacity)
+        for row in rows:
+            matrix.upsert(dict(zip(FEATURE_FIELDS, row)))
+        return matrix
+
+    @classmethod
+    def from_database(cls):
+        """Encode every adoptable pet with one streamed cursor."""
+        queryset = Pet.objects.filter(status='available', is_approved=True)
+        rows = queryset.values_list(*FEATURE_FIELDS)
+        return cls.from_rows(rows.iterator(chunk_size=2000), capacity=queryset.count())
+
 
 class MatchEngine:
-    def __init__(self, user):
+    """
+    Scores adoptable pets against a user's preferences.
+
+    Preferences are a dict with any of ``CATEGORICAL_FIELDS`` (a value or a
+    list of acceptable values), ``age_min``/``age_max`` and the boolean
+    ``FLAG_FIELDS``. Every stated preference contributes its weight when a
+    pet satisfies it; the total is divided by the weight stated, so scores
+    fall in [0, 1].
+    """
+
+    WEIGHTS = {
+        'pet_type': 3.0,
+        'breed': 2.0,
+        'size': 1.5,
+        'color': 1.0,
+        'gender': 1.0,
+        'location': 2.0,
+        'age': 1.5,
+        'is_vaccinated': 1.0,
+        'is_neutered': 0.5,
+    }
+    # Ages outside the wanted range decay by half every AGE_HALF_LIFE years
+    AGE_HALF_LIFE = 2.0
+
+    def __init__(self, user, features=None):
         self.user = user
+        self._features = features
+
+    @property
+    def features(self):
+        if self._features is None:
+            from .feature_store import feature_store
+            self._features = feature_store.get_matrix()
+        return self._features
+
+    def encode_preferences(self, preferences):
+        """
+        Turn preferences into a (categorical fields x max values) code matrix
+        padded with ``UNKNOWN``, plus the weight vector of stated fields.
+        """
+        vocab = self.features.vocab
+        wanted = []
+        for field in CATEGORICAL_FIELDS:
+            values = preferences.get(field) or []
+            if isinstance(values, str):
+                values = [values]
+            wanted.append([vocab[field].get(_normalize(v), UNKNOWN) for v in values])
+
+        width = max([len(codes) for codes in wanted] + [1])
+        matrix = np.full((len(CATEGORICAL_FIELDS), width), UNKNOWN, dtype=np.int32)
+        weights = np.zeros(len(CATEGORICAL_FIELDS), dtype=np.float32)
+        for i, codes in enumerate(wanted):
+            if codes:
+                matrix[i, :len(codes)] = codes
+                weights[i] = self.WEIGHTS[CATEGORICAL_FIELDS[i]]
+        return matrix, weights
+
+    def score(self, preferences):
+        """Return one score per row of the feature matrix."""
+        features = self.features
+        matrix, weights = self.encode_preferences(preferences)
+
+        # (rows, fields, values) comparison collapsed to per-field hits,
+        # then one matrix-vector product for the categorical part
+        hits = (features.codes[:, :, None] == matrix[None, :, :]).any(axis=2)
+        scores = hits.astype(np.float32) @ weights
+        stated = float(weights.sum())
+
+        age_min = preferences.get('age_min')
+        age_max = preferences.get('age_max')
+        if age_min is not None or age_max is not None:
+            low = -np.inf if age_min is None else float(age_min)
+            high = np.inf if age_max is None else float(age_max)
+            distance = np.maximum(low - features.ages, 0) + np.maximum(features.ages - high, 0)
+            scores += self.WEIGHTS['age'] * np.exp2(-distance / self.AGE_HALF_LIFE)
+            stated += self.WEIGHTS['age']
+
+        for i, field in enumerate(FLAG_FIELDS):
+            wanted = preferences.get(field)
+            if wanted is None:
+                continue
+            scores += self.WEIGHTS[field] * (features.flags[:, i] == bool(wanted))
+            stated += self.WEIGHTS[field]
 
-    def find_matches(self, pet_preferences):
-        # Example of filtering pets based on user preferences
-        matched_pets = Pet.objects.filter(
-            Q(type__in=pet_preferences['types']) |
-            Q(breed__in=pet_preferences['breeds']) |
-            Q(color__in=pet_preferences['colors'])
-        ).exclude(created_by=self.user)
+        if stated:
+            scores /= stated
+        return scores
 
-        return matched_pets
+    def find_matches(self, preferences, limit=20):
+        """
+        Return the ``limit`` best ``(pet_id, score)`` pairs, best first.
+        The user's own pets are never suggested; ties keep recency order.
+        """
+        features = self.features
+        with features.lock:
+            if not len(features):
+                return []
 
-    def suggest_pets(self):
-        # Example of suggesting pets based on user location and preferences
-        user_location = self.user.location
-        pet_preferences = self.user.pet_preferences
+            scores = self.score(preferences)
+            if self.user is not None:
+                scores[features.owners == features.owner_code(self.user.id)] = -np.inf
 
-        matched_pets = self.find_matches(pet_preferences)
+            limit = min(limit, len(scores))
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            top = top[np.lexsort((-features.created[top], -scores[top]))]
+            return [
+                (features.ids[i], round(float(scores[i]), 4))
+                for i in top
+                if np.isfinite(scores[i])
+            ]
 
-        # Further filter by location
-        matched_pets = matched_pets.filter(location=user_location)
+    def suggest_pets(self, preferences=None, limit=20):
+        """
+        Return the best ``(pet, score)`` pairs. Without explicit preferences
+        the user's address is used as a location preference.
+        """
+        if preferences is None:
+            address = getattr(self.user, 'address', '')
+            preferences = {'location': address} if address else {}
 
-        return matched_pets
+        ranked = self.find_matches(preferences, limit=limit)
+        pets = Pet.objects.prefetch_related('created_by').in_bulk([pet_id for pet_id, _ in ranked])
+        return [(pets[pet_id], score) for pet_id, score in ranked if pet_id in pets]
 
     def create_match_request(self, pet, request_type):
         # Logic to create a match request
@@ -46,4 +266,4 @@ class MatchEngine:
         # Logic to retrieve match requests for the user
         from .models import Request
 
-        return Request.objects.filter(requester=self.user)
\ No newline at end of file
+        return Request.objects.filter(requester=self.user)
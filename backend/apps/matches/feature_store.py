@@ -0,0 +1,127 @@
+"""
+Process-wide pet feature matrix for match scoring.
+
+The matrix is built once from a single streamed cursor over adoptable pets
+and then kept current by ``post_save``/``post_delete`` signals on ``Pet``:
+approved, available pets are upserted and everything else is evicted, so
+scoring never queries Mongo on the hot path.
+
+Signals only fire in the process that made the write. To pick up writes
+from other workers, a read that finds the store older than
+``MATCH_FEATURE_STORE_SYNC_SECONDS`` first applies every pet changed since
+the last sync. That is one indexed ``updated_at`` range query per interval.
+A deleted pet has no row left to find, so every
+``MATCH_FEATURE_STORE_RECONCILE_SECONDS`` the sync also reads the ids of all
+adoptable pets and evicts whatever else the matrix still holds.
+"""
+import logging
+import threading
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.pets.models import Pet
+from .engine import FEATURE_FIELDS, PetFeatureMatrix, is_matchable
+
+logger = logging.getLogger(__name__)
+
+SYNC_FIELDS = FEATURE_FIELDS + ('status', 'is_approved')
+
+
+class PetFeatureStore:
+    def __init__(self, sync_seconds=None):
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._synced_at = None
+        self._reconciled_at = None
+        self.sync_seconds = sync_seconds
+
+    @property
+    def is_built(self):
+        return self._matrix is not None
+
+    def get_matrix(self):
+        """Return the matrix, building or catching it up first if needed."""
+        if self._matrix is None:
+            self.build()
+        elif self._is_stale():
+            self.sync()
+        return self._matrix
+
+    def build(self):
+        with self._lock:
+            if self._matrix is not None:
+                return
+            started = timezone.now()
+            matrix = PetFeatureMatrix.from_database()
+            self._matrix, self._synced_at, self._reconciled_at = matrix, started, started
+            logger.info('Built pet feature store with %d pets', len(matrix))
+
+    def sync(self):
+        """Apply pets updated since the last build or sync."""
+        with self._lock:
+            if not self._is_stale():
+                return
+            started = timezone.now()
+            if self._reconcile_due(started):
+                self._reconcile()
+                self._reconciled_at = started
+            rows = Pet.objects.filter(updated_at__gte=self._synced_at).values_list(*SYNC_FIELDS)
+            for row in rows.iterator(chunk_size=2000):
+                record = dict(zip(SYNC_FIELDS, row))
+                if record['status'] == 'available' and record['is_approved']:
+                    self._matrix.upsert(record)
+                else:
+                    self._matrix.remove(record['_id'])
+            self._synced_at = started
+
+    def _reconcile(self):
+        """Evict pets deleted, or made unmatchable, in other processes."""
+        # Snapshot first: pets upserted while the ids load are not touched
+        known = set(self._matrix.index)
+        for pet_id in known - self._live_ids():
+            self._matrix.remove(pet_id)
+
+    @staticmethod
+    def _live_ids():
+        queryset = Pet.objects.filter(status='available', is_approved=True).values_list('_id', flat=True)
+        return set(queryset.iterator(chunk_size=5000))
+
+    def _reconcile_due(self, now):
+        interval = getattr(settings, 'MATCH_FEATURE_STORE_RECONCILE_SECONDS', 600)
+        return (now - self._reconciled_at).total_seconds() >= interval
+
+    def _is_stale(self):
+        interval = self.sync_seconds
+        if interval is None:
+            interval = getattr(settings, 'MATCH_FEATURE_STORE_SYNC_SECONDS', 60)
+        return (timezone.now() - self._synced_at).total_seconds() >= interval
+
+    def apply(self, pet):
+        """Reflect one saved pet; ignored until the store has been built."""
+        if self._matrix is None:
+            return
+        if is_matchable(pet):
+            self._matrix.upsert({field: getattr(pet, field) for field in FEATURE_FIELDS})
+        else:
+            self._matrix.remove(pet._id)
+
+    def evict(self, pet_id):
+        if self._matrix is not None:
+            self._matrix.remove(pet_id)
+
+    def reset(self):
+        with self._lock:
+            self._matrix = None
+            self._synced_at = None
+            self._reconciled_at = None
+
+
+feature_store = PetFeatureStore()
+
+
+def warm_in_background():
+    """Build the store off the main thread, e.g. right after worker boot."""
+    thread = threading.Thread(target=feature_store.build, name='pet-feature-store', daemon=True)
+    thread.start()
+    return thread
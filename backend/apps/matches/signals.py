@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.pets.models import Pet
+from .feature_store import feature_store
+
+
+@receiver(post_save, sender=Pet, dispatch_uid='match_feature_store_save')
+def update_pet_features(sender, instance, **kwargs):
+    feature_store.apply(instance)
+
+
+@receiver(post_delete, sender=Pet, dispatch_uid='match_feature_store_delete')
+def evict_pet_features(sender, instance, **kwargs):
+    feature_store.evict(instance._id)
@@ -1,6 +1,12 @@
+from datetime import datetime
+from types import SimpleNamespace
+from unittest import mock
+from django.test import SimpleTestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
+from .engine import MatchEngine, PetFeatureMatrix, FEATURE_FIELDS
+from .feature_store import PetFeatureStore
 from .models import Request
 from django.contrib.auth import get_user_model
 
@@ -60,4 +66,61 @@ class MatchTests(APITestCase):
         match_request = self.client.post(reverse('match-request-list'), self.request_data)
         response = self.client.delete(reverse('match-request-detail', args=[match_request.data['id']]))
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertEqual(Request.objects.count(), 0)
\ No newline at end of file
+        self.assertEqual(Request.objects.count(), 0)
+
+class MatchEngineScoringTests(SimpleTestCase):
+    def setUp(self):
+        owner = SimpleNamespace(id='owner')
+        created = datetime(2025, 1, 1)
+        rows = [
+            # _id, created_by_id, age, created_at, pet_type, breed, size, color, gender, location,
+            # vaccinated, neutered
+            ('p1', 'owner', 2, created, 'dog', 'Beagle', 'medium', 'brown', 'male', 'Hyderabad', True, False),
+            ('p2', 'someone', 3, created, 'dog', 'Labrador', 'large', 'black', 'female', 'Hyderabad', True, True),
+            ('p3', 'someone', 9, created, 'cat', 'Persian', 'small', 'white', 'female', 'Chennai', False, False),
+            ('p4', 'someone', 1, created, 'Dog ', 'beagle', 'small', 'brown', 'male', 'Chennai', True, False),
+        ]
+        self.matrix = PetFeatureMatrix.from_rows(rows)
+        self.engine = MatchEngine(owner, features=self.matrix)
+
+    def test_best_match_first_and_own_pets_excluded(self):
+        matches = self.engine.find_matches({'pet_type': ['dog'], 'breed': ['beagle']}, limit=3)
+        ids = [pet_id for pet_id, _ in matches]
+        self.assertEqual(ids[0], 'p4')
+        self.assertNotIn('p1', ids)
+        self.assertEqual(matches[0][1], 1.0)
+
+    def test_unknown_values_match_nothing(self):
+        scores = self.engine.score({'pet_type': ['dragon']})
+        self.assertFalse(scores.any())
+
+    def test_age_range_and_flags(self):
+        scores = self.engine.score({'age_min': 1, 'age_max': 3, 'is_vaccinated': True})
+        self.assertEqual(list(scores[:2]), [1.0, 1.0])
+        self.assertLess(scores[2], 0.1)
+
+    def test_store_applies_saves_and_evicts_unmatchable_pets(self):
+        store = PetFeatureStore()
+        store._matrix = self.matrix
+        pet = SimpleNamespace(**dict(zip(FEATURE_FIELDS, (
+            'p5', 'someone', 4, datetime(2025, 2, 1), 'dog', 'Beagle', 'large', 'tan', 'male', 'Pune', True, True,
+        ))), status='available', is_approved=True)
+
+        store.apply(pet)
+        self.assertIn('p5', self.matrix.index)
+
+        pet.status = 'adopted'
+        store.apply(pet)
+        self.assertNotIn('p5', self.matrix.index)
+
+        store.evict('p2')
+        self.assertEqual(len(self.matrix), 3)
+        self.assertEqual(sorted(self.matrix.ids), ['p1', 'p3', 'p4'])
+        self.assertEqual(self.matrix.ids[self.matrix.index['p4']], 'p4')
+
+    def test_reconcile_evicts_pets_deleted_elsewhere(self):
+        store = PetFeatureStore()
+        store._matrix = self.matrix
+        with mock.patch.object(PetFeatureStore, '_live_ids', return_value={'p1', 'p2', 'p4', 'p9'}):
+            store._reconcile()
+        self.assertEqual(sorted(self.matrix.ids), ['p1', 'p2', 'p4'])
@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import RequestViewSet
+from .views import RequestViewSet, MatchSuggestionsView
 
 router = DefaultRouter()
 router.register(r'requests', RequestViewSet, basename='match-request')
 
 urlpatterns = [
+    path('suggestions/', MatchSuggestionsView.as_view(), name='match-suggestions'),
     path('', include(router.urls)),
 ]
@@ -1,4 +1,8 @@
-from rest_framework import viewsets, permissions
+from rest_framework import generics, viewsets, permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from apps.pets.serializers import PetSearchSerializer
+from .engine import MatchEngine, CATEGORICAL_FIELDS, FLAG_FIELDS
 from .models import Request
 from .serializers import RequestSerializer
 
@@ -8,4 +12,48 @@ class RequestViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def perform_create(self, serializer):
-        serializer.save(requester=self.request.user)
\ No newline at end of file
+        serializer.save(requester=self.request.user)
+
+
+class MatchSuggestionsView(generics.GenericAPIView):
+    """
+    GET /api/matches/suggestions/
+    Ranked adoptable pets for the current user. Query params: pet_type,
+    breed, size, color, gender, location (comma-separated for several),
+    age_min, age_max, is_vaccinated, is_neutered, limit (default 20).
+    Without any preference the user's address is matched on location.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    max_limit = 100
+
+    def get_preferences(self, params):
+        preferences = {}
+        for field in CATEGORICAL_FIELDS:
+            values = [v for v in params.get(field, '').split(',') if v.strip()]
+            if values:
+                preferences[field] = values
+        for field in ('age_min', 'age_max'):
+            if params.get(field):
+                try:
+                    preferences[field] = float(params[field])
+                except ValueError:
+                    raise ValidationError({field: 'Must be a number.'})
+        for field in FLAG_FIELDS:
+            if params.get(field):
+                preferences[field] = params[field].lower() in ['true', '1', 'yes', 'on']
+        return preferences or None
+
+    def get(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), self.max_limit)
+        except ValueError:
+            raise ValidationError({'limit': 'Must be an integer.'})
+
+        engine = MatchEngine(request.user)
+        matches = engine.suggest_pets(self.get_preferences(request.query_params), limit=max(limit, 1))
+        return Response({
+            'results': [
+                {'score': score, 'pet': PetSearchSerializer(pet, context={'request': request}).data}
+                for pet, score in matches
+            ]
+        })
@@ -0,0 +1,27 @@
+"""
+WebSocket notification stream: ``/ws/notifications/?token=<access token>``
+
+Sends the current ``unread_count`` on connect, then a ``notification``
+event for every notification created for the user and ``unread_count``
+events when notifications are marked read.
+"""
+from asgiref.sync import sync_to_async
+
+from petrescue_backend.pubsub import pubsub
+from petrescue_backend.websocket import CLOSE_UNAUTHORIZED, authenticate, pump
+from .counters import unread_count
+from .push import user_channel
+
+
+async def notification_socket(socket):
+    user = await authenticate(socket)
+    if user is None:
+        await socket.close(CLOSE_UNAUTHORIZED)
+        return
+
+    await socket.accept()
+    # Subscribe before reading the count so no update falls in between
+    with pubsub.subscribe(user_channel(user.pk)) as subscription:
+        count = await sync_to_async(unread_count)(user.pk)
+        await socket.send_json({'type': 'unread_count', 'count': count})
+        await pump(socket, subscription)
@@ -0,0 +1,51 @@
+"""
+Per-user unread notification counters.
+
+Counters live in the ``counters`` cache and are adjusted by the model
+signals in ``signals.py`` (and directly by bulk writes that bypass them),
+so reading one is a single cache get. A missing counter is rebuilt with one
+count query.
+
+Signals only fire in the process that wrote, e.g. a ``run_jobs`` worker or
+another gunicorn worker. With a shared cache backend every process sees
+those adjustments. With the default per-process LocMemCache they are only
+seen locally, so the cache timeout is short and bounds how long another
+process serves a stale count.
+"""
+from django.core.cache import caches
+
+from .models import Notification
+
+CACHE_PREFIX = 'notifications:unread:'
+
+cache = caches['counters']
+
+
+def _key(user_id):
+    return CACHE_PREFIX + str(user_id)
+
+
+def unread_count(user_id):
+    count = cache.get(_key(user_id))
+    if count is None:
+        count = Notification.objects.filter(recipient_id=user_id, is_read=False).count()
+        cache.add(_key(user_id), count)
+    return count
+
+
+def adjust(user_id, delta):
+    """Apply a delta; returns the new count, or ``None`` if not cached."""
+    if not delta:
+        return cache.get(_key(user_id))
+    try:
+        return cache.incr(_key(user_id), delta)
+    except ValueError:
+        return None
+
+
+def reset(user_id, count=0):
+    cache.set(_key(user_id), count)
+
+
+def invalidate(user_ids):
+    cache.delete_many([_key(user_id) for user_id in user_ids])
@@ -0,0 +1,34 @@
+"""Background tasks for notifications (see apps/jobs)."""
+from bson import ObjectId
+
+from apps.jobs.queue import task
+from . import retention
+from .models import Notification
+from .utils import notify_admins
+
+
+@task('notifications.create')
+def create(recipient_id, recipient_role, title, message, notif_type='system', related_id=''):
+    Notification.objects.create(
+        recipient_id=ObjectId(recipient_id),
+        recipient_role=recipient_role,
+        title=title,
+        message=message,
+        type=notif_type,
+        related_entity_id=related_id or '',
+    )
+
+
+@task('notifications.notify_admins')
+def admin_fan_out(title, message, notif_type='system', related_id=''):
+    notify_admins(title, message, notif_type=notif_type, related_id=related_id)
+
+
+@task('notifications.compact')
+def compact():
+    retention.compact()
+
+
+@task('notifications.archive')
+def archive(horizon_days=1):
+    retention.archive(horizon_days=horizon_days)
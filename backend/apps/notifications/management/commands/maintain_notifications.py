@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from apps.notifications import retention
+
+
+class Command(BaseCommand):
+    help = 'Compact duplicate notifications and archive those about to expire. Run daily.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon', type=int, default=1,
+                            help='Archive notifications expiring within this many days.')
+        parser.add_argument('--archive-dir', default=None, help='Defaults to NOTIFICATION_ARCHIVE_DIR.')
+        parser.add_argument('--skip-compact', action='store_true')
+        parser.add_argument('--skip-archive', action='store_true')
+
+    def handle(self, *args, **options):
+        if not options['skip_compact']:
+            removed = retention.compact()
+            self.stdout.write(f'Compaction removed {removed} duplicate notification(s).')
+        if not options['skip_archive']:
+            path, archived = retention.archive(options['horizon'], options['archive_dir'])
+            if archived:
+                self.stdout.write(self.style.SUCCESS(f'Archived {archived} notification(s) to {path}.'))
+            else:
+                self.stdout.write('Nothing to archive.')
@@ -1,5 +1,9 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from bson import ObjectId
 
 User = get_user_model()
@@ -17,16 +21,47 @@ class Notification(models.Model):
     type = models.CharField(max_length=50, default='system')  # pet, report, adoption, system
     related_entity_id = models.CharField(max_length=64, blank=True, default='')
     is_read = models.BooleanField(default=False)
+    # How many notifications compaction folded into this one (see retention.py)
+    count = models.PositiveIntegerField(default=1)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Validator for conditional GETs; raw pymongo updates set it explicitly
+    updated_at = models.DateTimeField(auto_now=True, null=True)
+    # Mongo removes the document once this passes (TTL index below)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    mongo_indexes = [
+        ('notif_expires_ttl_idx', [('expires_at', 1)], {'expireAfterSeconds': 0}),
+    ]
 
     @property
     def id(self):
         return self._id
 
+    @staticmethod
+    def retention_days(is_read):
+        if is_read:
+            return getattr(settings, 'NOTIFICATION_READ_RETENTION_DAYS', 30)
+        return getattr(settings, 'NOTIFICATION_UNREAD_RETENTION_DAYS', 90)
+
+    def compute_expiry(self):
+        return (self.created_at or timezone.now()) + timedelta(days=self.retention_days(self.is_read))
+
     def save(self, *args, **kwargs):
         if not self._id:
             self._id = str(ObjectId())
+        self.expires_at = self.compute_expiry()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'is_read' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'expires_at'}
         super().save(*args, **kwargs)
 
     def __str__(self):
-        return f'Notification for {self.recipient.email}: {self.title}'
\ No newline at end of file
+        return f'Notification for {self.recipient.email}: {self.title}'
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['recipient', '-created_at', '-_id'], name='notif_recipient_created_idx'),
+            models.Index(fields=['recipient', 'is_read'], name='notif_recipient_unread_idx'),
+            # Conditional GET validator (petrescue_backend/conditional.py)
+            models.Index(fields=['recipient', '-updated_at'], name='notif_recipient_updated_idx'),
+        ]
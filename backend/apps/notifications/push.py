@@ -0,0 +1,23 @@
+"""Push new notifications to ``/ws/notifications/`` subscribers."""
+from petrescue_backend.pubsub import pubsub
+
+
+def user_channel(user_id):
+    return f'notifications:{user_id}'
+
+
+def push_unread_count(user_id, count):
+    if count is not None:
+        pubsub.publish(user_channel(user_id), {'type': 'unread_count', 'count': count})
+
+
+def push_notification(notification, unread_count=None):
+    channel = user_channel(notification.recipient_id)
+    # Skip serializing when nobody is listening, the common case
+    if not pubsub.may_reach(channel):
+        return
+    from .serializers import NotificationSerializer
+    event = {'type': 'notification', 'notification': NotificationSerializer(notification).data}
+    if unread_count is not None:
+        event['unread_count'] = unread_count
+    pubsub.publish(channel, event)
@@ -0,0 +1,20 @@
+"""Native PyMongo read of a user's notification list (see apps/pets/repository.py)."""
+from petrescue_backend.mongo import RowLoader, get_collection
+from .models import Notification
+from .serializers import NotificationSerializer
+
+notification_rows = RowLoader(Notification, [
+    name for name in NotificationSerializer.Meta.fields if name != 'id'
+])
+
+
+def notification_page(paginator, request, view, recipient_id):
+    """The keyset page of ``recipient_id``'s notifications, newest first."""
+    def fetch(seek, sort, limit):
+        query = {'recipient_id': recipient_id}
+        if seek:
+            query = {'$and': [query, seek]}
+        docs = get_collection(Notification).find(query, notification_rows.projection).sort(sort).limit(limit)
+        return notification_rows.load(docs)
+
+    return paginator.paginate_documents(fetch, request, view=view)
@@ -0,0 +1,142 @@
+"""
+Keeping the notifications collection small.
+
+* Retention: every notification carries ``expires_at`` (created_at plus
+  ``NOTIFICATION_READ_RETENTION_DAYS`` once read, or
+  ``NOTIFICATION_UNREAD_RETENTION_DAYS`` while unread) and a TTL index
+  removes it after that.
+* Compaction: repeated notifications of the same ``type`` and
+  ``related_entity_id`` for one recipient collapse into the newest one,
+  whose ``count`` records how many were folded in.
+* Archival: notifications about to expire are exported as gzipped JSON
+  lines to ``NOTIFICATION_ARCHIVE_DIR`` and removed from the hot
+  collection. Run it more often than the archive horizon so the TTL index
+  only catches what the archive already has.
+"""
+import gzip
+import os
+from datetime import timedelta
+
+from bson import json_util
+from django.conf import settings
+from django.utils import timezone
+
+from petrescue_backend.mongo import get_collection
+from . import counters
+from .models import Notification
+
+DAY_MS = 24 * 3600 * 1000
+BATCH_SIZE = 1000
+
+
+def _dashboard_adjust(delta):
+    from apps.admin_panel import stats as dashboard_stats
+    dashboard_stats.adjust({'total_notifications': delta})
+
+
+def mark_all_read(user_id):
+    """Mark a user's notifications read and move their expiry forward, in one update."""
+    read_days = Notification.retention_days(True)
+    return get_collection(Notification).update_many(
+        {'recipient_id': user_id, 'is_read': False},
+        [{'$set': {
+            'is_read': True,
+            'updated_at': '$$NOW',
+            'expires_at': {'$add': ['$created_at', read_days * DAY_MS]},
+        }}],
+    ).modified_count
+
+
+def compact():
+    """
+    Collapse duplicate (recipient, type, related_entity_id) notifications
+    into the newest of each group. Returns the number of documents removed.
+    """
+    collection = get_collection(Notification)
+    groups = collection.aggregate([
+        {'$match': {'related_entity_id': {'$ne': ''}}},
+        {'$sort': {'created_at': -1}},
+        {'$group': {
+            '_id': {'recipient': '$recipient_id', 'type': '$type', 'entity': '$related_entity_id'},
+            'ids': {'$push': '$_id'},
+            'latest': {'$first': '$created_at'},
+            'total': {'$sum': {'$ifNull': ['$count', 1]}},
+            'unread': {'$sum': {'$cond': ['$is_read', 0, 1]}},
+        }},
+        {'$match': {'ids.1': {'$exists': True}}},
+    ], allowDiskUse=True)
+
+    removed = 0
+    unread_deltas = {}
+    for group in groups:
+        keep, duplicates = group['ids'][0], group['ids'][1:]
+        is_read = group['unread'] == 0
+        expires_at = group['latest'] + timedelta(days=Notification.retention_days(is_read))
+        collection.update_one(
+            {'_id': keep},
+            {'$set': {
+                'count': group['total'], 'is_read': is_read,
+                'expires_at': expires_at, 'updated_at': timezone.now(),
+            }},
+        )
+        removed += collection.delete_many({'_id': {'$in': duplicates}}).deleted_count
+
+        recipient = group['_id']['recipient']
+        delta = (0 if is_read else 1) - group['unread']
+        unread_deltas[recipient] = unread_deltas.get(recipient, 0) + delta
+
+    for recipient, delta in unread_deltas.items():
+        counters.adjust(recipient, delta)
+    _dashboard_adjust(-removed)
+    return removed
+
+
+def archive(horizon_days=1, directory=None):
+    """
+    Export notifications expiring within ``horizon_days`` (or already past
+    their expiry) to a gzipped JSON lines file, then delete them. Returns
+    ``(path, count)``; ``path`` is ``None`` when nothing was due.
+    """
+    now = timezone.now()
+    horizon = now + timedelta(days=horizon_days)
+    query = {'$or': [
+        {'expires_at': {'$lte': horizon}},
+        # Written before expires_at existed; judge by age instead
+        {'expires_at': None, 'is_read': True,
+         'created_at': {'$lte': horizon - timedelta(days=Notification.retention_days(True))}},
+        {'expires_at': None, 'is_read': {'$ne': True},
+         'created_at': {'$lte': horizon - timedelta(days=Notification.retention_days(False))}},
+    ]}
+
+    collection = get_collection(Notification)
+    directory = directory or settings.NOTIFICATION_ARCHIVE_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'notifications-{now:%Y%m%d-%H%M%S}.jsonl.gz')
+
+    archived = 0
+    recipients = set()
+    with gzip.open(path, 'wt', encoding='utf-8') as archive_file:
+        batch = []
+        for doc in collection.find(query).sort('_id', 1).batch_size(BATCH_SIZE):
+            batch.append(doc)
+            if len(batch) == BATCH_SIZE:
+                archived += _flush(collection, archive_file, batch, recipients)
+                batch = []
+        if batch:
+            archived += _flush(collection, archive_file, batch, recipients)
+
+    if not archived:
+        os.remove(path)
+        return None, 0
+    counters.invalidate(recipients)
+    _dashboard_adjust(-archived)
+    return path, archived
+
+
+def _flush(collection, archive_file, batch, recipients):
+    """Write a batch to the archive before deleting it from Mongo."""
+    for doc in batch:
+        archive_file.write(json_util.dumps(doc) + '\n')
+        recipients.add(doc.get('recipient_id'))
+    archive_file.flush()
+    return collection.delete_many({'_id': {'$in': [doc['_id'] for doc in batch]}}).deleted_count
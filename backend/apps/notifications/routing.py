@@ -0,0 +1,5 @@
+from .consumers import notification_socket
+
+websocket_routes = [
+    (r'/ws/notifications/', notification_socket),
+]
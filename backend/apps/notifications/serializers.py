@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from petrescue_backend.serializer_plans import PlannedListSerializer
 from .models import Notification
 
 
@@ -16,6 +17,8 @@ class NotificationSerializer(serializers.ModelSerializer):
             'type',
             'related_entity_id',
             'is_read',
+            'count',
             'created_at',
         ]
-        read_only_fields = ['id', 'recipient', 'recipient_role', 'created_at']
\ No newline at end of file
+        read_only_fields = ['id', 'recipient', 'recipient_role', 'created_at']
+        list_serializer_class = PlannedListSerializer
@@ -0,0 +1,58 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from . import counters, push
+from .models import Notification
+from .utils import invalidate_admin_recipients
+
+User = get_user_model()
+
+
+@receiver(post_init, sender=User, dispatch_uid='notifications_remember_role')
+def remember_role(sender, instance, **kwargs):
+    if 'role' not in instance.get_deferred_fields():
+        instance._loaded_role = instance.role
+
+
+@receiver(post_save, sender=User, dispatch_uid='notifications_role_saved')
+def role_saved(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_loaded_role', 'admin')
+    if 'admin' in (previous, instance.role):
+        invalidate_admin_recipients()
+    instance._loaded_role = instance.role
+
+
+@receiver(post_delete, sender=User, dispatch_uid='notifications_role_deleted')
+def user_deleted(sender, instance, **kwargs):
+    if getattr(instance, '_loaded_role', 'admin') == 'admin':
+        invalidate_admin_recipients()
+
+
+# Unread counters and live push ---------------------------------------------
+
+@receiver(post_init, sender=Notification, dispatch_uid='notifications_remember_read')
+def remember_read(sender, instance, **kwargs):
+    if 'is_read' not in instance.get_deferred_fields():
+        instance._loaded_is_read = instance.is_read
+
+
+@receiver(post_save, sender=Notification, dispatch_uid='notifications_saved')
+def notification_saved(sender, instance, created, **kwargs):
+    previous = False if created else getattr(instance, '_loaded_is_read', None)
+    instance._loaded_is_read = instance.is_read
+    if previous is None or previous == instance.is_read:
+        count = None
+    else:
+        count = counters.adjust(instance.recipient_id, -1 if instance.is_read else 1)
+
+    if created:
+        push.push_notification(instance, count)
+    else:
+        push.push_unread_count(instance.recipient_id, count)
+
+
+@receiver(post_delete, sender=Notification, dispatch_uid='notifications_deleted')
+def notification_deleted(sender, instance, **kwargs):
+    if getattr(instance, '_loaded_is_read', True) is False:
+        push.push_unread_count(instance.recipient_id, counters.adjust(instance.recipient_id, -1))
@@ -1,5 +1,11 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from . import counters, retention
 from .models import Notification
+from .serializers import NotificationSerializer
+from .utils import create_notification, get_admin_recipient_ids, notify_admins
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -43,4 +49,121 @@ class NotificationViewTest(TestCase):
         })
         self.assertEqual(response.status_code, 201)
         self.assertEqual(Notification.objects.count(), 1)
-        self.assertEqual(Notification.objects.get().message, 'New notification')
\ No newline at end of file
+        self.assertEqual(Notification.objects.get().message, 'New notification')
+
+
+class BulkNotificationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for i in range(3):
+            User.objects.create_user(
+                email=f'admin{i}@example.com', password='testpassword', role='admin'
+            )
+
+    def test_notify_admins_is_a_single_insert(self):
+        get_admin_recipient_ids()
+        with self.assertNumQueries(1):
+            notify_admins('New pet submitted', 'Pet needs review', notif_type='pet', related_id='abc')
+        self.assertEqual(Notification.objects.filter(recipient_role='admin', type='pet').count(), 3)
+
+    def test_role_change_invalidates_admin_recipients(self):
+        self.assertEqual(len(get_admin_recipient_ids()), 3)
+        user = User.objects.create_user(email='promoted@example.com', password='testpassword')
+        user.role = 'admin'
+        user.save()
+        self.assertEqual(len(get_admin_recipient_ids()), 4)
+
+
+class UnreadCounterTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        counters.cache.clear()
+        self.user = User.objects.create_user(email='reader@example.com', password='testpassword')
+        self.client.force_authenticate(self.user)
+
+    def unread_count(self):
+        response = self.client.get(reverse('notification-unread-count'))
+        self.assertEqual(response.status_code, 200)
+        return response.data['unread_count']
+
+    def test_counter_follows_writes_without_count_queries(self):
+        self.assertEqual(self.unread_count(), 0)
+        create_notification(self.user, 'One', 'First')
+        create_notification(self.user, 'Two', 'Second')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.unread_count(), 2)
+
+        notification = Notification.objects.filter(recipient=self.user).first()
+        self.client.put(reverse('notification-read', args=[notification._id]))
+        self.assertEqual(self.unread_count(), 1)
+
+        self.client.put(reverse('notification-read-all'))
+        self.assertEqual(self.unread_count(), 0)
+
+
+class RetentionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        counters.cache.clear()
+        self.user = User.objects.create_user(email='retained@example.com', password='testpassword')
+
+    def test_expiry_follows_read_state(self):
+        notification = Notification.objects.create(recipient=self.user, title='Hi', message='There')
+        self.assertEqual((notification.expires_at - notification.created_at).days, 90)
+        notification.is_read = True
+        notification.save()
+        self.assertEqual((notification.expires_at - notification.created_at).days, 30)
+
+    def test_compaction_keeps_newest_with_count(self):
+        for i in range(3):
+            create_notification(self.user, 'Report updated', f'Update {i}', notif_type='report', related_id='r1')
+        create_notification(self.user, 'Other', 'Unrelated', notif_type='report', related_id='r2')
+
+        self.assertEqual(retention.compact(), 2)
+        kept = Notification.objects.get(related_entity_id='r1')
+        self.assertEqual(kept.message, 'Update 2')
+        self.assertEqual(kept.count, 3)
+        self.assertEqual(Notification.objects.count(), 2)
+
+    def test_archive_exports_then_removes_expiring_notifications(self):
+        import gzip
+        import tempfile
+        from datetime import timedelta
+        from django.utils import timezone
+
+        old = Notification.objects.create(recipient=self.user, title='Old', message='Expiring')
+        Notification.objects.filter(pk=old.pk).update(expires_at=timezone.now() - timedelta(hours=1))
+        Notification.objects.create(recipient=self.user, title='New', message='Fresh')
+
+        with tempfile.TemporaryDirectory() as directory:
+            path, archived = retention.archive(directory=directory)
+            self.assertEqual(archived, 1)
+            with gzip.open(path, 'rt') as archive_file:
+                self.assertIn('Expiring', archive_file.read())
+        self.assertEqual(list(Notification.objects.values_list('title', flat=True)), ['New'])
+
+
+
+class NotificationPlanTests(SimpleTestCase):
+    def test_plan_matches_drf_for_instances_and_rows(self):
+        from datetime import datetime
+        from bson import ObjectId
+        from django.utils import timezone
+        from rest_framework.serializers import ListSerializer
+        from petrescue_backend.serializer_plans import plan_for
+
+        recipient = User(_id=ObjectId(), email='r@example.com')
+        created = timezone.make_aware(datetime(2025, 1, 2, 3, 4, 5), timezone.utc)
+        notifications = [
+            Notification(_id=str(ObjectId()), recipient=recipient, title=f'N{i}', message='Hello',
+                         type='pet', is_read=bool(i), count=i + 1, created_at=created)
+            for i in range(2)
+        ]
+        rows = [{column: getattr(n, column) for column in plan_for(NotificationSerializer).columns}
+                for n in notifications]
+        expected = [list(item.items()) for item in ListSerializer(notifications, child=NotificationSerializer()).data]
+
+        for source in (notifications, rows):
+            data = NotificationSerializer(source, many=True).data
+            self.assertEqual([list(item.items()) for item in data], expected)
+        self.assertEqual(expected[0][1], ('recipient', recipient._id))
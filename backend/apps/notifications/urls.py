@@ -3,10 +3,12 @@ from .views import (
     NotificationListView,
     NotificationMarkReadView,
     NotificationMarkAllReadView,
+    NotificationUnreadCountView,
 )
 
 urlpatterns = [
     path('', NotificationListView.as_view(), name='notification-list'),
     path('<str:pk>/read/', NotificationMarkReadView.as_view(), name='notification-read'),
     path('read-all/', NotificationMarkAllReadView.as_view(), name='notification-read-all'),
+    path('unread-count/', NotificationUnreadCountView.as_view(), name='notification-unread-count'),
 ]
@@ -1,9 +1,14 @@
+from bson import ObjectId
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from .models import Notification
 
 
 User = get_user_model()
 
+ADMIN_RECIPIENTS_CACHE_KEY = 'notifications:admin_recipients'
+
 
 def create_notification(recipient: User, title: str, message: str, *, notif_type='system', related_id=''):
     """
@@ -20,3 +25,99 @@ def create_notification(recipient: User, title: str, message: str, *, notif_type
         )
 
 
+def create_notifications_bulk(recipients, title: str, message: str, *, notif_type='system',
+                              related_id='', recipient_role=None):
+    """
+    Create the same notification for many users with a single insert.
+
+    ``recipients`` may mix User instances and user ids. ``recipient_role``
+    defaults to each instance's role ('user' for bare ids). Returns the
+    created notifications.
+    """
+    if not (recipients and title and message):
+        return []
+
+    notifications = []
+    for recipient in recipients:
+        if isinstance(recipient, User):
+            recipient_id, role = recipient.pk, getattr(recipient, 'role', 'user')
+        else:
+            recipient_id, role = recipient, 'user'
+        notifications.append(Notification(
+            _id=str(ObjectId()),
+            recipient_id=recipient_id,
+            recipient_role=recipient_role or role,
+            title=title,
+            message=message,
+            type=notif_type,
+            related_entity_id=related_id or '',
+        ))
+        notifications[-1].expires_at = notifications[-1].compute_expiry()
+
+    Notification.objects.bulk_create(notifications)
+
+    # bulk_create skips post_save, so update counters and push directly
+    from apps.admin_panel import stats as dashboard_stats
+    from . import counters, push
+    dashboard_stats.adjust({'total_notifications': len(notifications)})
+    for notification in notifications:
+        push.push_notification(notification, counters.adjust(notification.recipient_id, 1))
+    return notifications
+
+
+def get_admin_recipient_ids():
+    """
+    Ids of all admin users. Cached until a user gains or loses the admin
+    role in this process (see signals.py), and for at most
+    ``ADMIN_RECIPIENTS_CACHE_TIMEOUT`` seconds so role changes made in other
+    processes, or by paths that skip signals, are picked up too.
+    """
+    admin_ids = cache.get(ADMIN_RECIPIENTS_CACHE_KEY)
+    if admin_ids is None:
+        admin_ids = list(User.objects.filter(role='admin').values_list('_id', flat=True))
+        cache.set(ADMIN_RECIPIENTS_CACHE_KEY, admin_ids, timeout=settings.ADMIN_RECIPIENTS_CACHE_TIMEOUT)
+    return admin_ids
+
+
+def invalidate_admin_recipients():
+    cache.delete(ADMIN_RECIPIENTS_CACHE_KEY)
+
+
+def notify_admins(title: str, message: str, *, notif_type='system', related_id=''):
+    """Fan a notification out to every admin with one insert."""
+    return create_notifications_bulk(
+        get_admin_recipient_ids(),
+        title,
+        message,
+        notif_type=notif_type,
+        related_id=related_id,
+        recipient_role='admin',
+    )
+
+
+def enqueue_notification(recipient: User, title: str, message: str, *, notif_type='system', related_id=''):
+    """Queue ``create_notification`` as a background job."""
+    if not (recipient and title and message):
+        return None
+    from apps.jobs.queue import enqueue
+    return enqueue(
+        'notifications.create',
+        recipient_id=str(recipient.pk),
+        recipient_role=getattr(recipient, 'role', 'user'),
+        title=title,
+        message=message,
+        notif_type=notif_type,
+        related_id=str(related_id or ''),
+    )
+
+
+def enqueue_admin_notification(title: str, message: str, *, notif_type='system', related_id=''):
+    """Queue ``notify_admins`` as a background job."""
+    from apps.jobs.queue import enqueue
+    return enqueue(
+        'notifications.notify_admins',
+        title=title,
+        message=message,
+        notif_type=notif_type,
+        related_id=str(related_id or ''),
+    )
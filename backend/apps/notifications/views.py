@@ -1,20 +1,35 @@
+from django.conf import settings
 from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from petrescue_backend.conditional import ConditionalGetMixin
+from petrescue_backend.pagination import KeysetCursorPagination
+from petrescue_backend.serializer_plans import PlannedListMixin
+from . import counters, push, repository, retention
 from .models import Notification
 from .serializers import NotificationSerializer
 
 
-class NotificationListView(generics.ListAPIView):
+class NotificationListView(ConditionalGetMixin, PlannedListMixin, generics.ListAPIView):
     """
     GET /api/notifications/ - list notifications for current user
     """
     serializer_class = NotificationSerializer
+    pagination_class = KeysetCursorPagination
     permission_classes = [IsAuthenticated]
 
+    def get_validator_filter(self):
+        return {'recipient_id': self.request.user.pk}
+
     def get_queryset(self):
         return Notification.objects.filter(recipient=self.request.user).order_by('-created_at')
 
+    def list(self, request, *args, **kwargs):
+        if not settings.MONGO_NATIVE_READS:
+            return super().list(request, *args, **kwargs)
+        page = repository.notification_page(self.paginator, request, self, request.user.pk)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
 
 class NotificationMarkReadView(generics.UpdateAPIView):
     """
@@ -41,9 +56,22 @@ class NotificationMarkAllReadView(generics.GenericAPIView):
     permission_classes = [IsAuthenticated]
 
     def put(self, request):
-        Notification.objects.filter(recipient=request.user, is_read=False).update(is_read=True)
+        retention.mark_all_read(request.user.pk)
+        # Bulk update bypasses the signals; every notification is read now
+        counters.reset(request.user.pk, 0)
+        push.push_unread_count(request.user.pk, 0)
         return Response({'status': 'ok'})
 
+
+class NotificationUnreadCountView(generics.GenericAPIView):
+    """
+    GET /api/notifications/unread-count/ - served from a cached counter
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({'unread_count': counters.unread_count(request.user.pk)})
+
 from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 from .models import Notification
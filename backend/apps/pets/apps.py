@@ -3,4 +3,8 @@ from django.apps import AppConfig
 
 class PetsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'apps.pets'
\ No newline at end of file
+    name = 'apps.pets'
+
+    def ready(self):
+        from . import signals
+        signals.connect()
@@ -0,0 +1,27 @@
+"""Background tasks for pets (see apps/jobs)."""
+from apps.jobs.queue import enqueue, task
+from . import media
+from .media import THUMBNAIL_SIZES, make_thumbnails
+from .models import PetPhoto
+
+
+@task('pets.thumbnails')
+def generate_photo_thumbnails(photo_id):
+    """Render a photo's thumbnails and copy the small one onto its pet."""
+    photo = PetPhoto.objects.select_related('pet').filter(pk=photo_id).first()
+    if photo is None:
+        return
+    photo.thumbnails = make_thumbnails(photo.image_url)
+    photo.save(update_fields=['thumbnails'])
+
+    if photo.is_primary:
+        pet = photo.pet
+        pet.primary_thumbnail = photo.thumbnails[str(min(THUMBNAIL_SIZES))]
+        pet.save(update_fields=['primary_thumbnail', 'updated_at'])
+
+
+@task('media.collect')
+def collect_media(url):
+    """Remove an unreferenced blob, retrying while it was recently touched."""
+    if media.collect(url) is None:
+        enqueue('media.collect', delay=media.GC_GRACE_SECONDS, url=url)
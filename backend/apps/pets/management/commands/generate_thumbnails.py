@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from apps.jobs.queue import enqueue
+from apps.pets.models import PetPhoto
+
+
+class Command(BaseCommand):
+    help = 'Queue thumbnail generation for pet photos that have none yet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Regenerate thumbnails for every photo.')
+
+    def handle(self, *args, **options):
+        photos = PetPhoto.objects.values_list('_id', 'thumbnails')
+        queued = 0
+        for photo_id, thumbnails in photos.iterator(chunk_size=2000):
+            if thumbnails and not options['all']:
+                continue
+            enqueue('pets.thumbnails', photo_id=photo_id)
+            queued += 1
+        self.stdout.write(self.style.SUCCESS(f'Queued {queued} thumbnail job(s).'))
@@ -0,0 +1,281 @@
+"""
+Content-addressed storage and thumbnail generation for pet images.
+
+Uploads are streamed chunk by chunk into a temporary file while being
+hashed, then renamed to ``MEDIA_ROOT/cas/ab/cd/<sha256>.<ext>``. Identical
+images are therefore stored once, names never collide, and a URL's bytes
+never change, which is what makes the immutable cache headers on
+``/media/cas/`` safe.
+
+``MediaBlob`` documents count the ``PetPhoto`` rows and ``PetReport.images``
+entries pointing at each blob (kept up to date by ``signals.py``). When a
+count drops to zero a ``media.collect`` job removes the file and its
+thumbnails after ``MEDIA_GC_GRACE_SECONDS``, unless it gained a reference
+or was re-uploaded in the meantime.
+
+Thumbnails are rendered by the ``pets.thumbnails`` background job (see
+``jobs.py``) as WebP files next to the original, one per entry in
+``PET_THUMBNAIL_SIZES`` (longest edge, in pixels).
+"""
+import binascii
+import glob
+import hashlib
+import os
+import tempfile
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.utils import timezone
+from PIL import Image, ImageOps
+from pymongo import ReturnDocument
+
+from petrescue_backend.mongo import get_collection
+from .models import MediaBlob
+
+THUMBNAIL_SIZES = tuple(getattr(settings, 'PET_THUMBNAIL_SIZES', (200, 600)))
+THUMBNAIL_QUALITY = getattr(settings, 'PET_THUMBNAIL_QUALITY', 80)
+THUMBNAIL_DIR = 'thumbs'
+
+CAS_DIR = 'cas'
+GC_GRACE_SECONDS = getattr(settings, 'MEDIA_GC_GRACE_SECONDS', 3600)
+
+# Base64 characters decoded per step; a multiple of 4 keeps steps aligned
+BASE64_CHUNK_CHARS = 64 * 1024
+_WHITESPACE = {ord(c): None for c in ' \t\r\n'}
+
+
+class ImageRejected(ValueError):
+    """An uploaded image is malformed, of a disallowed type or too large."""
+
+
+def sniff_image_type(head):
+    """Return the file extension for an image's leading bytes, or ``None``."""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+class UploadBudget:
+    """Per-image and per-request limits on decoded upload bytes."""
+
+    def __init__(self, per_image=None, per_request=None):
+        self.per_image = per_image or getattr(settings, 'IMAGE_UPLOAD_MAX_BYTES', 5 * 1024 * 1024)
+        self.per_request = per_request or getattr(settings, 'IMAGE_UPLOAD_MAX_REQUEST_BYTES', 20 * 1024 * 1024)
+        self.used = 0
+
+    def charge(self, size, image_size=None):
+        """Account ``size`` more bytes; ``image_size`` is the image total so far."""
+        if (image_size if image_size is not None else size) > self.per_image:
+            raise ImageRejected(f'Image exceeds {self.per_image} bytes.')
+        if self.used + size > self.per_request:
+            raise ImageRejected(f'Images exceed {self.per_request} bytes in total.')
+        self.used += size
+
+
+def media_url(*parts):
+    return settings.MEDIA_URL.rstrip('/') + '/' + '/'.join(parts)
+
+
+def media_path(url):
+    """Filesystem path of a ``MEDIA_URL``-relative URL."""
+    relative = url[len(settings.MEDIA_URL):] if url.startswith(settings.MEDIA_URL) else url.lstrip('/')
+    return os.path.join(settings.MEDIA_ROOT, *relative.split('/'))
+
+
+def blob_url(digest, ext):
+    return media_url(CAS_DIR, digest[:2], digest[2:4], f'{digest}.{ext}')
+
+
+def blob_digest(url):
+    """The SHA-256 of a content-addressed URL, or ``None`` for other URLs."""
+    prefix = media_url(CAS_DIR) + '/'
+    if not isinstance(url, str) or not url.startswith(prefix):
+        return None
+    return os.path.splitext(url.rsplit('/', 1)[-1])[0]
+
+
+def _store(chunks, budget=None):
+    """Write ``chunks`` to the content-addressed store and return the URL."""
+    directory = os.path.join(settings.MEDIA_ROOT, CAS_DIR)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.part')
+    sha256 = hashlib.sha256()
+    written = 0
+    ext = None
+    try:
+        with os.fdopen(fd, 'wb') as destination:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                if ext is None:
+                    ext = sniff_image_type(chunk)
+                    if ext is None:
+                        raise ImageRejected('Unsupported image format.')
+                if budget is not None:
+                    budget.charge(len(chunk), written + len(chunk))
+                sha256.update(chunk)
+                destination.write(chunk)
+                written += len(chunk)
+        if ext is None:
+            raise ImageRejected('Empty image.')
+
+        url = blob_url(sha256.hexdigest(), ext)
+        target = media_path(url)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.exists(target):
+            # Already stored; refresh the mtime so a pending collect keeps it
+            os.utime(target)
+            os.unlink(temp_path)
+        else:
+            os.replace(temp_path, target)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    return url
+
+
+def save_upload(upload, budget=None):
+    """Stream an ``UploadedFile`` into the store and return its URL."""
+    return _store(upload.chunks(), budget)
+
+
+def _decode_base64(data, start):
+    carry = ''
+    for offset in range(start, len(data), BASE64_CHUNK_CHARS):
+        piece = carry + data[offset:offset + BASE64_CHUNK_CHARS].translate(_WHITESPACE)
+        usable = len(piece) - len(piece) % 4
+        carry = piece[usable:]
+        try:
+            yield binascii.a2b_base64(piece[:usable].encode('ascii'), strict_mode=True)
+        except (binascii.Error, UnicodeEncodeError):
+            raise ImageRejected('Invalid base64 data.')
+    if carry:
+        raise ImageRejected('Truncated base64 data.')
+
+
+def save_base64_image(data_uri, budget):
+    """
+    Decode a ``data:image/...;base64,`` URI into the store and return its URL.
+
+    The payload is decoded ``BASE64_CHUNK_CHARS`` at a time straight to
+    disk, so memory stays bounded however large the image is. The first
+    chunk must carry a known image signature; the extension comes from it,
+    never from the client's declared type. Raises ``ImageRejected``.
+    """
+    marker = data_uri.find(';base64,', 0, 100)
+    if not data_uri.startswith('data:image/') or marker < 0:
+        raise ImageRejected('Expected a base64 data:image URI.')
+    start = marker + len(';base64,')
+
+    # Upper bound of the decoded size, checked before anything is written
+    if (len(data_uri) - start) * 3 // 4 - 2 > budget.per_image:
+        raise ImageRejected(f'Image exceeds {budget.per_image} bytes.')
+    return _store(_decode_base64(data_uri, start), budget)
+
+
+# Reference counting ---------------------------------------------------------
+
+def retain(urls):
+    """Count one more reference to each content-addressed URL."""
+    collection = get_collection(MediaBlob)
+    for url, count in Counter(urls).items():
+        digest = blob_digest(url)
+        if digest is None:
+            continue
+        collection.update_one(
+            {'_id': digest},
+            {'$inc': {'refs': count}, '$setOnInsert': {'url': url, 'created_at': timezone.now()}},
+            upsert=True,
+        )
+
+
+def release(urls):
+    """Drop references; blobs left unreferenced are scheduled for collection."""
+    collection = get_collection(MediaBlob)
+    unreferenced = []
+    for url, count in Counter(urls).items():
+        digest = blob_digest(url)
+        if digest is None:
+            continue
+        doc = collection.find_one_and_update(
+            {'_id': digest}, {'$inc': {'refs': -count}}, return_document=ReturnDocument.AFTER,
+        )
+        if doc is None or doc['refs'] <= 0:
+            unreferenced.append(url)
+    discard(unreferenced)
+
+
+def discard(urls):
+    """Schedule collection of blobs that may have no references."""
+    from apps.jobs.queue import enqueue
+    for url in set(urls):
+        if blob_digest(url) is not None:
+            enqueue('media.collect', delay=GC_GRACE_SECONDS, url=url)
+
+
+def collect(url):
+    """
+    Delete an unreferenced blob and its thumbnails. Returns ``False`` when
+    the blob is still in use, ``None`` when it was touched too recently to
+    decide yet, ``True`` once removed.
+    """
+    digest = blob_digest(url)
+    collection = get_collection(MediaBlob)
+    doc = collection.find_one({'_id': digest})
+    if doc is not None and doc['refs'] > 0:
+        return False
+
+    path = media_path(url)
+    try:
+        if time.time() - os.path.getmtime(path) < GC_GRACE_SECONDS:
+            return None
+    except OSError:
+        pass
+
+    collection.delete_one({'_id': digest, 'refs': {'$lte': 0}})
+    directory = os.path.dirname(path)
+    for stale in [path] + glob.glob(os.path.join(directory, THUMBNAIL_DIR, f'{digest}_*.webp')):
+        try:
+            os.remove(stale)
+        except OSError:
+            pass
+    return True
+
+
+# Thumbnails -----------------------------------------------------------------
+
+def make_thumbnails(image_url, sizes=THUMBNAIL_SIZES):
+    """
+    Render WebP thumbnails for a stored image. Returns ``{str(size): url}``.
+    Thumbnails that already exist (e.g. for a deduplicated blob) are reused.
+    """
+    source = media_path(image_url)
+    subdir, file_name = image_url[len(settings.MEDIA_URL):].rsplit('/', 1)
+    stem = os.path.splitext(file_name)[0]
+    target_dir = os.path.join(settings.MEDIA_ROOT, subdir, THUMBNAIL_DIR)
+    os.makedirs(target_dir, exist_ok=True)
+
+    names = {size: f'{stem}_{size}.webp' for size in sizes}
+    thumbnails = {str(size): media_url(subdir, THUMBNAIL_DIR, name) for size, name in names.items()}
+    if all(os.path.exists(os.path.join(target_dir, name)) for name in names.values()):
+        return thumbnails
+
+    with Image.open(source) as original:
+        # Let JPEG decode at a reduced scale; much cheaper for large photos
+        original.draft('RGB', (max(sizes), max(sizes)))
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+        # Largest first so each step downsamples an already smaller image
+        for size in sorted(sizes, reverse=True):
+            image.thumbnail((size, size), Image.LANCZOS)
+            image.save(os.path.join(target_dir, names[size]), 'WEBP', quality=THUMBNAIL_QUALITY, method=4)
+    return thumbnails
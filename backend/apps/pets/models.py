@@ -29,6 +29,8 @@ class Pet(models.Model):
     status = models.CharField(max_length=20, default='available')
     location = models.CharField(max_length=255)
     images = models.JSONField()  # Store image URLs in a JSON field
+    # Small WebP of the primary photo, copied here so list pages need no join
+    primary_thumbnail = models.CharField(max_length=500, blank=True, default='')
     created_by = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -39,6 +41,15 @@ class Pet(models.Model):
     special_notes = models.TextField(blank=True, default='')
     is_approved = models.BooleanField(default=True)
 
+    # Native Mongo indexes Meta.indexes cannot express (see ensure_indexes)
+    mongo_indexes = [
+        (
+            'pet_text_idx',
+            [('name', 'text'), ('breed', 'text'), ('description', 'text')],
+            {'weights': {'name': 10, 'breed': 5, 'description': 1}},
+        ),
+    ]
+
     @property
     def id(self):
         """Return _id as id for compatibility"""
@@ -53,6 +64,18 @@ class Pet(models.Model):
     def __str__(self):
         return self.name
 
+    class Meta:
+        indexes = [
+            # Keyset pagination order for the public pet list
+            models.Index(fields=['-created_at', '-_id'], name='pet_created_idx'),
+            models.Index(fields=['created_by', '-created_at'], name='pet_owner_created_idx'),
+            models.Index(fields=['status', 'pet_type', '-created_at'], name='pet_status_type_idx'),
+            # Match feature store catch-up (apps/matches/feature_store.py)
+            models.Index(fields=['updated_at'], name='pet_updated_idx'),
+            # Conditional GET validators (petrescue_backend/conditional.py)
+            models.Index(fields=['created_by', '-updated_at'], name='pet_owner_updated_idx'),
+        ]
+
 
 class PetReport(models.Model):
     STATUS_CHOICES = [
@@ -99,6 +122,14 @@ class PetReport(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at', '-_id'], name='report_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='report_status_created_idx'),
+            models.Index(fields=['created_by', '-created_at'], name='report_owner_created_idx'),
+            # Conditional GET validators (petrescue_backend/conditional.py)
+            models.Index(fields=['created_by', '-updated_at'], name='report_owner_updated_idx'),
+            models.Index(fields=['-updated_at'], name='report_updated_idx'),
+        ]
 
 
 class PetPhoto(models.Model):
@@ -106,6 +137,8 @@ class PetPhoto(models.Model):
     pet = models.ForeignKey(Pet, related_name='photos', on_delete=models.CASCADE)
     image_url = models.CharField(max_length=500)
     is_primary = models.BooleanField(default=False)
+    # {"200": url, "600": url}; filled in by the pets.thumbnails job
+    thumbnails = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     @property
@@ -120,6 +153,26 @@ class PetPhoto(models.Model):
     def __str__(self):
         return f"{self.pet.name} - {self.image_url}"
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['pet', 'is_primary'], name='photo_pet_idx'),
+        ]
+
+
+class MediaBlob(models.Model):
+    """
+    Reference count for a content-addressed media file (see media.py).
+    ``_id`` is the file's SHA-256; documents are maintained with atomic
+    pymongo updates rather than through the ORM.
+    """
+    _id = models.CharField(max_length=64, primary_key=True, db_column='_id')
+    url = models.CharField(max_length=500)
+    refs = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.url} ({self.refs})"
+
 
 class AdoptionRequest(models.Model):
     STATUS_CHOICES = [
@@ -134,6 +187,7 @@ class AdoptionRequest(models.Model):
     message = models.TextField(blank=True, default='')
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True)
 
     @property
     def id(self):
@@ -147,6 +201,18 @@ class AdoptionRequest(models.Model):
     def __str__(self):
         return f"{self.pet.name} - {self.requester.email} - {self.status}"
 
+    class Meta:
+        indexes = [
+            # Duplicate-pending check and bulk rejection on approval
+            models.Index(fields=['pet', 'requester', 'status'], name='adoption_pet_req_status_idx'),
+            models.Index(fields=['pet', '-created_at'], name='adoption_pet_created_idx'),
+            models.Index(fields=['requester', '-created_at'], name='adoption_req_created_idx'),
+            models.Index(fields=['-created_at', '-_id'], name='adoption_created_idx'),
+            # Conditional GET validators (petrescue_backend/conditional.py)
+            models.Index(fields=['pet', '-updated_at'], name='adoption_pet_updated_idx'),
+            models.Index(fields=['requester', '-updated_at'], name='adoption_req_updated_idx'),
+        ]
+
 
 class Review(models.Model):
     _id = models.CharField(max_length=24, primary_key=True, db_column='_id')
@@ -166,4 +232,11 @@ class Review(models.Model):
         super().save(*args, **kwargs)
 
     def __str__(self):
-        return f"{self.pet.name} - {self.user.email} - {self.rating}"
\ No newline at end of file
+        return f"{self.pet.name} - {self.user.email} - {self.rating}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['pet', '-created_at'], name='review_pet_created_idx'),
+            models.Index(fields=['pet', 'user'], name='review_pet_user_idx'),
+            models.Index(fields=['-created_at', '-_id'], name='review_created_idx'),
+        ]
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""
+Native PyMongo reads for the busiest public pet endpoints.
+
+djongo renders every ORM query to SQL and parses it back before building
+the Mongo query. These functions skip that: they issue ``find`` calls
+with projections limited to what the serializers render, and return
+``Row``s holding the same values the ORM would have loaded. The existing
+serializers therefore produce identical output. Owners and reviewers are
+batch-loaded from ``apps.users.repository``.
+"""
+from petrescue_backend.mongo import RowLoader, get_collection
+from apps.users.repository import attach_users, users_by_id
+from .models import Pet, PetPhoto, Review
+
+# Fields PetSearchSerializer reads, plus the keyset pagination keys
+pet_list_rows = RowLoader(Pet, [
+    'name', 'pet_type', 'breed', 'status', 'primary_thumbnail', 'images', 'location',
+    'age', 'description', 'is_approved', 'created_by', 'created_at',
+])
+pet_rows = RowLoader(Pet)
+photo_rows = RowLoader(PetPhoto)
+review_rows = RowLoader(Review)
+
+
+def pet_list_page(paginator, request, view):
+    """The keyset page of pets ``PetListView`` shows, owners attached."""
+    def fetch(seek, sort, limit):
+        docs = get_collection(Pet).find(seek or {}, pet_list_rows.projection).sort(sort).limit(limit)
+        return pet_list_rows.load(docs)
+
+    return attach_users(paginator.paginate_documents(fetch, request, view=view), 'created_by')
+
+
+def pet_detail(pk):
+    """One pet with its owner, photos and reviews (newest first), or ``None``."""
+    doc = get_collection(Pet).find_one({'_id': pk}, pet_rows.projection)
+    if doc is None:
+        return None
+    pet = pet_rows(doc)
+    pet['photos'] = photo_rows.load(get_collection(PetPhoto).find({'pet_id': pk}, photo_rows.projection))
+    pet['reviews'] = review_rows.load(
+        get_collection(Review).find({'pet_id': pk}, review_rows.projection).sort([('created_at', -1)])
+    )
+    # Owner and reviewers in one lookup
+    users = users_by_id([pet['created_by_id']] + [review['user_id'] for review in pet['reviews']])
+    pet['created_by'] = users.get(pet['created_by_id'])
+    for review in pet['reviews']:
+        review['user'] = users.get(review['user_id'])
+    return pet
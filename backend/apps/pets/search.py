@@ -0,0 +1,134 @@
+"""
+Pet search backed by the Mongo text index on name/breed/description.
+
+Each page of pet ids is an indexed ``find``: the filter, the keyset seek,
+a sort on ``(created_at, _id)`` and a limit. The total match count and
+facet counts come from a separate aggregation over the whole match. Its
+result is cached per filter under the current ``pets`` response-cache
+version, so only the first page of a search pays for it, and any pet
+write starts a fresh count. Clients therefore no longer download every
+pet to filter locally.
+"""
+import hashlib
+import re
+
+from bson import json_util
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import ValidationError
+
+from petrescue_backend import response_cache
+from petrescue_backend.mongo import get_collection
+from .models import Pet
+
+SUMMARY_CACHE_PREFIX = 'pets:search:summary:'
+
+# Query param -> stored field; comma-separated values match any of them
+CHOICE_FILTERS = ('pet_type', 'size', 'gender', 'status')
+BOOLEAN_FILTERS = ('is_vaccinated', 'is_neutered')
+FACET_FIELDS = ('pet_type', 'size', 'gender', 'status', 'is_vaccinated')
+
+_TRUE = ('true', '1', 'yes', 'on')
+_FALSE = ('false', '0', 'no', 'off')
+
+
+def _int_param(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: 'Must be an integer.'})
+
+
+def build_filter(params):
+    """Translate search query params into a Mongo filter document."""
+    query = {}
+
+    text = (params.get('q') or '').strip()
+    if text:
+        query['$text'] = {'$search': text}
+
+    for field in CHOICE_FILTERS:
+        values = [v for v in (params.get(field) or '').split(',') if v]
+        if len(values) == 1:
+            query[field] = values[0]
+        elif values:
+            query[field] = {'$in': values}
+
+    for field in BOOLEAN_FILTERS:
+        value = (params.get(field) or '').lower()
+        if value in _TRUE:
+            query[field] = True
+        elif value in _FALSE:
+            query[field] = False
+        elif value:
+            raise ValidationError({field: 'Must be true or false.'})
+
+    age_min = _int_param(params, 'age_min')
+    age_max = _int_param(params, 'age_max')
+    if age_min is not None or age_max is not None:
+        query['age'] = {}
+        if age_min is not None:
+            query['age']['$gte'] = age_min
+        if age_max is not None:
+            query['age']['$lte'] = age_max
+
+    location = (params.get('location') or '').strip()
+    if location:
+        query['location'] = {'$regex': re.escape(location), '$options': 'i'}
+
+    return query
+
+
+def _facet_key(value):
+    # JSON object keys are strings; keep booleans as the query param spells them
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return value
+
+
+class PetSearch:
+    """
+    One search request. ``fetch`` has the signature the keyset paginator
+    expects and returns a page of ``{_id, created_at}`` documents.
+    ``summary()`` returns the total match count and the value counts for
+    ``FACET_FIELDS``.
+    """
+
+    def __init__(self, params):
+        self.query = build_filter(params)
+
+    def fetch(self, seek, sort, limit):
+        query = {'$and': [self.query, seek]} if seek else self.query
+        return list(
+            get_collection(Pet).find(query, {'_id': 1, 'created_at': 1}).sort(sort).limit(limit)
+        )
+
+    def summary_key(self):
+        version, = response_cache.tag_versions(['pets'])
+        raw = json_util.dumps(self.query, sort_keys=True) + version
+        return SUMMARY_CACHE_PREFIX + hashlib.sha1(raw.encode()).hexdigest()
+
+    def summary(self):
+        """``(count, facets)`` over every match, cached per filter."""
+        key = self.summary_key()
+        summary = cache.get(key)
+        if summary is None:
+            summary = self._aggregate_summary()
+            cache.set(key, summary, settings.PET_SEARCH_SUMMARY_TIMEOUT)
+        return summary
+
+    def _aggregate_summary(self):
+        facet = {'count': [{'$count': 'count'}]}
+        for field in FACET_FIELDS:
+            facet[field] = [{'$sortByCount': '$' + field}]
+        row = next(get_collection(Pet).aggregate([{'$match': self.query}, {'$facet': facet}]), {})
+
+        facets = {
+            field: {_facet_key(bucket['_id']): bucket['count'] for bucket in row.get(field, [])}
+            for field in FACET_FIELDS
+        }
+        count = row['count'][0]['count'] if row.get('count') else 0
+        return count, facets
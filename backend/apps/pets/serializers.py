@@ -2,6 +2,7 @@ from rest_framework import serializers
 from django.db import models
 from .models import Pet, PetReport, PetPhoto, AdoptionRequest, Review
 from apps.users.serializers import UserSerializer
+from petrescue_backend.serializer_plans import PlannedListSerializer
 
 
 class PetSerializer(serializers.ModelSerializer):
@@ -11,7 +12,9 @@ class PetSerializer(serializers.ModelSerializer):
     class Meta:
         model = Pet
         fields = '__all__'
-        read_only_fields = ['id', 'created_by', 'created_at', 'updated_at']
+        # primary_thumbnail is only set by the pets.thumbnails job
+        read_only_fields = ['id', 'created_by', 'created_at', 'updated_at', 'primary_thumbnail']
+        list_serializer_class = PlannedListSerializer
 
 
 class PetPhotoSerializer(serializers.ModelSerializer):
@@ -19,7 +22,7 @@ class PetPhotoSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = PetPhoto
-        fields = ['id', 'image_url', 'is_primary', 'created_at']
+        fields = ['id', 'image_url', 'thumbnails', 'is_primary', 'created_at']
 
 
 class PetDetailSerializer(serializers.ModelSerializer):
@@ -57,7 +60,11 @@ class PetDetailSerializer(serializers.ModelSerializer):
         ]
 
     def get_reviews(self, obj):
-        reviews = obj.reviews.all().order_by('-created_at')
+        if isinstance(obj, dict):
+            # Row from repository.pet_detail, reviews already loaded in order
+            reviews = obj['reviews']
+        else:
+            reviews = obj.reviews.all().prefetch_related('user').order_by('-created_at')
         return ReviewSerializer(reviews, many=True).data
 
 
@@ -82,8 +89,12 @@ class PetSearchSerializer(serializers.ModelSerializer):
             'is_approved',
             'created_by',
         ]
+        list_serializer_class = PlannedListSerializer
 
     def get_primary_image(self, obj):
+        # Prefer the small WebP; originals are only served until it is ready
+        if obj.primary_thumbnail:
+            return obj.primary_thumbnail
         if obj.images and isinstance(obj.images, list) and len(obj.images) > 0:
             return obj.images[0]
         return None
@@ -132,6 +143,11 @@ class PetReportCreateSerializer(serializers.ModelSerializer):
         fields = ['pet_name', 'pet_type', 'description', 'location_found', 'contact_info', 'images']
 
 
+# Relations rendered by AdoptionRequestSerializer; list views prefetch these so
+# each one costs a single IN query per page instead of one query per row.
+ADOPTION_REQUEST_PREFETCH = ('requester', 'pet', 'pet__created_by')
+
+
 class AdoptionRequestSerializer(serializers.ModelSerializer):
     id = serializers.CharField(source='_id', read_only=True)
     petitioner = UserSerializer(source='requester', read_only=True)
@@ -140,6 +156,7 @@ class AdoptionRequestSerializer(serializers.ModelSerializer):
     class Meta:
         model = AdoptionRequest
         fields = ['id', 'pet', 'petitioner', 'message', 'status', 'created_at']
+        list_serializer_class = PlannedListSerializer
 
 
 class AdoptionRequestCreateSerializer(serializers.ModelSerializer):
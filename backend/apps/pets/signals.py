@@ -0,0 +1,77 @@
+"""
+* Keep ``MediaBlob`` reference counts in step with the rows that point at
+  content-addressed files: one per ``PetPhoto.image_url`` and one per entry
+  of ``PetReport.images``.
+* Invalidate the cached public responses (see
+  ``petrescue_backend/response_cache.py``) that render a changed row.
+"""
+from collections import Counter
+
+from django.db.models.signals import post_init, post_save, post_delete
+
+from petrescue_backend import response_cache
+from . import media
+from .models import Pet, PetPhoto, PetReport, Review
+
+_REFS_ATTR = '_media_refs'
+
+MEDIA_FIELDS = {
+    PetPhoto: 'image_url',
+    PetReport: 'images',
+}
+
+
+def _media_urls(instance):
+    """URLs the instance references, or ``None`` if the field is deferred."""
+    field = MEDIA_FIELDS[type(instance)]
+    if field in instance.get_deferred_fields():
+        return None
+    value = getattr(instance, field)
+    if isinstance(value, list):
+        return [url for url in value if isinstance(url, str)]
+    return [value] if value else []
+
+
+def _remember_refs(sender, instance, **kwargs):
+    setattr(instance, _REFS_ATTR, _media_urls(instance))
+
+
+def _apply_save(sender, instance, created, **kwargs):
+    current = _media_urls(instance)
+    previous = [] if created else getattr(instance, _REFS_ATTR, None)
+    if current is None or previous is None:
+        return
+    media.retain(list((Counter(current) - Counter(previous)).elements()))
+    media.release(list((Counter(previous) - Counter(current)).elements()))
+    setattr(instance, _REFS_ATTR, current)
+
+
+def _apply_delete(sender, instance, **kwargs):
+    refs = getattr(instance, _REFS_ATTR, None)
+    if refs:
+        media.release(refs)
+
+
+# Response cache tags each model's rows appear under
+RESPONSE_CACHE_TAGS = {
+    Pet: lambda pet: ['pets', f'pet:{pet.pk}'],
+    PetPhoto: lambda photo: [f'pet:{photo.pet_id}'],
+    Review: lambda review: [f'pet:{review.pet_id}', f'reviews:{review.pet_id}'],
+    PetReport: lambda report: ['reports'],
+}
+
+
+def _invalidate_responses(sender, instance, **kwargs):
+    response_cache.invalidate(*RESPONSE_CACHE_TAGS[sender](instance))
+
+
+def connect():
+    for model in RESPONSE_CACHE_TAGS:
+        uid = f'response_cache_{model._meta.label_lower}'
+        post_save.connect(_invalidate_responses, sender=model, dispatch_uid=uid + '_save')
+        post_delete.connect(_invalidate_responses, sender=model, dispatch_uid=uid + '_delete')
+    for model in MEDIA_FIELDS:
+        uid = f'media_refs_{model._meta.label_lower}'
+        post_init.connect(_remember_refs, sender=model, dispatch_uid=uid + '_init')
+        post_save.connect(_apply_save, sender=model, dispatch_uid=uid + '_save')
+        post_delete.connect(_apply_delete, sender=model, dispatch_uid=uid + '_delete')
@@ -1,7 +1,29 @@
+import base64
+import hashlib
+import io
+import os
+import tempfile
+from unittest import mock
+from datetime import datetime
+from django.test import SimpleTestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APITestCase
-from .models import Pet
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.request import Request
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.test import APITestCase, APIRequestFactory
+from rest_framework.permissions import AllowAny
+from rest_framework.views import APIView
+from petrescue_backend import conditional, response_cache
+from petrescue_backend.pagination import KeysetCursorPagination
+from . import media
+from .media import ImageRejected, UploadBudget, make_thumbnails, save_base64_image
+from .search import build_filter
+from .models import Pet, AdoptionRequest, Review
+from . import repository
+from .serializers import PetSearchSerializer
+from .signals import RESPONSE_CACHE_TAGS
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -52,4 +74,479 @@ class PetTests(APITestCase):
         pet = Pet.objects.create(**self.pet_data)
         response = self.client.delete(reverse('pet-detail', args=[pet.id]), format='json')
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertEqual(Pet.objects.count(), 0)
\ No newline at end of file
+        self.assertEqual(Pet.objects.count(), 0)
+
+
+class KeysetCursorPaginationTests(SimpleTestCase):
+    def setUp(self):
+        self.paginator = KeysetCursorPagination()
+        self.paginator.ordering = ('-created_at', '-_id')
+        self.paginator.base_url = 'http://testserver/api/pets/all/'
+
+    def _request(self, query=''):
+        return Request(APIRequestFactory().get('/api/pets/all/' + query))
+
+    def test_cursor_round_trip(self):
+        created = datetime(2025, 1, 2, 3, 4, 5, 123000)
+        item = {'created_at': created, '_id': '65a1b2c3d4e5f60718293a4b'}
+        link = self.paginator.encode_cursor(item, reverse=True)
+        token = link.split('cursor=')[1]
+
+        position, reverse = self.paginator.decode_cursor(self._request('?cursor=' + token))
+        self.assertEqual(position, (created, '65a1b2c3d4e5f60718293a4b'))
+        self.assertTrue(reverse)
+
+    def test_invalid_cursor_is_not_found(self):
+        with self.assertRaises(NotFound):
+            self.paginator.decode_cursor(self._request('?cursor=not-a-cursor'))
+
+    def test_seek_filter_direction(self):
+        created = datetime(2025, 1, 2)
+        forward = str(self.paginator.build_seek_filter((created, 'abc')))
+        backward = str(self.paginator.build_seek_filter((created, 'abc'), reverse=True))
+        self.assertIn('created_at__lt', forward)
+        self.assertIn('_id__lt', forward)
+        self.assertIn('created_at__gt', backward)
+        self.assertIn('_id__gt', backward)
+
+    def test_page_size_is_capped(self):
+        request = self._request('?page_size=100000')
+        self.assertEqual(self.paginator.get_page_size(request), self.paginator.max_page_size)
+
+
+class ListQueryCountTests(APITestCase):
+    """Related users must be batch-loaded, not fetched once per row."""
+
+    def setUp(self):
+        self.owners = [
+            User.objects.create_user(email=f'owner{i}@example.com', password='testpassword')
+            for i in range(3)
+        ]
+        self.adopter = User.objects.create_user(email='adopter@example.com', password='testpassword')
+        self.admin = User.objects.create_user(
+            email='admin@example.com', password='testpassword', role='admin', is_staff=True
+        )
+        for i in range(12):
+            pet = Pet.objects.create(
+                name=f'Pet {i}',
+                pet_type='dog',
+                breed='Beagle',
+                color='Brown',
+                gender='male',
+                size='medium',
+                age=2,
+                description='Friendly',
+                location='Hyderabad',
+                images=[],
+                created_by=self.owners[i % len(self.owners)],
+            )
+            AdoptionRequest.objects.create(pet=pet, requester=self.adopter)
+
+    @override_settings(MONGO_NATIVE_READS=False)
+    def test_pet_list_query_count_is_independent_of_page_size(self):
+        for page_size in (3, 12):
+            # One ORM query for the page of pets, one batched lookup of owners
+            with self.assertNumQueries(2):
+                response = self.client.get(reverse('pet-list'), {'page_size': page_size})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['results']), page_size)
+
+    @override_settings(MONGO_NATIVE_READS=True)
+    def test_native_pet_list_finds_are_independent_of_page_size(self):
+        from apps.users import repository as user_repository
+        from petrescue_backend.mongo import get_collection
+
+        finds = []
+
+        def recording_collection(model):
+            collection = get_collection(model)
+            find = collection.find
+
+            def record(query=None, *args, **kwargs):
+                finds.append((collection.name, query))
+                return find(query, *args, **kwargs)
+            return mock.Mock(wraps=collection, find=record)
+
+        for page_size in (3, 12):
+            finds.clear()
+            with mock.patch.object(repository, 'get_collection', recording_collection), \
+                    mock.patch.object(user_repository, 'get_collection', recording_collection), \
+                    self.assertNumQueries(0):
+                response = self.client.get(reverse('pet-list'), {'page_size': page_size})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['results']), page_size)
+            # One find for the page of pets, one $in lookup of its owners
+            self.assertEqual([name for name, _ in finds], [Pet._meta.db_table, User._meta.db_table])
+            self.assertEqual(list(finds[1][1]['_id']), ['$in'])
+
+    def test_admin_adoption_list_query_count_is_independent_of_page_size(self):
+        self.client.force_authenticate(self.admin)
+        for page_size in (3, 12):
+            # Requests page, requesters, pets, pet owners
+            with self.assertNumQueries(4):
+                response = self.client.get(reverse('admin-adoptions'), {'page_size': page_size})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['results']), page_size)
+
+
+class PetSearchFilterTests(SimpleTestCase):
+    def test_text_and_filters(self):
+        query = build_filter({
+            'q': 'golden retriever',
+            'pet_type': 'dog,cat',
+            'size': 'large',
+            'is_vaccinated': 'true',
+            'age_min': '1',
+            'age_max': '5',
+            'location': 'New (York)',
+        })
+        self.assertEqual(query['$text'], {'$search': 'golden retriever'})
+        self.assertEqual(query['pet_type'], {'$in': ['dog', 'cat']})
+        self.assertEqual(query['size'], 'large')
+        self.assertIs(query['is_vaccinated'], True)
+        self.assertEqual(query['age'], {'$gte': 1, '$lte': 5})
+        self.assertEqual(query['location'], {'$regex': r'New\ \(York\)', '$options': 'i'})
+
+    def test_empty_params_match_everything(self):
+        self.assertEqual(build_filter({}), {})
+
+    def test_invalid_values_are_rejected(self):
+        with self.assertRaises(ValidationError):
+            build_filter({'age_min': 'two'})
+        with self.assertRaises(ValidationError):
+            build_filter({'is_vaccinated': 'maybe'})
+
+
+class PetSearchQueryTests(SimpleTestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+
+    def test_page_is_an_indexed_find_with_seek_sort_and_limit(self):
+        from .search import PetSearch
+
+        search = PetSearch({'pet_type': 'dog'})
+        seek = {'created_at': {'$lt': datetime(2025, 1, 1)}}
+        sort = [('created_at', -1), ('_id', -1)]
+        with mock.patch('apps.pets.search.get_collection') as get_collection:
+            search.fetch(seek, sort, 51)
+        collection = get_collection.return_value
+        collection.find.assert_called_once_with(
+            {'$and': [{'pet_type': 'dog'}, seek]}, {'_id': 1, 'created_at': 1},
+        )
+        collection.find.return_value.sort.assert_called_once_with(sort)
+        collection.find.return_value.sort.return_value.limit.assert_called_once_with(51)
+        collection.aggregate.assert_not_called()
+
+    def test_summary_is_aggregated_once_per_filter_until_pets_change(self):
+        from .search import PetSearch
+
+        row = {'count': [{'count': 2}], 'is_vaccinated': [{'_id': True, 'count': 2}]}
+        with mock.patch('apps.pets.search.get_collection') as get_collection:
+            aggregate = get_collection.return_value.aggregate
+            aggregate.side_effect = lambda pipeline: iter([row])
+            first = PetSearch({'pet_type': 'dog'}).summary()
+            self.assertEqual(PetSearch({'pet_type': 'dog'}).summary(), first)
+            self.assertEqual(aggregate.call_count, 1)
+
+            response_cache.invalidate('pets')
+            PetSearch({'pet_type': 'dog'}).summary()
+            self.assertEqual(aggregate.call_count, 2)
+        self.assertEqual(first[0], 2)
+        self.assertEqual(first[1]['is_vaccinated'], {'true': 2})
+
+
+class ThumbnailTests(SimpleTestCase):
+    def test_renders_webp_variants_bounded_by_size(self):
+        from PIL import Image
+
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            os.makedirs(os.path.join(media_root, 'pets'))
+            Image.new('RGB', (1600, 1200), 'orange').save(os.path.join(media_root, 'pets', 'a.jpg'))
+
+            thumbnails = make_thumbnails('/media/pets/a.jpg', sizes=(200, 600))
+
+            self.assertEqual(thumbnails, {
+                '200': '/media/pets/thumbs/a_200.webp',
+                '600': '/media/pets/thumbs/a_600.webp',
+            })
+            for size in (200, 600):
+                with Image.open(os.path.join(media_root, 'pets', 'thumbs', f'a_{size}.webp')) as thumb:
+                    self.assertEqual(thumb.format, 'WEBP')
+                    self.assertEqual(max(thumb.size), size)
+
+    def test_owners_cannot_set_the_primary_thumbnail(self):
+        from .serializers import PetSerializer
+        serializer = PetSerializer(Pet(name='Rex'), data={'primary_thumbnail': 'https://evil.example/x.png'}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertNotIn('primary_thumbnail', serializer.validated_data)
+
+
+class Base64ImageTests(SimpleTestCase):
+    def setUp(self):
+        from PIL import Image
+
+        buffer = io.BytesIO()
+        Image.new('RGB', (64, 64), 'teal').save(buffer, 'PNG')
+        self.png = buffer.getvalue()
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def data_uri(self, payload, mime='image/png'):
+        return f'data:{mime};base64,' + base64.b64encode(payload).decode('ascii')
+
+    def test_decodes_in_chunks_into_content_addressed_path(self):
+        digest = hashlib.sha256(self.png).hexdigest()
+        with mock.patch.object(media, 'BASE64_CHUNK_CHARS', 16):
+            # The declared type is ignored in favour of the magic bytes
+            url = save_base64_image(self.data_uri(self.png, 'image/x-evil'), UploadBudget())
+        self.assertEqual(url, f'/media/cas/{digest[:2]}/{digest[2:4]}/{digest}.png')
+        self.assertEqual(media.blob_digest(url), digest)
+        with open(media.media_path(url), 'rb') as f:
+            self.assertEqual(f.read(), self.png)
+
+    def test_identical_uploads_are_stored_once(self):
+        first = save_base64_image(self.data_uri(self.png), UploadBudget())
+        second = save_base64_image(self.data_uri(self.png), UploadBudget())
+        self.assertEqual(first, second)
+        shard = os.path.dirname(media.media_path(first))
+        self.assertEqual(os.listdir(shard), [os.path.basename(first)])
+
+    def test_rejects_unknown_format_without_leaving_files(self):
+        with self.assertRaises(ImageRejected):
+            save_base64_image(self.data_uri(b'<svg onload="x"></svg>'), UploadBudget())
+        self.assertEqual(os.listdir(os.path.join(self.media_root.name, 'cas')), [])
+
+    def test_rejects_invalid_base64(self):
+        with self.assertRaises(ImageRejected):
+            save_base64_image('data:image/png;base64,iVBO!!!!', UploadBudget())
+
+    def test_enforces_per_image_and_per_request_limits(self):
+        with self.assertRaises(ImageRejected):
+            save_base64_image(self.data_uri(self.png), UploadBudget(per_image=100))
+
+        budget = UploadBudget(per_image=len(self.png), per_request=len(self.png) * 3 // 2)
+        save_base64_image(self.data_uri(self.png), budget)
+        with self.assertRaises(ImageRejected):
+            save_base64_image(self.data_uri(self.png), budget)
+
+    def test_only_store_urls_are_reference_counted(self):
+        self.assertIsNone(media.blob_digest('/media/pets/legacy.jpg'))
+        self.assertIsNone(media.blob_digest(None))
+
+
+class ResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        response_cache.get_cache().clear()
+        self.renders = []
+
+        def handler(view, request, *args, **kwargs):
+            self.renders.append(request.query_params.get('page', ''))
+            return Response({'renders': len(self.renders)})
+
+        # The mixin's super().get() lands on this stand-in for a list view
+        base = type('Base', (APIView,), {'get': handler})
+        self.view = type('View', (response_cache.CachedResponseMixin, base), {
+            'permission_classes': [AllowAny],
+            'authentication_classes': [],
+            'get_cache_tags': lambda view: ['pet:abc'],
+        }).as_view()
+
+    def get(self, query='', **headers):
+        return self.view(APIRequestFactory().get('/api/pets/abc/' + query, **headers))
+
+    def test_hits_skip_the_view_until_a_tag_is_invalidated(self):
+        first = self.get('?b=2&a=1')
+        self.assertEqual(self.get('?a=1&b=2').content, first.content)
+        self.assertEqual(len(self.renders), 1)
+
+        self.get('?a=1&b=3')
+        self.assertEqual(len(self.renders), 2)
+
+        response_cache.invalidate('pet:abc')
+        self.get('?a=1&b=2')
+        self.assertEqual(len(self.renders), 3)
+
+    def test_matching_etag_gets_not_modified(self):
+        etag = self.get()['ETag']
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_review_changes_invalidate_the_pet_page_and_review_list(self):
+        review = Review(pet_id='abc', user_id=None, rating=5)
+        self.assertEqual(RESPONSE_CACHE_TAGS[Review](review), ['pet:abc', 'reviews:abc'])
+
+
+class ConditionalGetTests(SimpleTestCase):
+    def setUp(self):
+        self.renders = 0
+
+        def handler(view, request, *args, **kwargs):
+            self.renders += 1
+            return Response([])
+
+        base = type('Base', (APIView,), {'get': handler})
+        self.view = type('View', (conditional.ConditionalGetMixin, base), {
+            'permission_classes': [AllowAny],
+            'authentication_classes': [],
+            'validator_model': Review,
+            'get_validator_filter': lambda view: {'pet_id': 'abc'},
+        }).as_view()
+        patcher = mock.patch.object(conditional, 'collection_validators')
+        self.validators = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.validators.return_value = (datetime(2025, 1, 1), 3)
+
+    def get(self, **headers):
+        return self.view(APIRequestFactory().get('/api/reviews/pet/abc/', **headers))
+
+    def test_unchanged_validators_answer_not_modified_without_rendering(self):
+        etag = self.get(HTTP_IF_NONE_MATCH='"stale"')['ETag']
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self.renders, 1)
+        self.validators.assert_called_with(Review, {'pet_id': 'abc'})
+
+    def test_plain_get_skips_the_validators_and_hashes_the_body(self):
+        response = self.get()
+        response.render()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'])
+        self.validators.assert_not_called()
+
+    def test_new_count_or_update_changes_the_etag(self):
+        etag = self.get(HTTP_IF_NONE_MATCH='"stale"')['ETag']
+        self.validators.return_value = (datetime(2025, 1, 1), 2)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.validators.return_value = (datetime(2025, 1, 2), 3)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class RepositoryRowTests(SimpleTestCase):
+    """Rows read natively must serialize exactly like ORM instances."""
+
+    def setUp(self):
+        from bson import ObjectId
+        from django.utils import timezone as tz
+
+        self.owner_id = ObjectId()
+        created = datetime(2025, 3, 4, 5, 6, 7, 891000)
+        self.doc = {
+            '_id': '65a1b2c3d4e5f60718293a4b', 'name': 'Rex', 'pet_type': 'dog', 'breed': 'Beagle',
+            'status': 'available', 'primary_thumbnail': '', 'images': '["/media/a.jpg"]',
+            'location': 'Pune', 'age': 3, 'description': 'Calm', 'is_approved': True,
+            'created_by_id': self.owner_id, 'created_at': created,
+        }
+        self.owner = User(_id=self.owner_id, email='o@example.com', name='Owner',
+                          created_at=tz.make_aware(created, tz.utc), updated_at=tz.make_aware(created, tz.utc))
+        self.pet = Pet(
+            _id=self.doc['_id'], name='Rex', pet_type='dog', breed='Beagle', status='available',
+            primary_thumbnail='', images=['/media/a.jpg'], location='Pune', age=3, description='Calm',
+            is_approved=True, created_by=self.owner, created_at=tz.make_aware(created, tz.utc),
+        )
+
+    def test_values_are_converted_like_the_orm(self):
+        row = repository.pet_list_rows(self.doc)
+        self.assertEqual(row['images'], ['/media/a.jpg'])
+        self.assertEqual(row['created_at'], self.pet.created_at)
+        self.assertEqual(row['created_by'].pk, self.owner_id)
+        self.assertEqual((row.pk, row.id), (self.doc['_id'], self.doc['_id']))
+        self.assertNotIn('special_notes', row)
+
+    def test_serialized_output_matches_model_instances(self):
+        from apps.users.repository import user_rows
+        row = repository.pet_list_rows(self.doc)
+        # The owner's document as stored: naive UTC datetimes
+        owner_doc = {field.column: getattr(self.owner, field.attname) for field in User._meta.concrete_fields}
+        owner_doc.update(created_at=self.doc['created_at'], updated_at=self.doc['created_at'])
+        row['created_by'] = user_rows(owner_doc)
+        self.assertEqual(
+            JSONRenderer().render(PetSearchSerializer([row], many=True).data),
+            JSONRenderer().render(PetSearchSerializer([self.pet], many=True).data),
+        )
+
+
+class SerializerPlanTests(SimpleTestCase):
+    """Compiled plans must render exactly what the DRF serializers render."""
+
+    def setUp(self):
+        from bson import ObjectId
+        from django.utils import timezone as tz
+
+        created = tz.make_aware(datetime(2025, 3, 4, 5, 6, 7, 891000), tz.utc)
+        self.owner = User(_id=ObjectId(), email='o@example.com', name='Owner', user_type='rescuer',
+                          created_at=created, updated_at=created)
+        self.adopter = User(_id=ObjectId(), email='a@example.com', name='Adopter', user_type='adopter',
+                            created_at=created, updated_at=created)
+        self.pets = [
+            Pet(_id=str(ObjectId()), name=f'Pet {i}', pet_type='dog', breed='Beagle', color='Tan',
+                gender='male', size='small', age=i, description='Calm', status='available',
+                location='Pune', images=[f'/media/{i}.jpg'], primary_thumbnail='/media/t.webp' if i else '',
+                created_by=self.owner, created_at=created, updated_at=created)
+            for i in range(3)
+        ]
+        self.adoptions = [
+            AdoptionRequest(_id=str(ObjectId()), pet=pet, requester=self.adopter, message='Hi',
+                            status='pending', created_at=created)
+            for pet in self.pets
+        ]
+
+    def rows(self, objects, plan):
+        """What ``plan.rows()`` loads for ``objects``: ``.values()`` dicts, relations embedded."""
+        rows = []
+        for obj in objects:
+            row = {column: getattr(obj, column) for column in plan.columns}
+            for key, _, related_plan in plan.relations:
+                row[key] = self.rows([getattr(obj, key)], related_plan)[0]
+            rows.append(row)
+        return rows
+
+    def assertSameOutput(self, serializer_class, objects):
+        from rest_framework.serializers import ListSerializer
+        from petrescue_backend.serializer_plans import plan_for
+
+        expected = JSONRenderer().render(ListSerializer(objects, child=serializer_class()).data)
+        rows = self.rows(objects, plan_for(serializer_class))
+        self.assertEqual(JSONRenderer().render(serializer_class(objects, many=True).data), expected)
+        self.assertEqual(JSONRenderer().render(serializer_class(rows, many=True).data), expected)
+
+    def test_pet_serializers_match_drf(self):
+        from .serializers import PetSerializer
+        self.assertSameOutput(PetSerializer, self.pets)
+        self.assertSameOutput(PetSearchSerializer, self.pets)
+
+    def test_adoption_requests_match_drf_with_nested_plans(self):
+        from petrescue_backend.serializer_plans import plan_for
+        from .serializers import AdoptionRequestSerializer
+
+        plan = plan_for(AdoptionRequestSerializer)
+        self.assertIs(plan, plan_for(AdoptionRequestSerializer))
+        self.assertEqual([key for key, _, _ in plan.relations], ['pet', 'requester'])
+        self.assertEqual(plan.columns, ['_id', 'message', 'status', 'created_at', 'pet_id', 'requester_id'])
+        self.assertSameOutput(AdoptionRequestSerializer, self.adoptions)
+
+    def test_datetimes_follow_the_active_timezone(self):
+        from django.utils import timezone as tz
+        from .serializers import AdoptionRequestSerializer
+
+        with tz.override('Asia/Kolkata'):
+            self.assertSameOutput(AdoptionRequestSerializer, self.adoptions)
+
+    def test_incomplete_row_is_left_to_drf(self):
+        from petrescue_backend.serializer_plans import plan_for
+
+        row = self.rows(self.pets[:1], plan_for(PetSearchSerializer))[0]
+        del row['location']
+        # DRF's own error, naming the field, rather than a bare KeyError
+        with self.assertRaisesMessage(KeyError, 'field `location` on serializer `PetSearchSerializer`'):
+            PetSearchSerializer([row], many=True).data
+
+    @override_settings(FAST_SERIALIZATION=False)
+    def test_can_be_switched_off(self):
+        from collections import OrderedDict
+        self.assertIsInstance(PetSearchSerializer(self.pets, many=True).data[0], OrderedDict)
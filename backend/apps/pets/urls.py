@@ -1,6 +1,7 @@
 from django.urls import path
 from .views import (
     PetListView,
+    PetSearchView,
     PetDetailView,
     PetCreateView,
     PetUpdateView,
@@ -14,8 +15,9 @@ from .views import (
 )
 
 urlpatterns = [
-    # New search endpoint (extended)
-    path('', PetListView.as_view(), name='pet-list-root'),
+    # Search endpoint: text query, filters and facet counts
+    path('', PetSearchView.as_view(), name='pet-list-root'),
+    path('search/', PetSearchView.as_view(), name='pet-search'),
 
     # Register pet (must come before dynamic <pk> route)
     path('register/', PetRegisterView.as_view(), name='pet-register'),
@@ -2,8 +2,10 @@ from rest_framework import generics, status
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly, AllowAny
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from django.conf import settings
 from django.db import models
+from django.http import Http404
 from .models import Pet, PetReport, PetPhoto, AdoptionRequest, Review
 from .serializers import (
     PetSerializer,
@@ -14,13 +16,21 @@ from .serializers import (
     PetSearchSerializer,
     AdoptionRequestSerializer,
     AdoptionRequestCreateSerializer,
+    ADOPTION_REQUEST_PREFETCH,
     ReviewSerializer,
     ReviewCreateSerializer,
 )
-import base64
-import os
-from django.conf import settings
-from apps.notifications.utils import create_notification
+from apps.notifications.utils import create_notification, enqueue_admin_notification, enqueue_notification
+from apps.jobs.queue import enqueue
+from .media import ImageRejected, UploadBudget, discard, save_base64_image, save_upload
+from . import repository
+from .search import PetSearch
+from django.utils import timezone
+from petrescue_backend.conditional import ConditionalGetMixin
+from petrescue_backend.mongo import object_id
+from petrescue_backend.pagination import KeysetCursorPagination
+from petrescue_backend.response_cache import CachedResponseMixin
+from petrescue_backend.serializer_plans import PlannedListMixin, plan_for
 
 # Pet Views
 class PetCreateView(generics.CreateAPIView):
@@ -32,32 +42,90 @@ class PetCreateView(generics.CreateAPIView):
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
-class PetListView(generics.ListAPIView):
+class PetListView(CachedResponseMixin, PlannedListMixin, generics.ListAPIView):
     """GET /pets/all - List all pets"""
     queryset = Pet.objects.all()
     serializer_class = PetSearchSerializer
+    pagination_class = KeysetCursorPagination
     permission_classes = [AllowAny]
 
+    def get_cache_tags(self):
+        return ['pets']
+
     def get_queryset(self):
-        # Stable queryset
-        return Pet.objects.all().order_by('-created_at')
+        # Stable queryset; owners are batch-loaded in one query per page
+        return Pet.objects.all().prefetch_related('created_by').order_by('-created_at')
+
+    def list(self, request, *args, **kwargs):
+        if not settings.MONGO_NATIVE_READS:
+            return super().list(request, *args, **kwargs)
+        page = repository.pet_list_page(self.paginator, request, self)
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+
+class PetSearchView(CachedResponseMixin, generics.ListAPIView):
+    """
+    GET /pets/ and /pets/search - Search pets
+    Query params: q (text on name/breed/description), pet_type, size, gender,
+    status (comma-separated for several), is_vaccinated, is_neutered,
+    age_min, age_max, location. The response adds the total match count and
+    facet counts over all matches alongside the usual cursor page.
+    """
+    serializer_class = PetSearchSerializer
+    pagination_class = KeysetCursorPagination
+    permission_classes = [AllowAny]
+
+    def get_cache_tags(self):
+        return ['pets']
+
+    def list(self, request, *args, **kwargs):
+        search = PetSearch(request.query_params)
+        docs = self.paginator.paginate_documents(search.fetch, request, view=self)
 
+        ids = [doc['_id'] for doc in docs]
+        if settings.FAST_SERIALIZATION:
+            rows = plan_for(PetSearchSerializer).rows(Pet.objects.filter(_id__in=ids))
+            pets = {row['_id']: row for row in rows}
+        else:
+            pets = Pet.objects.prefetch_related('created_by').in_bulk(ids)
+        page = [pets[pet_id] for pet_id in ids if pet_id in pets]
 
-class UserPetListView(generics.ListAPIView):
+        response = self.paginator.get_paginated_response(self.get_serializer(page, many=True).data)
+        response.data['count'], response.data['facets'] = search.summary()
+        return response
+
+
+class UserPetListView(ConditionalGetMixin, PlannedListMixin, generics.ListAPIView):
     """GET /pets/user/<id> - Get pets by user"""
     serializer_class = PetSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_validator_filter(self):
+        return {'created_by_id': object_id(self.kwargs.get('user_id'))}
+
     def get_queryset(self):
         user_id = self.kwargs.get('user_id')
-        return Pet.objects.filter(created_by_id=user_id).order_by('-created_at')
+        return Pet.objects.filter(created_by_id=user_id).prefetch_related('created_by').order_by('-created_at')
 
-class PetDetailView(generics.RetrieveAPIView):
+class PetDetailView(CachedResponseMixin, generics.RetrieveAPIView):
     """GET /pets/<id> - Get pet details"""
     queryset = Pet.objects.all()
     serializer_class = PetDetailSerializer
     permission_classes = [AllowAny]
 
+    def get_cache_tags(self):
+        # Photos and reviews are embedded, so their signals bump this tag too
+        return [f"pet:{self.kwargs['pk']}"]
+
+    def get_object(self):
+        if not settings.MONGO_NATIVE_READS:
+            return super().get_object()
+        pet = repository.pet_detail(self.kwargs['pk'])
+        if pet is None:
+            raise Http404
+        self.check_object_permissions(self.request, pet)
+        return pet
+
 class PetUpdateView(generics.UpdateAPIView):
     """PUT /pets/update/<id> - Update pet"""
     queryset = Pet.objects.all()
@@ -111,41 +179,50 @@ class PetRegisterView(generics.CreateAPIView):
 
         serializer = self.get_serializer(data=data)
         serializer.is_valid(raise_exception=True)
-        pet = serializer.save(
-            created_by=request.user,
-            status='available',
-            is_approved=False,
-            images=[],
-        )
-
-        # Handle images
-        image_urls = []
-        files = request.FILES.getlist('images')
-        media_path = os.path.join(settings.MEDIA_ROOT, 'pets')
-        os.makedirs(media_path, exist_ok=True)
-
-        for index, image_file in enumerate(files):
-            file_name = f"{pet._id}_{index}_{image_file.name}"
-            file_path = os.path.join(media_path, file_name)
-            with open(file_path, 'wb+') as destination:
-                for chunk in image_file.chunks():
-                    destination.write(chunk)
 
-            rel_url = f"/media/pets/{file_name}"
-            image_urls.append(rel_url)
+        # Store images before the pet so a rejected upload leaves nothing behind
+        image_urls = []
+        budget = UploadBudget()
+        try:
+            for image_file in request.FILES.getlist('images'):
+                image_urls.append(save_upload(image_file, budget))
+        except ImageRejected as exc:
+            discard(image_urls)
+            raise ValidationError({'images': [str(exc)]})
 
-            PetPhoto.objects.create(
+        try:
+            pet = serializer.save(
+                created_by=request.user,
+                status='available',
+                is_approved=False,
+                images=[],
+            )
+        except Exception:
+            # No pet will reference the stored blobs; schedule their collection
+            discard(image_urls)
+            raise
+
+        # Thumbnails are rendered by a background job
+        photos = []
+        for index, rel_url in enumerate(image_urls):
+            photos.append(PetPhoto.objects.create(
                 pet=pet,
                 image_url=rel_url,
                 is_primary=(index == 0),
-            )
+            ))
 
         pet.images = image_urls
         pet.save()
 
+        for photo in photos:
+            try:
+                enqueue('pets.thumbnails', photo_id=photo._id)
+            except Exception:
+                pass
+
         # Notifications: owner + admins
         try:
-            create_notification(
+            enqueue_notification(
                 request.user,
                 "Pet submitted for approval",
                 f"Your pet '{pet.name}' has been submitted for approval.",
@@ -156,15 +233,12 @@ class PetRegisterView(generics.CreateAPIView):
             pass
 
         try:
-            from apps.users.models import User
-            for admin in User.objects.filter(role='admin'):
-                create_notification(
-                    admin,
-                    "New pet submitted",
-                    f"New pet '{pet.name}' submitted for approval.",
-                    notif_type='pet',
-                    related_id=pet._id,
-                )
+            enqueue_admin_notification(
+                "New pet submitted",
+                f"New pet '{pet.name}' submitted for approval.",
+                notif_type='pet',
+                related_id=pet._id,
+            )
         except Exception:
             pass
 
@@ -182,50 +256,13 @@ class PetReportCreateView(generics.CreateAPIView):
     parser_classes = [MultiPartParser, FormParser, JSONParser]
 
     def create(self, request, *args, **kwargs):
-        # Handle image files
         image_paths = []
-        
-        # Check if images are uploaded as files
-        for i in range(10):
-            image_key = f'images[{i}]'
-            if image_key in request.FILES:
-                image_file = request.FILES[image_key]
-                # Save file to media directory
-                media_path = os.path.join(settings.MEDIA_ROOT, 'pet_reports')
-                os.makedirs(media_path, exist_ok=True)
-                
-                file_name = f"{request.user.id}_{request.data.get('pet_name', 'pet')}_{i}_{image_file.name}"
-                file_path = os.path.join(media_path, file_name)
-                
-                with open(file_path, 'wb+') as destination:
-                    for chunk in image_file.chunks():
-                        destination.write(chunk)
-                
-                # Store relative path
-                image_paths.append(f'/media/pet_reports/{file_name}')
-        
-        # Check if images are sent as base64 strings
-        if 'images' in request.data and isinstance(request.data['images'], list):
-            for idx, img_data in enumerate(request.data['images'][:10]):
-                if img_data and isinstance(img_data, str) and img_data.startswith('data:image'):
-                    # Handle base64 image
-                    try:
-                        format, imgstr = img_data.split(';base64,')
-                        ext = format.split('/')[-1]
-                        
-                        media_path = os.path.join(settings.MEDIA_ROOT, 'pet_reports')
-                        os.makedirs(media_path, exist_ok=True)
-                        
-                        file_name = f"{request.user.id}_{request.data.get('pet_name', 'pet')}_{idx}.{ext}"
-                        file_path = os.path.join(media_path, file_name)
-                        
-                        with open(file_path, 'wb') as f:
-                            f.write(base64.b64decode(imgstr))
-                        
-                        image_paths.append(f'/media/pet_reports/{file_name}')
-                    except Exception as e:
-                        print(f"Error processing image {idx}: {str(e)}")
-        
+        try:
+            self.save_images(request, image_paths, UploadBudget())
+        except ImageRejected as exc:
+            discard(image_paths)
+            raise ValidationError({'images': [str(exc)]})
+
         # Create mutable copy of request data, excluding images from file upload
         data = {}
         for key, value in request.data.items():
@@ -237,36 +274,54 @@ class PetReportCreateView(generics.CreateAPIView):
         data['images'] = image_paths
         
         serializer = self.get_serializer(data=data)
-        serializer.is_valid(raise_exception=True)
-        self.perform_create(serializer)
+        try:
+            serializer.is_valid(raise_exception=True)
+            self.perform_create(serializer)
+        except Exception:
+            discard(image_paths)
+            raise
         
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
+    def save_images(self, request, image_paths, budget):
+        # Check if images are uploaded as files
+        for i in range(10):
+            image_key = f'images[{i}]'
+            if image_key in request.FILES:
+                image_paths.append(save_upload(request.FILES[image_key], budget))
+
+        # Check if images are sent as base64 strings; decoded in bounded chunks
+        if 'images' in request.data and isinstance(request.data['images'], list):
+            for img_data in request.data['images'][:10]:
+                if img_data and isinstance(img_data, str) and img_data.startswith('data:image'):
+                    image_paths.append(save_base64_image(img_data, budget))
+
     def perform_create(self, serializer):
         report = serializer.save(created_by=self.request.user)
         # Notify admins of new report
         try:
-            from apps.users.models import User
-            for admin in User.objects.filter(role='admin'):
-                create_notification(
-                    admin,
-                    "New pet report submitted",
-                    f"Report for '{report.pet_name}' requires review.",
-                    notif_type='report',
-                    related_id=report._id,
-                )
+            enqueue_admin_notification(
+                "New pet report submitted",
+                f"Report for '{report.pet_name}' requires review.",
+                notif_type='report',
+                related_id=report._id,
+            )
         except Exception:
             pass
 
-class PetReportListView(generics.ListAPIView):
+class PetReportListView(CachedResponseMixin, generics.ListAPIView):
     """GET /pets/reports - List all pet reports"""
     queryset = PetReport.objects.all()
     serializer_class = PetReportSerializer
+    pagination_class = KeysetCursorPagination
     permission_classes = [AllowAny]
 
+    def get_cache_tags(self):
+        return ['reports']
+
     def get_queryset(self):
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().prefetch_related('created_by')
         status = self.request.query_params.get('status', None)
         
         if status:
@@ -274,26 +329,33 @@ class PetReportListView(generics.ListAPIView):
         
         return queryset.order_by('-created_at')
 
-class UserPetReportListView(generics.ListAPIView):
+class UserPetReportListView(ConditionalGetMixin, generics.ListAPIView):
     """GET /pets/reports/user/<id> - Get reports by user"""
     serializer_class = PetReportSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_validator_filter(self):
+        return {'created_by_id': object_id(self.kwargs.get('user_id'))}
+
     def get_queryset(self):
         user_id = self.kwargs.get('user_id')
-        return PetReport.objects.filter(created_by_id=user_id).order_by('-created_at')
+        return PetReport.objects.filter(created_by_id=user_id).prefetch_related('created_by').order_by('-created_at')
 
-class AdminPetReportListView(generics.ListAPIView):
+class AdminPetReportListView(ConditionalGetMixin, generics.ListAPIView):
     """GET /admin/reports - Get all reports for admin"""
     queryset = PetReport.objects.all()
     serializer_class = PetReportSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_validator_filter(self):
+        # Non-admins always get an empty list; the ETag includes the user
+        return {}
+
     def get_queryset(self):
         # Check if user is admin
         if not (self.request.user.role == 'admin' or self.request.user.is_staff):
             return PetReport.objects.none()
-        return PetReport.objects.all().order_by('-created_at')
+        return PetReport.objects.all().prefetch_related('created_by').order_by('-created_at')
 
 class PetReportUpdateView(generics.UpdateAPIView):
     """PUT /pets/report/update/<id> - Update pet report status"""
@@ -355,29 +417,37 @@ class AdoptionRequestCreateView(generics.CreateAPIView):
             pass
 
 
-class AdoptionRequestsByPetView(generics.ListAPIView):
+class AdoptionRequestsByPetView(ConditionalGetMixin, PlannedListMixin, generics.ListAPIView):
     """
     GET /api/adoptions/pet/:petId
     """
     serializer_class = AdoptionRequestSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_validator_filter(self):
+        return {'pet_id': self.kwargs.get('pet_id')}
+
     def get_queryset(self):
         pet_id = self.kwargs.get('pet_id')
-        return AdoptionRequest.objects.filter(pet_id=pet_id).order_by('-created_at')
+        return AdoptionRequest.objects.filter(pet_id=pet_id).prefetch_related(
+            *ADOPTION_REQUEST_PREFETCH
+        ).order_by('-created_at')
 
 
-class AdoptionRequestsByUserView(generics.ListAPIView):
+class AdoptionRequestsByUserView(ConditionalGetMixin, PlannedListMixin, generics.ListAPIView):
     """
     GET /api/adoptions/user
     """
     serializer_class = AdoptionRequestSerializer
     permission_classes = [IsAuthenticated]
 
+    def get_validator_filter(self):
+        return {'requester_id': self.request.user.pk}
+
     def get_queryset(self):
         return AdoptionRequest.objects.filter(
             requester=self.request.user
-        ).order_by('-created_at')
+        ).prefetch_related(*ADOPTION_REQUEST_PREFETCH).order_by('-created_at')
 
 
 class AdoptionRequestStatusUpdateView(generics.UpdateAPIView):
@@ -415,7 +485,7 @@ class AdoptionRequestStatusUpdateView(generics.UpdateAPIView):
         # Notify requester about decision
         try:
             if new_status == 'approved':
-                create_notification(
+                enqueue_notification(
                     adoption.requester,
                     "Adoption approved",
                     f"Your adoption request for {pet.name} has been approved!",
@@ -423,7 +493,7 @@ class AdoptionRequestStatusUpdateView(generics.UpdateAPIView):
                     related_id=adoption._id,
                 )
             elif new_status == 'rejected':
-                create_notification(
+                enqueue_notification(
                     adoption.requester,
                     "Adoption rejected",
                     f"Your adoption request for {pet.name} has been rejected.",
@@ -436,9 +506,12 @@ class AdoptionRequestStatusUpdateView(generics.UpdateAPIView):
         if new_status == 'approved':
             pet.status = 'adopted'
             pet.save()
-            AdoptionRequest.objects.filter(
+            rejected = AdoptionRequest.objects.filter(
                 pet=pet, status='pending'
-            ).exclude(pk=adoption.pk).update(status='rejected')
+            ).exclude(pk=adoption.pk).update(status='rejected', updated_at=timezone.now())
+            # Bulk update bypasses model signals; keep dashboard counters in step
+            from apps.admin_panel import stats as dashboard_stats
+            dashboard_stats.adjust({'pending_adoption_requests': -rejected})
 
         serializer = self.get_serializer(adoption)
         return Response(serializer.data)
@@ -473,13 +546,16 @@ class ReviewCreateView(generics.CreateAPIView):
             pass
 
 
-class ReviewsByPetView(generics.ListAPIView):
+class ReviewsByPetView(CachedResponseMixin, generics.ListAPIView):
     """
     GET /api/reviews/pet/:petId
     """
     serializer_class = ReviewSerializer
     permission_classes = [AllowAny]
 
+    def get_cache_tags(self):
+        return [f"reviews:{self.kwargs['pet_id']}"]
+
     def get_queryset(self):
         pet_id = self.kwargs.get('pet_id')
-        return Review.objects.filter(pet_id=pet_id).order_by('-created_at')
+        return Review.objects.filter(pet_id=pet_id).prefetch_related('user').order_by('-created_at')
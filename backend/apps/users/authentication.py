@@ -0,0 +1,121 @@
+"""
+JWT authentication without a database read on every request.
+
+Users are kept in a small in-process LRU cache (``AUTH_USER_CACHE_SIZE``
+entries, each trusted for at most ``AUTH_USER_CACHE_TTL`` seconds) that
+the signals in ``signals.py`` invalidate whenever a user is saved or
+deleted, so role and active-status changes apply immediately in this
+process and within the TTL elsewhere.
+
+With ``JWT_STATELESS_AUTH`` enabled a cache miss does not hit Mongo
+either: the user is built from the signed claims in the access token
+(see ``tokens.py``) with every other field deferred, and loaded only if a
+view reads one. Claims can be stale for at most the access token
+lifetime, so only enable it where that is acceptable.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import USER_CLAIMS
+
+
+class UserCache:
+    """Thread-safe LRU of ``User`` instances keyed by id, with a TTL."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._users = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        key = str(user_id)
+        with self._lock:
+            entry = self._users.get(key)
+            if entry is None:
+                return None
+            user, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._users[key]
+                return None
+            self._users.move_to_end(key)
+        # Views may modify request.user; never hand out the shared instance
+        return copy.copy(user)
+
+    def put(self, user):
+        if not self.maxsize:
+            return
+        with self._lock:
+            self._users[str(user.pk)] = (copy.copy(user), time.monotonic())
+            self._users.move_to_end(str(user.pk))
+            while len(self._users) > self.maxsize:
+                self._users.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+user_cache = UserCache(
+    maxsize=getattr(settings, 'AUTH_USER_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'AUTH_USER_CACHE_TTL', 300),
+)
+
+
+def user_from_claims(user_id, token):
+    """
+    Build a ``User`` from token claims. Fields the token does not carry are
+    deferred and loaded together on first access.
+    """
+    User = get_user_model()
+    try:
+        claims = {'_id': ObjectId(user_id)}
+    except (InvalidId, TypeError):
+        raise InvalidToken('Token contained no recognizable user identification')
+    for claim, attribute in USER_CLAIMS.items():
+        # is_active is a property over the stored is_disabled flag
+        if attribute == 'is_active':
+            claims['is_disabled'] = not token[claim]
+        else:
+            claims[attribute] = token[claim]
+
+    fields = [f.attname for f in User._meta.concrete_fields if f.attname in claims]
+    user = User.from_db('default', fields, [claims[name] for name in fields])
+    user._from_claims = True
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        if validated_token.get('is_active') is False:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+
+        user = user_cache.get(user_id)
+        if user is None:
+            stateless = getattr(settings, 'JWT_STATELESS_AUTH', False)
+            if stateless and all(claim in validated_token for claim in USER_CLAIMS):
+                return user_from_claims(user_id, validated_token)
+            user = super().get_user(validated_token)
+            user_cache.put(user)
+        elif not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return user
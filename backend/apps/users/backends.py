@@ -6,13 +6,9 @@ class EmailBackend(ModelBackend):
     Custom authentication backend that uses email instead of username
     """
     def authenticate(self, request, username=None, password=None, **kwargs):
-        try:
-            # Try to fetch the user by email
-            user = User.objects.get(email=username)
-            if user.check_password(password):
-                return user
-        except User.DoesNotExist:
-            return None
+        user = User.objects.get_by_email(username)
+        if user is not None and user.check_password(password):
+            return user
         return None
 
     def get_user(self, user_id):
@@ -0,0 +1,22 @@
+"""
+Password hashers with costs taken from settings.
+
+``PASSWORD_HASHER`` in settings picks which one new hashes use; the others
+stay listed so existing hashes still verify. Django rehashes a password
+with the preferred hasher whenever it verifies one made by another hasher
+or with other costs, so changing either takes effect on each user's next
+login.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, BCryptSHA256PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2id; defaults follow the OWASP minimum (19 MiB, 2 passes, 1 lane)."""
+    time_cost = getattr(settings, 'PASSWORD_ARGON2_TIME_COST', 2)
+    memory_cost = getattr(settings, 'PASSWORD_ARGON2_MEMORY_KIB', 19 * 1024)
+    parallelism = getattr(settings, 'PASSWORD_ARGON2_PARALLELISM', 1)
+
+
+class TunedBCryptSHA256PasswordHasher(BCryptSHA256PasswordHasher):
+    rounds = getattr(settings, 'PASSWORD_BCRYPT_ROUNDS', 10)
@@ -0,0 +1,62 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure login throughput: password verifications per second for each '
+        'configured hasher and, with --email, the cost of the user lookup.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='Verifications per hasher.')
+        parser.add_argument('--threads', type=int, default=1, help='Concurrent verifications.')
+        parser.add_argument('--email', help='Also time looking up this existing user.')
+
+    def handle(self, *args, **options):
+        iterations, threads = options['iterations'], options['threads']
+        password = 'benchmark-Password-1'
+        preferred = get_hashers()[0].algorithm
+        self.stdout.write(f'{iterations} verification(s) per hasher on {threads} thread(s)')
+
+        for path in settings.PASSWORD_HASHERS:
+            hasher = import_string(path)()
+            try:
+                encoded = hasher.encode(password, hasher.salt())
+            except ValueError:
+                # Optional library (argon2-cffi, bcrypt) not installed
+                self.stdout.write(f'{hasher.algorithm:<16} unavailable')
+                continue
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                results = list(pool.map(lambda _: hasher.verify(password, encoded), range(iterations)))
+            elapsed = time.perf_counter() - started
+            assert all(results)
+            marker = ' (preferred)' if hasher.algorithm == preferred else ''
+            self.stdout.write(
+                f'{hasher.algorithm:<16} {iterations / elapsed:8.1f} logins/s '
+                f'{elapsed / iterations * 1000:8.2f} ms/verify{marker}'
+            )
+
+        if options['email']:
+            self.time_lookup(options['email'], iterations)
+
+    def time_lookup(self, email, iterations):
+        lookups = (
+            ('filter().order_by().first()', lambda: User.objects.filter(email=email).order_by('-created_at').first()),
+            ('get_by_email()', lambda: User.objects.get_by_email(email)),
+        )
+        for label, lookup in lookups:
+            started = time.perf_counter()
+            for _ in range(iterations):
+                lookup()
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'{label:<28} {elapsed / iterations * 1000:8.2f} ms/lookup')
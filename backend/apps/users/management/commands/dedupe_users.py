@@ -0,0 +1,121 @@
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.users.authentication import user_cache
+from apps.users.models import User
+from petrescue_backend.mongo import get_collection, index_specs
+
+NORMALIZED_EMAIL = {'$toLower': {'$trim': {'input': '$email'}}}
+
+
+def pick_survivor(users, keep='newest'):
+    """
+    Split users sharing an email into ``(survivor, duplicates)``. ``newest``
+    keeps the account login has been resolving to so far.
+    """
+    ordered = sorted(users, key=lambda user: (user.get('created_at') is not None, user.get('created_at'), str(user['_id'])))
+    survivor = ordered[-1] if keep == 'newest' else ordered[0]
+    return survivor, [user for user in ordered if user is not survivor]
+
+
+def user_references():
+    """``(model, column)`` for every foreign key pointing at ``User``."""
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if field.is_relation and field.related_model is User:
+                yield model, field.column
+
+
+class Command(BaseCommand):
+    help = (
+        'Merge users whose emails differ only in case or whitespace into one account, '
+        'lower-case every stored email and enforce the unique email index.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would change.')
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Dry run that exits non-zero when anything would change (for deploy scripts).',
+        )
+        parser.add_argument(
+            '--keep', choices=('newest', 'oldest'), default='newest',
+            help='Which account of each duplicate group survives (default: newest).',
+        )
+
+    def handle(self, *args, **options):
+        collection = get_collection(User)
+        dry_run = options['dry_run'] or options['check']
+
+        groups = collection.aggregate([
+            {'$group': {
+                '_id': NORMALIZED_EMAIL,
+                'users': {'$push': {'_id': '$_id', 'email': '$email', 'created_at': '$created_at'}},
+                'count': {'$sum': 1},
+            }},
+            {'$match': {'count': {'$gt': 1}}},
+        ], allowDiskUse=True)
+
+        merged = 0
+        survivors = []
+        for group in groups:
+            survivor, duplicates = pick_survivor(group['users'], options['keep'])
+            duplicate_ids = [user['_id'] for user in duplicates]
+            self.stdout.write(
+                f"{group['_id']}: keeping {survivor['_id']}, merging {', '.join(map(str, duplicate_ids))}"
+            )
+            merged += len(duplicate_ids)
+            if dry_run:
+                continue
+            for model, column in user_references():
+                get_collection(model).update_many(
+                    {column: {'$in': duplicate_ids}}, {'$set': {column: survivor['_id']}},
+                )
+            collection.delete_many({'_id': {'$in': duplicate_ids}})
+            survivors.append(survivor['_id'])
+            for user_id in duplicate_ids:
+                user_cache.invalidate(user_id)
+
+        if dry_run:
+            unnormalized = collection.count_documents({'$expr': {'$ne': ['$email', NORMALIZED_EMAIL]}})
+            self.stdout.write(f'{merged} duplicate user(s) to merge, {unnormalized} email(s) to normalize.')
+            if options['check'] and (merged or unnormalized):
+                raise CommandError(
+                    'User emails need merging or normalizing. Back up the database, review '
+                    '`manage.py dedupe_users --dry-run` and run `manage.py dedupe_users`.'
+                )
+            return
+
+        normalized = collection.update_many(
+            {'$expr': {'$ne': ['$email', NORMALIZED_EMAIL]}},
+            [{'$set': {'email': NORMALIZED_EMAIL}}],
+        ).modified_count
+
+        if merged:
+            # Merged users' messages, notifications and counters moved owner
+            from apps.admin_panel import stats as dashboard_stats
+            from apps.notifications import counters
+            counters.invalidate(survivors)
+            dashboard_stats.invalidate()
+            if apps.is_installed('apps.chat'):
+                call_command('rebuild_conversations', stdout=self.stdout)
+
+        self.ensure_unique_index(collection)
+        self.stdout.write(self.style.SUCCESS(
+            f'Merged {merged} duplicate user(s), normalized {normalized} email(s).'
+        ))
+
+    def ensure_unique_index(self, collection):
+        name, keys, index_options = next(
+            spec for spec in index_specs(User) if spec[0] == 'user_email_unique_idx'
+        )
+        for existing_name, info in collection.index_information().items():
+            if [(field, int(direction)) for field, direction in info['key']] != keys:
+                continue
+            if info.get('unique'):
+                return
+            # A plain index on the same key would conflict with the unique one
+            collection.drop_index(existing_name)
+        collection.create_index(keys, name=name, **index_options)
+        self.stdout.write(self.style.SUCCESS(f'created  {collection.name}.{name} {keys}'))
@@ -3,6 +3,28 @@ from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, Permis
 from djongo import models as djongo_models
 
 class UserManager(BaseUserManager):
+    @classmethod
+    def normalize_email(cls, email):
+        """Emails are stored and matched trimmed and lower-cased."""
+        return (email or '').strip().lower()
+
+    def get_by_natural_key(self, username):
+        return super().get_by_natural_key(self.normalize_email(username))
+
+    def get_by_email(self, email):
+        """
+        Single lookup on the unique email index; ``None`` if there is no such
+        user. Until ``dedupe_users`` has run, an email may still match
+        several accounts; the newest one wins, as ``dedupe_users`` keeps it.
+        """
+        email = self.normalize_email(email)
+        try:
+            return self.get(email=email)
+        except self.model.DoesNotExist:
+            return None
+        except self.model.MultipleObjectsReturned:
+            return self.filter(email=email).order_by('-created_at').first()
+
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError('The Email field must be set')
@@ -38,6 +60,8 @@ class User(AbstractBaseUser):
     user_type = models.CharField(max_length=10, choices=USER_TYPE_CHOICES)
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='user')
     is_staff = models.BooleanField(default=False)
+    # Stored inverted so documents written before it existed read as active
+    is_disabled = models.BooleanField(default=False)
     is_verified = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -53,10 +77,46 @@ class User(AbstractBaseUser):
 
     objects = UserManager()
 
+    # Enforced natively; run dedupe_users first on data that predates it
+    mongo_indexes = [
+        ('user_email_unique_idx', [('email', 1)], {'unique': True}),
+    ]
+
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
 
     @property
     def id(self):
         """Return _id as string for compatibility"""
-        return str(self._id)
\ No newline at end of file
+        return str(self._id)
+
+    @property
+    def is_active(self):
+        return not self.is_disabled
+
+    @is_active.setter
+    def is_active(self, value):
+        self.is_disabled = not value
+
+    def refresh_from_db(self, using=None, fields=None):
+        # Users built from token claims (see authentication.py) defer most
+        # fields; load all of them on first touch instead of one per query.
+        if fields is not None and getattr(self, '_from_claims', False):
+            self._from_claims = False
+            fields = set(fields) | self.get_deferred_fields()
+        super().refresh_from_db(using=using, fields=fields)
+
+
+class ThrottleBucket(models.Model):
+    """
+    Token bucket for the shared rate limiter store (see throttling.py);
+    written only with atomic pymongo updates.
+    """
+    _id = models.CharField(max_length=100, primary_key=True, db_column='_id')
+    tokens = models.FloatField()
+    updated_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+
+    mongo_indexes = [
+        ('throttle_expires_ttl_idx', [('expires_at', 1)], {'expireAfterSeconds': 0}),
+    ]
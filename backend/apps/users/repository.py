@@ -0,0 +1,25 @@
+"""Native user reads for embedding owners and participants in other rows."""
+from petrescue_backend.mongo import RowLoader, get_collection
+from .models import User
+from .serializers import UserSerializer
+
+# Exactly what UserSerializer renders (its ``id`` is read from ``_id``)
+user_rows = RowLoader(User, [name for name in UserSerializer.Meta.fields if name != 'id'])
+
+
+def users_by_id(ids):
+    """``{_id: Row}`` for the given user ids, in one query."""
+    ids = list({user_id for user_id in ids if user_id is not None})
+    if not ids:
+        return {}
+    docs = get_collection(User).find({'_id': {'$in': ids}}, user_rows.projection)
+    return {row['_id']: row for row in user_rows.load(docs)}
+
+
+def attach_users(rows, *fields):
+    """Replace each ``<field>`` foreign key on ``rows`` with the user's row."""
+    users = users_by_id(row[f'{field}_id'] for row in rows for field in fields)
+    for row in rows:
+        for field in fields:
+            row[field] = users.get(row[f'{field}_id'])
+    return rows
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import User
+from petrescue_backend.mongo import get_collection
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -47,9 +48,11 @@ class UserRegisterSerializer(serializers.ModelSerializer):
         )
 
     def validate_email(self, value):
-        # Temporarily disable exists() check to see if it bypasses the DatabaseError
-        # if User.objects.filter(email=value).exists():
-        #     raise serializers.ValidationError("A user with this email already exists.")
+        value = User.objects.normalize_email(value)
+        # Native lookup on the unique index; djongo's exists() translation is
+        # what raised DatabaseError here before
+        if get_collection(User).count_documents({'email': value}, limit=1):
+            raise serializers.ValidationError("A user with this email already exists.")
         return value
 
 
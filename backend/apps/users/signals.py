@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .authentication import user_cache
+from .models import User
+
+
+@receiver(post_save, sender=User, dispatch_uid='users_auth_cache_save')
+@receiver(post_delete, sender=User, dispatch_uid='users_auth_cache_delete')
+def invalidate_cached_user(sender, instance, **kwargs):
+    # Role, staff and active changes must not be served from the cache
+    user_cache.invalidate(instance.pk)
@@ -1,7 +1,20 @@
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from bson import ObjectId
+from django.test import SimpleTestCase, override_settings
 from django.urls import reverse
 from rest_framework import status
-from rest_framework.test import APITestCase
+from rest_framework.parsers import JSONParser
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from . import throttling
+from .hashers import TunedArgon2PasswordHasher
+from .management.commands.dedupe_users import pick_survivor
+from .authentication import CachedJWTAuthentication, UserCache, user_cache
 from .models import User
+from .tokens import UserRefreshToken
 
 class UserTests(APITestCase):
 
@@ -51,4 +64,149 @@ class UserTests(APITestCase):
         self.client.login(email=self.user.email, password='testpassword123')
         response = self.client.delete(reverse('user-delete'))
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
-        self.assertEqual(User.objects.count(), 0)
\ No newline at end of file
+        self.assertEqual(User.objects.count(), 0)
+
+
+class UserCacheTests(SimpleTestCase):
+    def user(self, **fields):
+        return User(_id=ObjectId(), email='cache@example.com', **fields)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = UserCache(maxsize=2, ttl=60)
+        first, second, third = self.user(), self.user(), self.user()
+        cache.put(first)
+        cache.put(second)
+        cache.get(first.pk)
+        cache.put(third)
+        self.assertIsNone(cache.get(second.pk))
+        self.assertEqual(cache.get(first.pk).pk, first.pk)
+
+    def test_entries_expire_and_are_copies(self):
+        cache = UserCache(maxsize=2, ttl=60)
+        user = self.user(role='user')
+        cache.put(user)
+        cache.get(user.pk).role = 'admin'
+        self.assertEqual(cache.get(user.pk).role, 'user')
+        with mock.patch('apps.users.authentication.time.monotonic', return_value=10 ** 9):
+            self.assertIsNone(cache.get(user.pk))
+
+    def test_saving_a_user_invalidates_it(self):
+        from .signals import invalidate_cached_user
+        user = self.user()
+        user_cache.put(user)
+        invalidate_cached_user(User, user)
+        self.assertIsNone(user_cache.get(user.pk))
+
+
+class TokenClaimsAuthenticationTests(SimpleTestCase):
+    def setUp(self):
+        self.user = User(_id=ObjectId(), email='claims@example.com', role='admin', is_staff=True)
+        self.addCleanup(user_cache.clear)
+
+    def access_token(self):
+        auth = CachedJWTAuthentication()
+        raw = str(UserRefreshToken.for_user(self.user).access_token)
+        return auth, auth.get_validated_token(raw.encode())
+
+    @override_settings(JWT_STATELESS_AUTH=True)
+    def test_user_is_built_from_claims_without_a_query(self):
+        auth, token = self.access_token()
+        user = auth.get_user(token)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual((user.email, user.role, user.is_staff, user.is_active),
+                         ('claims@example.com', 'admin', True, True))
+        self.assertIn('phone', user.get_deferred_fields())
+
+    def test_cached_user_is_used_before_the_database(self):
+        user_cache.put(self.user)
+        auth, token = self.access_token()
+        self.assertEqual(auth.get_user(token).email, 'claims@example.com')
+
+    def test_inactive_users_are_rejected(self):
+        self.user.is_active = False
+        auth, token = self.access_token()
+        with self.assertRaises(AuthenticationFailed):
+            auth.get_user(token)
+
+
+class EmailNormalizationTests(SimpleTestCase):
+    def test_emails_are_trimmed_and_lower_cased(self):
+        self.assertEqual(User.objects.normalize_email('  Kalyan@Gmail.COM '), 'kalyan@gmail.com')
+
+    def test_newest_duplicate_survives_by_default(self):
+        from datetime import datetime
+        old = {'_id': 1, 'created_at': datetime(2024, 1, 1)}
+        new = {'_id': 2, 'created_at': datetime(2025, 1, 1)}
+        undated = {'_id': 3, 'created_at': None}
+        self.assertEqual(pick_survivor([new, undated, old]), (new, [undated, old]))
+        self.assertEqual(pick_survivor([new, undated, old], keep='oldest'), (undated, [old, new]))
+
+    def test_duplicate_emails_resolve_to_the_newest_account(self):
+        newest = User(email='dup@example.com')
+        with mock.patch.object(User.objects, 'get', side_effect=User.MultipleObjectsReturned), \
+                mock.patch.object(User.objects, 'filter') as filter_users:
+            filter_users.return_value.order_by.return_value.first.return_value = newest
+            self.assertIs(User.objects.get_by_email(' Dup@Example.com'), newest)
+        filter_users.assert_called_once_with(email='dup@example.com')
+        filter_users.return_value.order_by.assert_called_once_with('-created_at')
+
+
+class PasswordHasherTests(SimpleTestCase):
+    def test_changed_costs_trigger_a_rehash(self):
+        try:
+            import argon2  # noqa: F401
+        except ImportError:
+            self.skipTest('argon2-cffi is not installed')
+        hasher = TunedArgon2PasswordHasher()
+        encoded = hasher.encode('secret-password', hasher.salt())
+        self.assertFalse(hasher.must_update(encoded))
+        with mock.patch.object(TunedArgon2PasswordHasher, 'memory_cost', hasher.memory_cost * 2):
+            self.assertTrue(hasher.must_update(encoded))
+
+
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        self.store = throttling.LocalBucketStore()
+        self.now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    def test_burst_then_steady_refill(self):
+        take = lambda seconds: self.store.take('k', 0.5, 3, self.now + timedelta(seconds=seconds))[0]
+        self.assertEqual([take(0) for _ in range(4)], [True, True, True, False])
+        self.assertFalse(take(1))
+        self.assertTrue(take(2))
+        self.assertFalse(take(2))
+
+    def test_least_recently_used_bucket_is_dropped(self):
+        store = throttling.LocalBucketStore(max_keys=1)
+        store.take('a', 1, 1, self.now)
+        store.take('b', 1, 1, self.now)
+        self.assertEqual(store.take('a', 1, 1, self.now), (True, 0))
+
+
+@mock.patch.dict(throttling.SimpleRateThrottle.THROTTLE_RATES, {'login_email': '2/min'})
+class AuthThrottleTests(SimpleTestCase):
+    def setUp(self):
+        throttling.get_store('local').clear()
+        self.addCleanup(throttling.get_store('local').clear)
+
+    def request(self, email):
+        request = Request(APIRequestFactory().post('/api/auth/login/', {'email': email}, format='json'))
+        request.parsers = [JSONParser()]
+        return request
+
+    def test_email_bucket_is_case_insensitive_and_reports_retry_after(self):
+        allowed = []
+        with self.assertLogs('apps.users.throttling', 'WARNING'):
+            for email in ('a@example.com', 'A@Example.com ', 'a@example.com'):
+                throttle = throttling.LoginEmailThrottle()
+                allowed.append(throttle.allow_request(self.request(email), None))
+        self.assertEqual(allowed, [True, True, False])
+        self.assertAlmostEqual(throttle.wait(), 30, delta=1)
+        self.assertTrue(throttling.LoginEmailThrottle().allow_request(self.request('b@example.com'), None))
+
+    def test_rejections_are_counted_per_scope(self):
+        before = throttling.rejection_counts()['login_email']
+        with self.assertLogs('apps.users.throttling', 'WARNING'):
+            for _ in range(3):
+                throttling.LoginEmailThrottle().allow_request(self.request('c@example.com'), None)
+        self.assertEqual(throttling.rejection_counts()['login_email'], before + 1)
@@ -0,0 +1,201 @@
+"""
+Token-bucket rate limiting for the login and signup endpoints.
+
+Each bucket holds up to ``capacity`` tokens and refills continuously at
+``rate`` tokens per second; a request spends one token or is rejected
+with 429 and a ``Retry-After`` of the time until the next token. Rates
+use DRF's ``DEFAULT_THROTTLE_RATES`` format: ``'5/min'`` allows a burst of
+five and then one attempt every twelve seconds.
+
+Buckets are keyed by client IP and, separately, by the submitted email,
+so neither spraying one account from many addresses nor many accounts
+from one address gets past the limit. They are kept by the store named in
+``AUTH_THROTTLE_STORE``:
+
+* ``local``: a bounded in-process LRU. Cheapest, but each worker process
+  enforces its own limit.
+* ``mongo``: one ``ThrottleBucket`` document per key, refilled and spent
+  in a single atomic pipeline update, shared by every process. Documents
+  expire by TTL once their bucket would be full again.
+
+Rejections are counted per scope in the cache (see ``rejection_counts``).
+"""
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from rest_framework.throttling import SimpleRateThrottle
+
+from petrescue_backend.mongo import get_collection
+from .models import ThrottleBucket, UserManager
+
+logger = logging.getLogger(__name__)
+
+METRICS_PREFIX = 'throttle:rejected:'
+METRICS_TIMEOUT = None  # Kept until the cache evicts them
+
+
+def refill(tokens, elapsed, rate, capacity):
+    """Tokens in a bucket ``elapsed`` seconds after it held ``tokens``."""
+    return min(capacity, tokens + max(elapsed, 0) * rate)
+
+
+class LocalBucketStore:
+    """Buckets in this process only, least recently used evicted first."""
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, capacity, now):
+        """Spend a token if one is available. Returns ``(allowed, tokens_left)``."""
+        timestamp = now.timestamp()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, timestamp))
+            tokens = refill(tokens, timestamp - updated, rate, capacity)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, timestamp)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, tokens
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class MongoBucketStore:
+    """Buckets shared by every process, one document per key."""
+
+    def take(self, key, rate, capacity, now):
+        try:
+            return self._take(key, rate, capacity, now)
+        except DuplicateKeyError:
+            # Lost the race to create the bucket; it exists now
+            return self._take(key, rate, capacity, now)
+
+    def _take(self, key, rate, capacity, now):
+        elapsed = {'$divide': [{'$subtract': [now, {'$ifNull': ['$updated_at', now]}]}, 1000]}
+        tokens = {'$min': [capacity, {'$add': [
+            {'$ifNull': ['$tokens', capacity]}, {'$multiply': [{'$max': [elapsed, 0]}, rate]},
+        ]}]}
+        doc = get_collection(ThrottleBucket).find_one_and_update(
+            {'_id': key},
+            [
+                {'$set': {'tokens': tokens, 'updated_at': now}},
+                {'$set': {
+                    'allowed': {'$gte': ['$tokens', 1]},
+                    'tokens': {'$cond': [{'$gte': ['$tokens', 1]}, {'$subtract': ['$tokens', 1]}, '$tokens']},
+                }},
+                # Once full again the document carries no state worth keeping
+                {'$set': {'expires_at': {'$add': [
+                    now, {'$multiply': [{'$subtract': [capacity, '$tokens']}, 1000 / rate]},
+                ]}}},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc['allowed'], doc['tokens']
+
+    def clear(self):
+        get_collection(ThrottleBucket).delete_many({})
+
+
+STORES = {
+    'local': LocalBucketStore,
+    'mongo': MongoBucketStore,
+}
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(name=None):
+    name = name or getattr(settings, 'AUTH_THROTTLE_STORE', 'local')
+    with _stores_lock:
+        if name not in _stores:
+            _stores[name] = STORES[name]()
+        return _stores[name]
+
+
+def record_rejection(scope):
+    key = METRICS_PREFIX + scope
+    if not cache.add(key, 1, METRICS_TIMEOUT):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, METRICS_TIMEOUT)
+
+
+def rejection_counts():
+    """``{scope: rejected requests}`` for every throttle scope that has a rate."""
+    scopes = list(SimpleRateThrottle.THROTTLE_RATES)
+    counts = cache.get_many([METRICS_PREFIX + scope for scope in scopes])
+    return {scope: counts.get(METRICS_PREFIX + scope, 0) for scope in scopes}
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    DRF throttle spending one token from the bucket ``get_cache_key``
+    names. Requests without a key (e.g. no email submitted) pass.
+    """
+    tokens = None
+
+    @property
+    def refill_rate(self):
+        """Tokens per second."""
+        return self.num_requests / self.duration
+
+    def allow_request(self, request, view):
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        allowed, self.tokens = get_store().take(key, self.refill_rate, self.num_requests, timezone.now())
+        if not allowed:
+            record_rejection(self.scope)
+            logger.warning('Throttled %s request (%s)', self.scope, self.get_ident(request))
+        return allowed
+
+    def wait(self):
+        if self.tokens is None or self.tokens >= 1:
+            return None
+        return (1 - self.tokens) / self.refill_rate
+
+
+class IPRateThrottle(TokenBucketThrottle):
+    def get_cache_key(self, request, view):
+        return f'{self.scope}:{self.get_ident(request)}'
+
+
+class EmailRateThrottle(TokenBucketThrottle):
+    def get_cache_key(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        # Hashed so the shared store holds no addresses
+        digest = hashlib.sha256(UserManager.normalize_email(email).encode()).hexdigest()[:32]
+        return f'{self.scope}:{digest}'
+
+
+class LoginIPThrottle(IPRateThrottle):
+    scope = 'login_ip'
+
+
+class LoginEmailThrottle(EmailRateThrottle):
+    scope = 'login_email'
+
+
+class SignupIPThrottle(IPRateThrottle):
+    scope = 'signup_ip'
+
+
+class SignupEmailThrottle(EmailRateThrottle):
+    scope = 'signup_email'
@@ -0,0 +1,21 @@
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# Claims stateless authentication trusts (see authentication.py), mapped to
+# the User attribute each one is read from
+USER_CLAIMS = {
+    'email': 'email',
+    'role': 'role',
+    'is_staff': 'is_staff',
+    'is_active': 'is_active',
+}
+
+
+class UserRefreshToken(RefreshToken):
+    """Refresh token whose access tokens carry the user's auth claims."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim, attribute in USER_CLAIMS.items():
+            token[claim] = getattr(user, attribute)
+        return token
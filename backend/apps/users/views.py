@@ -8,13 +8,15 @@ from .serializers import (
     UserProfileSerializer,
     UserPreferencesSerializer,
 )
-from rest_framework_simplejwt.tokens import RefreshToken
+from .throttling import LoginEmailThrottle, LoginIPThrottle, SignupEmailThrottle, SignupIPThrottle
+from .tokens import UserRefreshToken
 
 class RegisterView(generics.CreateAPIView):
     """POST /auth/signup - Register new user"""
     queryset = User.objects.all()
     serializer_class = UserRegisterSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [SignupIPThrottle, SignupEmailThrottle]
 
     def create(self, request, *args, **kwargs):
         print(f"DEBUG: Signup attempt for email: {request.data.get('email')}")
@@ -26,7 +28,7 @@ class RegisterView(generics.CreateAPIView):
         try:
             user = serializer.save()
             print(f"DEBUG: User created successfully: {user.email}")
-            refresh = RefreshToken.for_user(user)
+            refresh = UserRefreshToken.for_user(user)
             return Response({
                 'user': UserSerializer(user).data,
                 'refresh': str(refresh),
@@ -44,6 +46,7 @@ class RegisterView(generics.CreateAPIView):
 class LoginView(generics.GenericAPIView):
     """POST /auth/login - Authenticate user"""
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
 
     def post(self, request, *args, **kwargs):
         email = request.data.get('email')
@@ -54,17 +57,22 @@ class LoginView(generics.GenericAPIView):
                 {'error': 'Email and password are required'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        # Manually authenticate by email to avoid backend inconsistencies
-        # Use filter().first() to tolerate accidental duplicates in Mongo
-        # Prefer the most recently created user if duplicates exist
-        user = User.objects.filter(email=email).order_by('-created_at').first()
+        # Manually authenticate by email to avoid backend inconsistencies.
+        # check_password() also upgrades the stored hash when PASSWORD_HASHER
+        # or its costs have changed.
+        user = User.objects.get_by_email(email)
         if not user or not user.check_password(password):
             return Response(
                 {'error': 'Invalid credentials'},
                 status=status.HTTP_401_UNAUTHORIZED
             )
+        if not user.is_active:
+            return Response(
+                {'error': 'This account has been disabled'},
+                status=status.HTTP_403_FORBIDDEN
+            )
         
-        refresh = RefreshToken.for_user(user)
+        refresh = UserRefreshToken.for_user(user)
         return Response({
             'user': UserSerializer(user).data,
             'refresh': str(refresh),
@@ -1,5 +1,42 @@
+import os
+
+from asgiref.sync import sync_to_async
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'petrescue_backend.settings')
 
-application = get_asgi_application()
\ No newline at end of file
+# Set up Django before importing anything that touches models
+django_application = get_asgi_application()
+
+from petrescue_backend.mongo_pool import prewarm  # noqa: E402
+from petrescue_backend.pubsub import configure_relay  # noqa: E402
+from petrescue_backend.websocket import WebSocketRouter  # noqa: E402
+from apps.chat import routing as chat_routing  # noqa: E402
+from apps.notifications import routing as notification_routing  # noqa: E402
+
+websocket_application = WebSocketRouter(
+    chat_routing.websocket_routes + notification_routing.websocket_routes
+)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Open pooled Mongo connections before the first request arrives
+            await sync_to_async(prewarm)()
+            # Deliver events published by the WSGI workers and job runners
+            configure_relay(listen=True)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        await websocket_application(scope, receive, send)
+    elif scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+    else:
+        await django_application(scope, receive, send)
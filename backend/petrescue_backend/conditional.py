@@ -0,0 +1,82 @@
+"""
+Conditional GET for list endpoints, decided before any serialization.
+
+Views using ``ConditionalGetMixin`` describe the documents they list as a
+native Mongo filter (``get_validator_filter()``). The newest
+``updated_at`` and the number of matches are the validators: every insert
+and delete changes the count and every ORM save moves ``updated_at``.
+Each listed model has a ``(filter key, updated_at)`` index, so the newest
+value is that index's first entry and the count only scans the key's
+range. The validators are hashed into the ETag, together with the URL, the
+negotiated media type and the requesting user. A request whose
+``If-None-Match`` still matches gets a bodiless 304 without fetching or
+serializing the page.
+
+The validators are only read for requests that carry ``If-None-Match``.
+Other requests render the page as usual and get an ETag hashed from the
+rendered body; the client's first revalidation then swaps it for the
+validator ETag.
+
+Related objects embedded in the output (owners, pets) are not part of
+the validator, and neither are writes that bypass ``auto_now``. Bulk
+updates of listed models must set ``updated_at`` themselves.
+"""
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from .mongo import get_collection
+
+
+def collection_validators(model, query):
+    """``(latest update, count)`` of the documents matching ``query``."""
+    collection = get_collection(model)
+    latest = next(collection.find(query, {'_id': 0, 'updated_at': 1}).sort('updated_at', -1).limit(1), {})
+    # Documents that were never updated since updated_at was added have none;
+    # they only appear or disappear along with the count
+    count = collection.count_documents(query) if query else collection.estimated_document_count()
+    return latest.get('updated_at'), count
+
+
+class ConditionalGetMixin:
+    """ETag / If-None-Match support for GET; see module docstring."""
+    validator_model = None
+
+    def get_validator_filter(self):
+        raise NotImplementedError('Views using ConditionalGetMixin must define get_validator_filter()')
+
+    def get_validator_model(self):
+        return self.validator_model or self.get_serializer_class().Meta.model
+
+    def compute_etag(self, request):
+        latest, count = collection_validators(self.get_validator_model(), self.get_validator_filter())
+        raw = '|'.join([
+            request.get_full_path(),
+            getattr(request, 'accepted_media_type', ''),
+            str(getattr(request.user, 'pk', None)),
+            latest.isoformat() if latest else '',
+            str(count),
+        ])
+        return quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+
+    def get(self, request, *args, **kwargs):
+        if 'HTTP_IF_NONE_MATCH' not in request.META:
+            response = super().get(request, *args, **kwargs)
+            if response.status_code == 200:
+                response.add_post_render_callback(self._set_content_etag)
+            return response
+
+        etag = self.compute_etag(request)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            return not_modified
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+        return response
+
+    @staticmethod
+    def _set_content_etag(response):
+        response['ETag'] = quote_etag(hashlib.sha1(response.content).hexdigest())
@@ -0,0 +1,110 @@
+"""
+Helpers for talking to MongoDB natively, next to the djongo ORM.
+
+Everything here goes through the process-wide ``MongoClient`` behind the
+``default`` alias (see ``mongo_backend``), so native queries share its
+connection pool.
+"""
+from bson import ObjectId
+from bson.errors import InvalidId
+from django.db import connections
+from rest_framework.relations import PKOnlyObject
+
+
+def get_database(alias='default'):
+    """Return the pymongo ``Database`` behind a djongo connection."""
+    connection = connections[alias]
+    connection.ensure_connection()
+    return connection.connection
+
+
+def get_collection(model, alias='default'):
+    """Return the pymongo ``Collection`` backing a Django model."""
+    return get_database(alias)[model._meta.db_table]
+
+
+def index_specs(model):
+    """
+    Translate a model's ``Meta.indexes`` into pymongo index specs.
+
+    Returns ``(name, keys, options)`` tuples where ``keys`` is the list of
+    ``(column, direction)`` pairs ``create_index`` expects. Indexes Django
+    cannot describe (text indexes, TTLs, ...) can be declared natively in a
+    ``mongo_indexes`` attribute on the model, in the same tuple format.
+    """
+    specs = []
+    for index in model._meta.indexes:
+        keys = []
+        for field_name, order in index.fields_orders:
+            column = model._meta.get_field(field_name).column
+            keys.append((column, -1 if order == 'DESC' else 1))
+        specs.append((index.name, keys, {}))
+    specs.extend(getattr(model, 'mongo_indexes', ()))
+    return specs
+
+
+def object_id(value):
+    """``value`` as an ``ObjectId`` when it is one, for filters on user FKs."""
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return value
+
+
+class Row(dict):
+    """
+    A document read natively, keyed by field ``attname``. Attribute access
+    is allowed too, so serializer method fields written against model
+    instances work on rows unchanged.
+    """
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+class RowLoader:
+    """
+    Turns raw documents of ``model`` into ``Row``s holding exactly the
+    values the ORM would load: the same backend and field converters run
+    (aware datetimes, decoded JSON fields), foreign keys appear both as
+    ``<name>_id`` and as a pk-only ``<name>``, and ``pk``/``id`` are set.
+
+    ``fields`` limits loading, and the ``projection``, to those field names.
+    """
+
+    def __init__(self, model, fields=None, alias='default'):
+        self.model = model
+        connection = connections[alias]
+        self.fields = []
+        for field in model._meta.concrete_fields:
+            if fields is not None and field.name not in fields and not field.primary_key:
+                continue
+            col = field.get_col(model._meta.db_table)
+            converters = connection.ops.get_db_converters(col) + field.get_db_converters(connection)
+            self.fields.append((field, [(converter, col) for converter in converters]))
+        self.connection = connection
+        self.projection = {field.column: 1 for field, _ in self.fields}
+        self.has_id_property = isinstance(getattr(model, 'id', None), property)
+
+    def __call__(self, doc):
+        row = Row()
+        for field, converters in self.fields:
+            value = doc.get(field.column)
+            for converter, col in converters:
+                value = converter(value, col, self.connection)
+            row[field.attname] = value
+            if field.is_relation:
+                row[field.name] = PKOnlyObject(pk=value) if value is not None else None
+            if field.primary_key:
+                row['pk'] = value
+        if self.has_id_property:
+            row['id'] = self.model.id.fget(row)
+        return row
+
+    def load(self, docs):
+        return [self(doc) for doc in docs]
+
@@ -0,0 +1,43 @@
+"""
+djongo, with one ``MongoClient`` per process shared by every connection.
+
+Django opens a ``DatabaseWrapper`` per thread: request threads, job
+threads, the job poller, the feature store builder. djongo caches their
+client by database name only, and closing any thread's wrapper closes
+that client, and with it the pool, under every other thread. Here the
+client is keyed by its full options and created once; closing a
+connection only drops the thread's reference to it.
+"""
+import threading
+from collections import OrderedDict
+
+from djongo import base
+from pymongo import MongoClient
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def shared_client(options):
+    """The process-wide client for ``options``, created on first use."""
+    key = repr(sorted(options.items()))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = MongoClient(**options, document_class=OrderedDict, connect=False)
+    return client
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_new_connection(self, connection_params):
+        params = dict(connection_params)
+        name = params.pop('name')
+        enforce_schema = params.pop('enforce_schema')
+        self.client_connection = shared_client(params)
+        database = self.client_connection[name]
+        self.djongo_connection = base.DjongoClient(database, enforce_schema)
+        return database
+
+    def _close(self):
+        # The client and its pool belong to the whole process
+        pass
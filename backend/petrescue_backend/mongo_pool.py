@@ -0,0 +1,159 @@
+"""
+MongoDB connection pool tuning, pre-warming and metrics.
+
+Django opens a database connection per thread. The ``mongo_backend``
+engine backs all of them with one ``MongoClient`` per process, so the
+options in ``DATABASES['default']['CLIENT']`` (``maxPoolSize``,
+``minPoolSize``, ...) bound the whole process, not each thread. This
+module is imported by the settings, so it must not touch Django at import
+time.
+
+``pool_metrics`` is registered as a pymongo event listener. It counts
+connections created, closed and checked out per server, and how long
+checkouts wait for a free connection. ``/api/admin/db-pool/`` reports
+the counts. They are keyed by server address only: a process holding
+more than one client (a test database, another alias) reports their
+pools added together under one address. ``warm_pool()`` opens
+connections up front so the first requests of a new worker do not pay
+for TCP and auth handshakes; every thread then draws on them.
+"""
+import importlib.util
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from pymongo import monitoring
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+# Wire compressors and the module each needs; zlib is always available
+COMPRESSOR_MODULES = {'zstd': 'zstandard', 'snappy': 'snappy', 'zlib': 'zlib'}
+
+
+def available_compressors(names):
+    """The comma-separated compressors that can be used in this install, in order."""
+    return [
+        name for name in (n.strip() for n in names.split(','))
+        if name in COMPRESSOR_MODULES and importlib.util.find_spec(COMPRESSOR_MODULES[name])
+    ]
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Per-server connection pool counters fed by pymongo pool events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools = {}
+        # Checkout start times; pymongo emits start and end on the calling thread
+        self._local = threading.local()
+
+    def _pool(self, address):
+        key = '%s:%s' % address
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = {
+                'open': 0, 'checked_out': 0, 'created': 0, 'closed': 0, 'cleared': 0,
+                'checkouts': 0, 'checkout_failures': 0, 'wait_ms_total': 0.0, 'wait_ms_max': 0.0,
+            }
+        return pool
+
+    def _update(self, address, **deltas):
+        with self._lock:
+            pool = self._pool(address)
+            for name, delta in deltas.items():
+                pool[name] += delta
+
+    def _waited_ms(self):
+        started = getattr(self._local, 'started', None)
+        self._local.started = None
+        return (time.perf_counter() - started) * 1000 if started is not None else 0.0
+
+    def pool_created(self, event):
+        with self._lock:
+            self._pool(event.address)
+
+    def pool_cleared(self, event):
+        self._update(event.address, cleared=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._update(event.address, created=1, open=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._update(event.address, closed=1, open=-1)
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        self._waited_ms()
+        self._update(event.address, checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        waited = self._waited_ms()
+        with self._lock:
+            pool = self._pool(event.address)
+            pool['checked_out'] += 1
+            pool['checkouts'] += 1
+            pool['wait_ms_total'] += waited
+            pool['wait_ms_max'] = max(pool['wait_ms_max'], waited)
+
+    def connection_checked_in(self, event):
+        self._update(event.address, checked_out=-1)
+
+    def snapshot(self):
+        """``{"host:port": counters}`` with the mean checkout wait added."""
+        with self._lock:
+            pools = {address: dict(pool) for address, pool in self._pools.items()}
+        for pool in pools.values():
+            pool['wait_ms_avg'] = round(pool['wait_ms_total'] / pool['checkouts'], 3) if pool['checkouts'] else 0.0
+            pool['wait_ms_total'] = round(pool['wait_ms_total'], 3)
+            pool['wait_ms_max'] = round(pool['wait_ms_max'], 3)
+        return pools
+
+
+pool_metrics = PoolMetrics()
+
+
+def warm_pool(connections=None, alias='default'):
+    """
+    Open ``connections`` pooled connections (default: the configured
+    ``minPoolSize``) by running that many concurrent pings. Returns the
+    ping round trip in milliseconds.
+    """
+    from django.conf import settings
+    from .mongo import get_database
+
+    database = get_database(alias)
+    if connections is None:
+        connections = settings.DATABASES[alias].get('CLIENT', {}).get('minPoolSize', 0)
+
+    started = time.perf_counter()
+    database.command('ping')
+    elapsed = (time.perf_counter() - started) * 1000
+    if connections > 1:
+        with ThreadPoolExecutor(max_workers=connections) as pool:
+            list(pool.map(lambda _: database.command('ping'), range(connections)))
+    return elapsed
+
+
+def prewarm():
+    """Warm the pool at worker start per ``MONGO_POOL_PREWARM``; never fatal."""
+    from django.conf import settings
+
+    connections = getattr(settings, 'MONGO_POOL_PREWARM', 0)
+    if connections <= 0:
+        return
+    try:
+        elapsed = warm_pool(connections)
+    except PyMongoError as exc:
+        logger.warning('MongoDB pool pre-warm failed: %s', exc)
+    else:
+        logger.info('MongoDB pool warmed with %d connection(s); ping %.1f ms', connections, elapsed)
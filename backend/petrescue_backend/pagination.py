@@ -0,0 +1,212 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from datetime import datetime
+
+from bson import ObjectId
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetCursorPagination(BasePagination):
+    """
+    Keyset (seek) pagination keyed on ``(created_at, _id)``.
+
+    Pages are fetched with a range filter on the ordering keys plus a LIMIT,
+    never with skip/offset, so every page is an index range scan no matter
+    how deep the client pages. The position is handed out as an opaque
+    ``cursor`` token inside the ``next``/``previous`` links.
+
+    Only views that set ``pagination_class`` to this class are paginated;
+    other list endpoints still return a bare array.
+
+    Views can override the key pair with a ``cursor_ordering`` attribute,
+    e.g. ``('timestamp', '_id')`` for chat messages. The second field must
+    be unique so it can break ties on the first.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = getattr(settings, 'API_PAGE_SIZE', 50)
+    max_page_size = 200
+    ordering = ('-created_at', '-_id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        position, reverse = self._start_page(request, view)
+        order_by = self.ordering if not reverse else [self._flip(f) for f in self.ordering]
+        queryset = queryset.order_by(*order_by)
+        if position is not None:
+            queryset = queryset.filter(self.build_seek_filter(position, reverse))
+        return self._finish_page(list(queryset[:self.page_size + 1]))
+
+    def paginate_documents(self, fetch, request, view=None):
+        """
+        Keyset-paginate a native Mongo read instead of a queryset.
+
+        ``fetch(seek, sort, limit)`` must run the query with ``seek`` ANDed
+        into its filter (``None`` on the first page) and the given pymongo
+        ``sort`` and ``limit``, returning documents. The ordering fields are
+        used as document keys, so they must match the stored column names.
+        """
+        position, reverse = self._start_page(request, view)
+        order = self.ordering if not reverse else [self._flip(f) for f in self.ordering]
+        sort = [(f.lstrip('-'), -1 if f.startswith('-') else 1) for f in order]
+        seek = self.build_seek_document(position, reverse) if position is not None else None
+        return self._finish_page(list(fetch(seek, sort, self.page_size + 1)))
+
+    def _start_page(self, request, view):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(view)
+
+        position, reverse = self.decode_cursor(request)
+        self.has_cursor = position is not None
+        self.reverse = reverse
+        return position, reverse
+
+    def _finish_page(self, results):
+        self.has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, view):
+        ordering = tuple(getattr(view, 'cursor_ordering', None) or self.ordering)
+        assert len(ordering) == 2, (
+            'KeysetCursorPagination expects exactly two ordering fields '
+            '(sort key, unique tiebreaker), got %r.' % (ordering,)
+        )
+        return ordering
+
+    def build_seek_filter(self, position, reverse=False):
+        """
+        Build ``key < v OR (key = v AND tiebreak < id)`` for the current
+        direction. Comparisons flip for ascending fields and for backwards
+        (``previous``) pages.
+        """
+        (key_field, tie_field) = [f.lstrip('-') for f in self.ordering]
+        key_lookup = self._lookup(self.ordering[0], reverse)
+        tie_lookup = self._lookup(self.ordering[1], reverse)
+        key_value, tie_value = position
+        return (
+            Q(**{f'{key_field}__{key_lookup}': key_value})
+            | Q(**{key_field: key_value, f'{tie_field}__{tie_lookup}': tie_value})
+        )
+
+    def build_seek_document(self, position, reverse=False):
+        """Mongo filter equivalent of ``build_seek_filter``."""
+        (key_field, tie_field) = [f.lstrip('-') for f in self.ordering]
+        key_op = '$' + self._lookup(self.ordering[0], reverse)
+        tie_op = '$' + self._lookup(self.ordering[1], reverse)
+        key_value, tie_value = position
+        return {'$or': [
+            {key_field: {key_op: key_value}},
+            {key_field: key_value, tie_field: {tie_op: tie_value}},
+        ]}
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        # Walking backwards we came from a later page, so one always exists.
+        has_next = True if self.reverse else self.has_more
+        if not self.page or not has_next:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        has_previous = self.has_more if self.reverse else self.has_cursor
+        if not self.page or not has_previous:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    # Cursor token helpers -------------------------------------------------
+
+    def encode_cursor(self, item, reverse=False):
+        position = [self._read(item, f.lstrip('-')) for f in self.ordering]
+        payload = {'p': [self._dump_value(v) for v in position]}
+        if reverse:
+            payload['r'] = 1
+        token = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode('ascii')
+        ).decode('ascii').rstrip('=')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            key_value, tie_value = [self._load_value(v) for v in payload['p']]
+            reverse = bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, binascii.Error, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return (key_value, tie_value), reverse
+
+    @staticmethod
+    def _read(item, field):
+        if isinstance(item, dict):
+            return item[field]
+        return getattr(item, field)
+
+    @staticmethod
+    def _dump_value(value):
+        if isinstance(value, datetime):
+            return {'dt': value.isoformat()}
+        if isinstance(value, ObjectId):
+            return str(value)
+        return value
+
+    @staticmethod
+    def _load_value(value):
+        if isinstance(value, dict):
+            parsed = parse_datetime(value['dt'])
+            if parsed is None:
+                raise ValueError('Bad datetime in cursor')
+            return parsed
+        return value
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else '-' + field
+
+    @staticmethod
+    def _lookup(field, reverse):
+        descending = field.startswith('-')
+        if reverse:
+            descending = not descending
+        return 'lt' if descending else 'gt'
@@ -0,0 +1,203 @@
+"""
+In-process publish/subscribe for pushing events to WebSocket clients.
+
+Subscribers are asyncio queues owned by the event loop that created them;
+``publish`` may be called from any thread (sync views, job workers) and
+hands events over with ``call_soon_threadsafe``. Delivery only reaches
+subscribers in the same process.
+
+HTTP is served by WSGI workers and ``/ws/`` by a separate ASGI process, so
+events published by a request or a job usually originate in a process
+with no sockets. With ``PUBSUB_RELAY = True`` every process also appends
+its events to a capped Mongo collection, and the ASGI process tails it and
+delivers the events from other processes to its own subscribers; see
+``configure_relay``.
+"""
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from bson.errors import InvalidDocument
+from django.conf import settings
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+RELAY_COLLECTION = 'pubsub_events'
+
+
+class Subscription:
+    """A bounded event queue for one channel; use as a context manager."""
+
+    def __init__(self, hub, channel, maxsize=256):
+        self.hub = hub
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def deliver(self, event):
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        if self.queue.full():
+            # A client that stopped reading loses its oldest events first
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PubSub:
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        self.relay = None
+
+    def subscribe(self, channel):
+        """Subscribe the running event loop to ``channel``."""
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def publish(self, channel, event):
+        """
+        Fan ``event`` out to every subscriber, and to other processes when
+        relayed; returns how many local subscribers got it.
+        """
+        if self.relay is not None:
+            self.relay.send(channel, event)
+        return self.deliver(channel, event)
+
+    def deliver(self, channel, event):
+        """Fan ``event`` out to this process's subscribers only."""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        delivered = 0
+        for subscription in subscribers:
+            try:
+                subscription.deliver(event)
+                delivered += 1
+            except RuntimeError:
+                # Event loop already closed; the socket is gone
+                self.unsubscribe(subscription)
+        return delivered
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+    def may_reach(self, channel):
+        """Whether publishing to ``channel`` can reach anyone at all."""
+        return self.relay is not None or bool(self.subscriber_count(channel))
+
+
+class MongoRelay:
+    """
+    Carries published events between processes through a capped
+    collection. ``listen()`` starts a daemon thread tailing it, which hands
+    events sent by other processes to ``hub.deliver``.
+    """
+
+    def __init__(self, hub, size):
+        self.hub = hub
+        self.size = size
+        self.origin = uuid.uuid4().hex
+        self._collection = None
+        self._listener = None
+        # _id of the last event read; None before the first one
+        self._last_id = None
+
+    def collection(self):
+        if self._collection is None:
+            from .mongo import get_database
+            database = get_database()
+            try:
+                database.create_collection(RELAY_COLLECTION, capped=True, size=self.size)
+            except CollectionInvalid:
+                pass  # Already created by another process
+            self._collection = database[RELAY_COLLECTION]
+        return self._collection
+
+    def send(self, channel, event):
+        try:
+            self.collection().insert_one({'origin': self.origin, 'channel': channel, 'event': event})
+        except (PyMongoError, InvalidDocument):
+            logger.exception('Unable to relay event on %s', channel)
+
+    def listen(self):
+        if self._listener is None:
+            self._listener = threading.Thread(target=self._tail, name='pubsub-relay', daemon=True)
+            self._listener.start()
+
+    def _tail(self):
+        started = False
+        while True:
+            try:
+                collection = self.collection()
+                if not started:
+                    # Events written before this process started are not replayed
+                    newest = next(collection.find({}, {'_id': 1}).sort('$natural', -1).limit(1), None)
+                    self._last_id = newest and newest['_id']
+                    started = True
+                self._follow(collection)
+            except PyMongoError:
+                logger.exception('Event relay failed')
+            # The cursor dies when the collection is empty or was dropped
+            time.sleep(1)
+
+    def _follow(self, collection):
+        """Deliver the events after ``_last_id`` until the cursor dies."""
+        # Tailable cursors run in insertion order, which no publisher's clock
+        # or _id follows, so skip up to the last event read. If that one was
+        # already overwritten, everything left in the collection is new.
+        last_id = self._last_id
+        skipping = last_id is not None and collection.find_one({'_id': last_id}, {'_id': 1}) is not None
+        cursor = collection.find({}, cursor_type=CursorType.TAILABLE_AWAIT)
+        while cursor.alive:
+            for doc in cursor:
+                if skipping:
+                    skipping = doc['_id'] != last_id
+                    continue
+                self._last_id = doc['_id']
+                if doc['origin'] != self.origin:
+                    self.hub.deliver(doc['channel'], doc['event'])
+
+
+pubsub = PubSub()
+
+
+def configure_relay(listen=False):
+    """
+    Attach a ``MongoRelay`` to ``pubsub`` when ``PUBSUB_RELAY`` is on.
+    Every process that publishes calls this at startup; the process serving
+    ``/ws/`` passes ``listen=True``.
+    """
+    if not getattr(settings, 'PUBSUB_RELAY', False):
+        return
+    if pubsub.relay is None:
+        pubsub.relay = MongoRelay(pubsub, getattr(settings, 'PUBSUB_RELAY_BYTES', 16 * 1024 * 1024))
+    if listen:
+        pubsub.relay.listen()
@@ -0,0 +1,120 @@
+"""
+Whole-response caching for public, user-independent GET endpoints.
+
+Views opt in with ``CachedResponseMixin`` and name the data they render
+through ``get_cache_tags()``, e.g. ``['pets']`` for the pet list or
+``['pet:<id>']`` for one pet's detail page. A rendered 200 response is
+stored in the ``responses`` cache under a key made of the request path,
+the sorted query parameters, the renderer and the current version of
+each tag. Model signals call ``invalidate(*tags)`` to bump those
+versions, so every response built from older data stops being reachable
+at once. The entries themselves are left for the cache's LRU eviction
+or ``RESPONSE_CACHE_TIMEOUT``, whichever comes first.
+
+Cached responses carry an ``ETag`` (a hash of the body) and a
+``Last-Modified`` (when it was rendered), and matching ``If-None-Match``
+or ``If-Modified-Since`` requests get a bodiless 304.
+
+The ``responses`` cache is a process-local LocMemCache by default, so an
+invalidation only reaches the process that made the write and other
+workers may serve a stale page until the timeout. Point
+``RESPONSE_CACHE_BACKEND`` at a shared backend (memcached, Redis) to
+invalidate everywhere at once.
+"""
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+CACHE_ALIAS = 'responses'
+VERSION_PREFIX = 'responses:version:'
+ENTRY_PREFIX = 'responses:entry:'
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def _versions(cache, tags):
+    keys = [VERSION_PREFIX + tag for tag in tags]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Never restart from a fixed number: a version evicted and
+            # recreated must not match entries stored under the old one
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return [str(versions[key]) for key in keys]
+
+
+def tag_versions(tags):
+    """Current version strings of ``tags``; any invalidation changes them."""
+    return _versions(get_cache(), tags)
+
+
+def invalidate(*tags):
+    """Make every cached response built from ``tags`` unreachable."""
+    cache = get_cache()
+    for tag in tags:
+        key = VERSION_PREFIX + tag
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def cache_key(request, tags):
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    renderer = getattr(request, 'accepted_media_type', '')
+    versions = tag_versions(tags)
+    raw = '\n'.join([request.path, query, renderer] + versions)
+    return ENTRY_PREFIX + hashlib.sha1(raw.encode()).hexdigest()
+
+
+def build_response(entry):
+    response = HttpResponse(entry['content'], content_type=entry['content_type'])
+    response['ETag'] = entry['etag']
+    response['Last-Modified'] = http_date(entry['last_modified'])
+    return response
+
+
+class CachedResponseMixin:
+    """Serve GET responses from the response cache; see module docstring."""
+
+    def get_cache_tags(self):
+        raise NotImplementedError('Views using CachedResponseMixin must define get_cache_tags()')
+
+    def get(self, request, *args, **kwargs):
+        self._response_cache_key = cache_key(request, self.get_cache_tags())
+        entry = get_cache().get(self._response_cache_key)
+        if entry is None:
+            return super().get(request, *args, **kwargs)
+        self._response_cache_key = None
+        response = build_response(entry)
+        return get_conditional_response(
+            request, etag=entry['etag'], last_modified=entry['last_modified'], response=response,
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, '_response_cache_key', None)
+        if key is None or response.status_code != 200:
+            return response
+
+        response.render()
+        entry = {
+            'content': response.content,
+            'content_type': response['Content-Type'],
+            'etag': quote_etag(hashlib.md5(response.content).hexdigest()),
+            'last_modified': int(time.time()),
+        }
+        get_cache().set(key, entry)
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(entry['last_modified'])
+        return get_conditional_response(
+            request, etag=entry['etag'], last_modified=entry['last_modified'], response=response,
+        )
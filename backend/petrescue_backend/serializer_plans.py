@@ -0,0 +1,250 @@
+"""
+Precompiled list serialization for the busiest read serializers.
+
+For every row, DRF resolves every field again. ``get_attribute`` walks
+the field's source and handles ``SkipField`` and ``PKOnlyObject``. Each
+field runs through ``to_representation``, and every nested serializer
+builds its own ``OrderedDict``. ``plan_for(serializer_class)`` does the
+resolution once per class. It returns a ``SerializerPlan``, a flat list
+of ``(output name, row key, converter)`` steps. Running the steps over a
+row gives the same values in the same order as
+``serializer.to_representation``, so the rendered JSON is byte-identical.
+
+A row can be any of:
+
+* a model instance;
+* a dict keyed by field ``attname``, with each embedded relation's row
+  stored under the field name. The native repositories' ``Row``s have
+  this shape, and so do ``.values()`` rows loaded with
+  ``SerializerPlan.rows()``, which fetches each embedded relation with
+  one more ``.values()`` query.
+
+Serializers opt in with ``list_serializer_class = PlannedListSerializer``,
+so ``many=True`` goes through the plan. List views whose queryset feeds
+such a serializer can add ``PlannedListMixin`` to page over ``.values()``
+rows instead of model instances. ``FAST_SERIALIZATION = False`` turns
+both back into plain DRF.
+
+Plans are compiled from a serializer built without context. Method
+fields must therefore not read ``self.context``, and hyperlinked or
+many-valued fields are refused. A row missing one of the plan's keys is
+handed to DRF as a whole, which applies its usual skip and default rules.
+"""
+from collections.abc import Mapping
+from datetime import datetime
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .mongo import Row
+from .pagination import KeysetCursorPagination
+
+# Fields whose to_representation is a plain type conversion
+CONVERSIONS = {
+    serializers.CharField.to_representation: str,
+    serializers.IntegerField.to_representation: int,
+}
+
+_plans = {}
+
+
+def plan_for(serializer_class):
+    """The compiled plan of ``serializer_class``, built on first use."""
+    plan = _plans.get(serializer_class)
+    if plan is None:
+        plan = _plans[serializer_class] = SerializerPlan(serializer_class)
+    return plan
+
+
+def _current_timezone():
+    # What DateTimeField.default_timezone() returns
+    return timezone.get_current_timezone() if settings.USE_TZ else None
+
+
+class _DateTimeStep:
+    """
+    A ``DateTimeField`` step. DRF looks the active timezone up for every
+    value; ``bind(tz)`` takes it once per list and renders aware ISO 8601
+    values directly, leaving every other case to the field.
+    """
+
+    def __init__(self, field):
+        self.field = field
+
+    def bind(self, tz):
+        field = self.field
+        tz = field.timezone if hasattr(field, 'timezone') else tz
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        if tz is None or output_format is None or output_format.lower() != ISO_8601:
+            return field.to_representation
+
+        def convert(value):
+            if isinstance(value, datetime) and value.utcoffset() is not None:
+                try:
+                    value = value.astimezone(tz).isoformat()
+                except OverflowError:
+                    return field.to_representation(value)
+                return value[:-6] + 'Z' if value.endswith('+00:00') else value
+            return field.to_representation(value)
+        return convert
+
+
+def _converter(field):
+    field_class = type(field)
+    to_representation = field_class.to_representation
+    if to_representation in CONVERSIONS:
+        return CONVERSIONS[to_representation]
+    if to_representation is serializers.JSONField.to_representation and not field.binary:
+        return None
+    if (to_representation is serializers.DateTimeField.to_representation
+            and field_class.enforce_timezone is serializers.DateTimeField.enforce_timezone):
+        return _DateTimeStep(field)
+    return field.to_representation
+
+
+class SerializerPlan:
+    """The compiled field steps of one serializer class; see module docstring."""
+
+    def __init__(self, serializer_class):
+        self.serializer = serializer_class()
+        self.model = serializer_class.Meta.model
+        self.pk = self.model._meta.pk.attname
+        self.needs_row = False
+        # (row key, foreign key attname, plan) for each embedded relation
+        self.relations = []
+        # Steps bound to a timezone, keyed by it; see representer()
+        self._representers = {}
+        self.steps = [
+            self._compile(name, field)
+            for name, field in self.serializer.fields.items() if not field.write_only
+        ]
+
+        relation_keys = {key for key, _, _ in self.relations}
+        if self.needs_row:
+            # Method fields may read anything on the row
+            columns = [field.attname for field in self.model._meta.concrete_fields]
+        else:
+            columns = [key for _, key, _ in self.steps if key not in relation_keys]
+        columns += [attname for _, attname, _ in self.relations]
+        self.columns = list(dict.fromkeys([self.pk] + columns))
+
+    def _compile(self, name, field):
+        label = f'{type(self.serializer).__name__}.{name}'
+        if isinstance(field, serializers.SerializerMethodField):
+            self.needs_row = True
+            return name, None, getattr(self.serializer, field.method_name)
+        if len(field.source_attrs) != 1:
+            raise ImproperlyConfigured(f'{label}: only single-attribute sources can be planned')
+        source = field.source_attrs[0]
+
+        if isinstance(field, serializers.ListSerializer):
+            raise ImproperlyConfigured(f'{label}: many=True fields cannot be planned')
+        if isinstance(field, serializers.BaseSerializer):
+            plan = plan_for(type(field))
+            self.relations.append((source, self.model._meta.get_field(source).attname, plan))
+            return name, source, plan
+        if isinstance(field, serializers.RelatedField):
+            if not isinstance(field, serializers.PrimaryKeyRelatedField) or field.pk_field is not None:
+                raise ImproperlyConfigured(f'{label}: only plain primary key relations can be planned')
+            # Rendered as the raw foreign key, which rows hold under the attname
+            return name, self.model._meta.get_field(source).attname, None
+        return name, source, _converter(field)
+
+    def representer(self, tz):
+        """The ``obj -> dict`` function rendering datetimes in ``tz``."""
+        represent = self._representers.get(tz)
+        if represent is None:
+            represent = self._representers[tz] = self._bind(tz)
+        return represent
+
+    def _bind(self, tz):
+        steps = []
+        for name, key, convert in self.steps:
+            if isinstance(convert, _DateTimeStep):
+                convert = convert.bind(tz)
+            elif isinstance(convert, SerializerPlan):
+                convert = convert.representer(tz)
+            steps.append((name, key, convert))
+        needs_row = self.needs_row
+        fallback = self.serializer.to_representation
+
+        def represent(obj):
+            if isinstance(obj, Mapping):
+                if needs_row and not isinstance(obj, Row):
+                    obj = Row(obj)
+                get = obj.__getitem__
+            else:
+                get = obj.__getattribute__
+
+            data = {}
+            try:
+                for name, key, convert in steps:
+                    value = obj if key is None else get(key)
+                    data[name] = value if value is None or convert is None else convert(value)
+            except (KeyError, AttributeError):
+                return fallback(obj)
+            return data
+        return represent
+
+    def to_representation(self, obj):
+        return self.representer(_current_timezone())(obj)
+
+    def represent_many(self, rows):
+        represent = self.representer(_current_timezone())
+        return [represent(row) for row in rows]
+
+    def values(self, queryset, *extra):
+        """``queryset`` as a lazy ``.values()`` of the plan's columns and ``extra``."""
+        columns = list(dict.fromkeys(self.columns + list(extra)))
+        return queryset.prefetch_related(None).values(*columns)
+
+    def load(self, rows):
+        """Embed each relation's rows in ``.values()`` rows, one query per relation."""
+        rows = list(rows)
+        for key, attname, plan in self.relations:
+            ids = {row[attname] for row in rows} - {None}
+            related = {}
+            if ids:
+                manager = plan.model._default_manager
+                related = {row[plan.pk]: row for row in plan.rows(manager.filter(pk__in=ids))}
+            for row in rows:
+                row[key] = related.get(row[attname])
+        return rows
+
+    def rows(self, queryset):
+        return self.load(self.values(queryset))
+
+
+class PlannedListSerializer(serializers.ListSerializer):
+    """``many=True`` through the child class's compiled plan."""
+
+    def to_representation(self, data):
+        if not settings.FAST_SERIALIZATION:
+            return super().to_representation(data)
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        return plan_for(type(self.child)).represent_many(iterable)
+
+
+class PlannedListMixin:
+    """
+    ``ListAPIView.list`` over ``.values()`` rows of the serializer's plan,
+    so no model instances are built for the page or its relations.
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_SERIALIZATION:
+            return super().list(request, *args, **kwargs)
+        plan = plan_for(self.get_serializer_class())
+        # The keyset paginator reads its cursor position from the rows
+        ordering = self.paginator.get_ordering(self) if isinstance(self.paginator, KeysetCursorPagination) else ()
+        queryset = plan.values(self.filter_queryset(self.get_queryset()), *(f.lstrip('-') for f in ordering))
+
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(plan.represent_many(plan.load(queryset)))
+        return self.get_paginated_response(plan.represent_many(plan.load(page)))
@@ -3,6 +3,8 @@ import os
 from datetime import timedelta
 from dotenv import load_dotenv
 
+from petrescue_backend.mongo_pool import available_compressors, pool_metrics
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 # Load environment variables from .env file
@@ -31,21 +33,43 @@ INSTALLED_APPS = [
     'apps.rescues',
     'apps.chat',  # Added chat app
     'apps.admin_panel',
+    'apps.jobs',
 ]
 
 
 # MongoDB Database Configuration using djongo
 DATABASES = {
     'default': {
-        'ENGINE': 'djongo',
+        # djongo with one MongoClient per process (petrescue_backend/mongo_backend)
+        'ENGINE': 'petrescue_backend.mongo_backend',
         'NAME': os.getenv('MONGO_DB_NAME', 'petrescue'),
         'ENFORCE_SCHEMA': False,
+        # Keep each thread's connection; reopening it per request would
+        # rebuild djongo's collection name cache
+        'CONN_MAX_AGE': None,
+        # MongoClient options (petrescue_backend/mongo_pool.py)
         'CLIENT': {
             'host': os.getenv('MONGO_URI', 'mongodb://localhost:27017/petrescue'),
+            'appname': 'petrescue-backend',
+            # Pool bounds for the whole process, shared by all its threads
+            'maxPoolSize': int(os.getenv('MONGO_MAX_POOL_SIZE', 50)),
+            'minPoolSize': int(os.getenv('MONGO_MIN_POOL_SIZE', 5)),
+            'maxIdleTimeMS': int(os.getenv('MONGO_MAX_IDLE_TIME_MS', 300000)),
+            'waitQueueTimeoutMS': int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000)),
+            'serverSelectionTimeoutMS': int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000)),
+            'connectTimeoutMS': int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 5000)),
+            'socketTimeoutMS': int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', 30000)),
+            'compressors': available_compressors(os.getenv('MONGO_COMPRESSORS', 'zstd,snappy,zlib')),
+            'retryWrites': True,
+            'retryReads': True,
+            'event_listeners': [pool_metrics],
         },
     }
 }
 
+# Connections opened when a worker starts (asgi.py / wsgi.py); 0 disables
+MONGO_POOL_PREWARM = int(os.getenv('MONGO_POOL_PREWARM', DATABASES['default']['CLIENT']['minPoolSize']))
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
     'http://localhost:3000',
@@ -54,6 +78,22 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Password hashing (apps/users/hashers.py). New hashes use PASSWORD_HASHER;
+# the rest only verify older hashes, which are upgraded on the next login.
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'argon2')
+PASSWORD_ARGON2_TIME_COST = int(os.getenv('PASSWORD_ARGON2_TIME_COST', 2))
+PASSWORD_ARGON2_MEMORY_KIB = int(os.getenv('PASSWORD_ARGON2_MEMORY_KIB', 19 * 1024))
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv('PASSWORD_ARGON2_PARALLELISM', 1))
+PASSWORD_BCRYPT_ROUNDS = int(os.getenv('PASSWORD_BCRYPT_ROUNDS', 10))
+_PASSWORD_HASHERS = {
+    'argon2': 'apps.users.hashers.TunedArgon2PasswordHasher',
+    'bcrypt': 'apps.users.hashers.TunedBCryptSHA256PasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+]
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -127,6 +167,11 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
+# Decoded image size limits for pet and report uploads (apps/pets/media.py)
+IMAGE_UPLOAD_MAX_BYTES = int(os.getenv('IMAGE_UPLOAD_MAX_BYTES', 5242880))
+IMAGE_UPLOAD_MAX_REQUEST_BYTES = int(os.getenv('IMAGE_UPLOAD_MAX_REQUEST_BYTES', 20971520))
+# Unreferenced content-addressed media is deleted after this long
+MEDIA_GC_GRACE_SECONDS = int(os.getenv('MEDIA_GC_GRACE_SECONDS', 3600))
 
 # Logging configuration for debugging
 LOGGING = {
@@ -151,13 +196,28 @@ LOGGING = {
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.users.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # Token buckets on the auth endpoints (apps/users/throttling.py):
+    # 'N/period' is a burst of N refilled evenly over the period
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': os.getenv('THROTTLE_LOGIN_IP', '20/min'),
+        'login_email': os.getenv('THROTTLE_LOGIN_EMAIL', '5/min'),
+        'signup_ip': os.getenv('THROTTLE_SIGNUP_IP', '10/hour'),
+        'signup_email': os.getenv('THROTTLE_SIGNUP_EMAIL', '3/hour'),
+    },
+    # Proxies in front of the app that append to X-Forwarded-For. Only set
+    # this (to 1 behind nginx) when clients cannot reach the app directly,
+    # or they can forge the header and dodge the IP throttles
+    'NUM_PROXIES': int(os.getenv('API_NUM_PROXIES', 0)),
 }
 
+# Where throttle buckets live: 'local' (per process) or 'mongo' (shared)
+AUTH_THROTTLE_STORE = os.getenv('AUTH_THROTTLE_STORE', 'local')
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=int(os.getenv('SIMPLE_JWT_ACCESS_LIFETIME_HOURS', 24))),  # 24 hours for development
     'REFRESH_TOKEN_LIFETIME': timedelta(days=int(os.getenv('SIMPLE_JWT_REFRESH_LIFETIME_DAYS', 7))),
@@ -170,6 +230,76 @@ SIMPLE_JWT = {
 
 AUTH_USER_MODEL = 'users.User'
 
+# Default page of the keyset-paginated lists (petrescue_backend/pagination.py)
+API_PAGE_SIZE = int(os.getenv('API_PAGE_SIZE', 50))
+
+# How long a search's match count and facets are reused by its later pages
+PET_SEARCH_SUMMARY_TIMEOUT = int(os.getenv('PET_SEARCH_SUMMARY_TIMEOUT', 300))
+
+# Upper bound on how stale the cached admin recipient ids may get in a
+# process that did not see the role change (apps/notifications/utils.py)
+ADMIN_RECIPIENTS_CACHE_TIMEOUT = int(os.getenv('ADMIN_RECIPIENTS_CACHE_TIMEOUT', 300))
+
+# Serve the hottest reads (pet list/detail, notifications, chat history)
+# with native PyMongo queries instead of djongo's SQL translation
+MONGO_NATIVE_READS = os.getenv('MONGO_NATIVE_READS', 'True') == 'True'
+
+# Serialize hot lists through precompiled field plans over .values() rows
+# (petrescue_backend/serializer_plans.py) instead of per-field DRF calls
+FAST_SERIALIZATION = os.getenv('FAST_SERIALIZATION', 'True') == 'True'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Rendered public GET responses (petrescue_backend/response_cache.py).
+    # LocMemCache evicts least recently used entries past MAX_ENTRIES; set
+    # RESPONSE_CACHE_BACKEND/LOCATION to share it between processes.
+    'responses': {
+        'BACKEND': os.getenv('RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('RESPONSE_CACHE_LOCATION', 'responses'),
+        'TIMEOUT': int(os.getenv('RESPONSE_CACHE_TIMEOUT', 300)),
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 2000))},
+    },
+    # Unread notification counters (apps/notifications/counters.py). Each
+    # LocMemCache only sees its own process's writes, hence the short
+    # timeout; set COUNTER_CACHE_BACKEND/LOCATION to share them instead.
+    'counters': {
+        'BACKEND': os.getenv('COUNTER_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('COUNTER_CACHE_LOCATION', 'counters'),
+        'TIMEOUT': int(os.getenv('NOTIFICATION_UNREAD_COUNTER_TIMEOUT', 60)),
+    },
+}
+
+# Request authentication (apps/users/authentication.py): LRU user cache and
+# optional trust in token claims instead of a user lookup
+AUTH_USER_CACHE_SIZE = int(os.getenv('AUTH_USER_CACHE_SIZE', 1024))
+AUTH_USER_CACHE_TTL = int(os.getenv('AUTH_USER_CACHE_TTL', 300))
+JWT_STATELESS_AUTH = os.getenv('JWT_STATELESS_AUTH', 'False') == 'True'
+
+# Background jobs (apps/jobs): 'thread' runs them in-process, 'worker' leaves
+# them to `manage.py run_jobs`, 'inline' runs them synchronously
+JOBS_MODE = os.getenv('JOBS_MODE', 'thread')
+JOBS_THREADS = int(os.getenv('JOBS_THREADS', 4))
+JOBS_MAX_ATTEMPTS = int(os.getenv('JOBS_MAX_ATTEMPTS', 5))
+JOBS_RETRY_BASE_SECONDS = int(os.getenv('JOBS_RETRY_BASE_SECONDS', 10))
+
+# Relay WebSocket push events from the WSGI workers and job runners to the
+# ASGI process serving /ws/ through a capped collection (petrescue_backend/pubsub.py)
+PUBSUB_RELAY = os.getenv('PUBSUB_RELAY', 'False') == 'True'
+PUBSUB_RELAY_BYTES = int(os.getenv('PUBSUB_RELAY_BYTES', 16 * 1024 * 1024))
+
+# Notification retention (apps/notifications/retention.py)
+NOTIFICATION_READ_RETENTION_DAYS = int(os.getenv('NOTIFICATION_READ_RETENTION_DAYS', 30))
+NOTIFICATION_UNREAD_RETENTION_DAYS = int(os.getenv('NOTIFICATION_UNREAD_RETENTION_DAYS', 90))
+NOTIFICATION_ARCHIVE_DIR = os.getenv('NOTIFICATION_ARCHIVE_DIR', str(BASE_DIR / 'archive' / 'notifications'))
+
+# Match engine feature store: build at startup and cross-worker catch-up interval
+MATCH_FEATURE_STORE_WARM = os.getenv('MATCH_FEATURE_STORE_WARM', 'False') == 'True'
+MATCH_FEATURE_STORE_SYNC_SECONDS = int(os.getenv('MATCH_FEATURE_STORE_SYNC_SECONDS', 60))
+# How often that catch-up also evicts pets deleted in other processes
+MATCH_FEATURE_STORE_RECONCILE_SECONDS = int(os.getenv('MATCH_FEATURE_STORE_RECONCILE_SECONDS', 600))
+
 # Authentication backends - Use email for authentication
 AUTHENTICATION_BACKENDS = [
     'apps.users.backends.EmailBackend',
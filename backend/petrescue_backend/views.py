@@ -0,0 +1,16 @@
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
+from django.conf import settings
+
+# Content-addressed files (apps/pets/media.py) never change under a URL
+IMMUTABLE_MEDIA_PREFIX = 'cas/'
+
+
+def serve_media(request, path):
+    """Development media server with the cache headers nginx sends."""
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if path.startswith(IMMUTABLE_MEDIA_PREFIX):
+        patch_cache_control(response, public=True, max_age=31536000, immutable=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
@@ -0,0 +1,138 @@
+"""
+Minimal ASGI WebSocket support alongside Django's HTTP application.
+
+``WebSocketRouter`` maps path regexes to ``async def handler(socket)``
+coroutines; named groups end up in ``socket.kwargs``. Clients
+authenticate with the same JWT access token the REST API uses, passed as
+a ``token`` query parameter since browsers cannot set headers on
+WebSocket handshakes.
+"""
+import asyncio
+import json
+import re
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from rest_framework.renderers import JSONRenderer
+
+# Close codes in the application range (4000-4999)
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_FORBIDDEN = 4403
+CLOSE_NOT_FOUND = 4404
+
+
+class WebSocketDisconnect(Exception):
+    pass
+
+
+class WebSocket:
+    def __init__(self, scope, receive, send, kwargs=None):
+        self.scope = scope
+        self.kwargs = kwargs or {}
+        self.query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        self.user = None
+        self._receive = receive
+        self._send = send
+        self._connected = False
+
+    async def _handshake(self):
+        if not self._connected:
+            message = await self._receive()
+            if message['type'] != 'websocket.connect':
+                raise WebSocketDisconnect(message.get('code'))
+            self._connected = True
+
+    async def accept(self):
+        await self._handshake()
+        await self._send({'type': 'websocket.accept'})
+
+    async def close(self, code=1000):
+        await self._handshake()
+        await self._send({'type': 'websocket.close', 'code': code})
+
+    async def send_json(self, data):
+        # DRF's renderer knows how to encode serializer output
+        await self._send({'type': 'websocket.send', 'text': JSONRenderer().render(data).decode('utf-8')})
+
+    async def receive_json(self):
+        """Return the next JSON object from the client, skipping bad frames."""
+        while True:
+            message = await self._receive()
+            if message['type'] == 'websocket.disconnect':
+                raise WebSocketDisconnect(message.get('code'))
+            if message['type'] != 'websocket.receive':
+                continue
+            text = message.get('text')
+            if text is None:
+                text = (message.get('bytes') or b'').decode('utf-8', 'replace')
+            try:
+                data = json.loads(text)
+            except ValueError:
+                data = None
+            if isinstance(data, dict):
+                return data
+            await self.send_json({'type': 'error', 'detail': 'Expected a JSON object.'})
+
+    def query_param(self, name):
+        values = self.query.get(name)
+        return values[0] if values else None
+
+
+def _user_for_token(raw_token):
+    from apps.users.authentication import CachedJWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+
+    authentication = CachedJWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+async def authenticate(socket):
+    """Resolve ``socket.user`` from its ``token`` query parameter."""
+    token = socket.query_param('token')
+    socket.user = await sync_to_async(_user_for_token)(token) if token else None
+    return socket.user
+
+
+async def pump(socket, subscription, handle=None):
+    """
+    Forward pub/sub events to the client while feeding its frames to
+    ``async handle(data)``, until either side stops.
+    """
+    async def forward():
+        while True:
+            await socket.send_json(await subscription.get())
+
+    async def receive():
+        while True:
+            data = await socket.receive_json()
+            if handle is not None:
+                await handle(data)
+
+    tasks = [asyncio.ensure_future(receive()), asyncio.ensure_future(forward())]
+    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    for task in pending:
+        task.cancel()
+    for task in done:
+        if task.exception() and not isinstance(task.exception(), WebSocketDisconnect):
+            raise task.exception()
+
+
+class WebSocketRouter:
+    def __init__(self, routes):
+        self.routes = [(re.compile(pattern), handler) for pattern, handler in routes]
+
+    async def __call__(self, scope, receive, send):
+        path = scope['path']
+        for pattern, handler in self.routes:
+            match = pattern.fullmatch(path)
+            if match:
+                socket = WebSocket(scope, receive, send, match.groupdict())
+                try:
+                    await handler(socket)
+                except WebSocketDisconnect:
+                    pass
+                return
+        await WebSocket(scope, receive, send).close(CLOSE_NOT_FOUND)
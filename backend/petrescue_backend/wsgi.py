@@ -13,4 +13,12 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'petrescue_backend.settings')
 
-application = get_wsgi_application()
\ No newline at end of file
+application = get_wsgi_application()
+
+# Each worker imports this module; open its Mongo connections up front
+from petrescue_backend.mongo_pool import prewarm  # noqa: E402
+from petrescue_backend.pubsub import configure_relay  # noqa: E402
+
+prewarm()
+# WebSockets are served by the ASGI process; relay pushes there
+configure_relay()
\ No newline at end of file
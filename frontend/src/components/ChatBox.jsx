@@ -58,7 +58,8 @@ const ChatBox = ({ currentUser }) => {
             const res = await axios.get(`${API_URL}/chat/history/${userId}/`, {
                 headers: { Authorization: `Bearer ${token}` },
             });
-            setMessages(res.data);
+            // Newest page of the conversation, oldest message first
+            setMessages(res.data.results);
         } catch (err) {
             console.error(err);
         }
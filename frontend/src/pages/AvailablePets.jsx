@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import axios from 'axios';
 import PetCard from '../components/pets/PetCard';
+import { fetchAllPages } from '../services/pagination';
 
 const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000/api';
 
@@ -14,8 +15,7 @@ const AvailablePets = () => {
       setLoading(true);
       setError('');
       try {
-        const res = await axios.get(`${API_URL}/pets/`);
-        const data = Array.isArray(res.data) ? res.data : [];
+        const data = await fetchAllPages(axios, `${API_URL}/pets/`);
         const filtered = data.filter(
           (pet) => pet.is_approved && pet.status === 'available'
         );
@@ -1,6 +1,7 @@
 import React, { useState, useEffect } from 'react';
 import axios from 'axios';
 import PetCard from '../components/pets/PetCard';
+import { fetchAllPages } from '../services/pagination';
 import apiClient from '../api/apiClient';
 import { useAuth } from '../contexts/AuthContext';
 
@@ -29,9 +30,7 @@ const SearchPets = () => {
 
     try {
       // ✅ IMPORTANT: NO query params here
-      const response = await axios.get(`${API_URL}/pets/`);
-
-      const data = Array.isArray(response.data) ? response.data : [];
+      const data = await fetchAllPages(axios, `${API_URL}/pets/`);
 
       // ✅ FRONTEND FILTERING (SAFE)
       const filtered = data.filter((pet) => {
@@ -1,6 +1,7 @@
 import React, { useEffect, useMemo, useState } from 'react';
 import { useAuth } from '../../contexts/AuthContext';
 import api from '../../services/api';
+import { fetchAllPages } from '../../services/pagination';
 
 const AdminAdoptions = () => {
   const { user } = useAuth();
@@ -15,8 +16,7 @@ const AdminAdoptions = () => {
         return;
       }
       try {
-        const res = await api.get('/admin/adoptions/');
-        setRequests(Array.isArray(res.data) ? res.data : []);
+        setRequests(await fetchAllPages(api, '/admin/adoptions/'));
       } catch (e) {
         console.error('Failed to load adoptions', e);
       } finally {
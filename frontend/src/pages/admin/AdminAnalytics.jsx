@@ -1,6 +1,7 @@
 import React, { useEffect, useState, useMemo } from 'react';
 import { useAuth } from '../../contexts/AuthContext';
 import api from '../../services/api';
+import { fetchAllPages } from '../../services/pagination';
 
 const AdminAnalytics = () => {
   const { user } = useAuth();
@@ -25,14 +26,14 @@ const AdminAnalytics = () => {
          const [usersRes, reportsRes, petsRes, adoptionsRes] = await Promise.all([
            api.get('/users/users/'),
            api.get('/admin/reports/'),
-           api.get('/pets/'),
-           api.get('/admin/adoptions/'),
+           fetchAllPages(api, '/pets/'),
+           fetchAllPages(api, '/admin/adoptions/'),
          ]);
 
         setUsers(Array.isArray(usersRes.data) ? usersRes.data : []);
         setReports(Array.isArray(reportsRes.data) ? reportsRes.data : []);
-        setPets(Array.isArray(petsRes.data) ? petsRes.data : []);
-         setAdoptions(Array.isArray(adoptionsRes.data) ? adoptionsRes.data : []);
+        setPets(petsRes);
+         setAdoptions(adoptionsRes);
       } catch (err) {
         console.error('Analytics fetch failed', err);
       } finally {
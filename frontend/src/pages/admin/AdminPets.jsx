@@ -1,6 +1,7 @@
 import React, { useEffect, useMemo, useState } from 'react';
 import { useAuth } from '../../contexts/AuthContext';
 import api from '../../services/api';
+import { fetchAllPages } from '../../services/pagination';
 
 const AdminPets = () => {
   const { user } = useAuth();
@@ -16,8 +17,7 @@ const AdminPets = () => {
         return;
       }
       try {
-        const res = await api.get('/admin/pets/');
-        setPets(Array.isArray(res.data) ? res.data : []);
+        setPets(await fetchAllPages(api, '/admin/pets/'));
       } catch (e) {
         console.error('Failed to load pets', e);
       } finally {
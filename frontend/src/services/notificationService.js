@@ -1,9 +1,11 @@
 import apiClient from '../api/apiClient';
+import { pageResults } from './pagination';
 
 const notificationService = {
   getNotifications: async () => {
+    // Newest page only; older notifications are behind `next`
     const response = await apiClient.get('/notifications/');
-    return response.data;
+    return pageResults(response.data);
   },
 
   markAsRead: async (id) => {
@@ -0,0 +1,16 @@
+// Paginated list endpoints return one keyset page at a time:
+// { next, previous, results } (search adds count and facets).
+
+// Results of a single page; bare-array responses pass through unchanged.
+export const pageResults = (data) => (Array.isArray(data) ? data : data?.results || []);
+
+// Every result of a paginated list, following `next` to the last page.
+export const fetchAllPages = async (client, url, config) => {
+  let { data } = await client.get(url, config);
+  const results = [...pageResults(data)];
+  while (data && !Array.isArray(data) && data.next) {
+    ({ data } = await client.get(data.next, config));
+    results.push(...pageResults(data));
+  }
+  return results;
+};
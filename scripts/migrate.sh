@@ -6,6 +6,14 @@ cd backend
 # Run migrations
 python manage.py migrate
 
+# Stop if users still need merging by email: the unique email index below
+# cannot be built until an operator has run `manage.py dedupe_users`, which
+# merges accounts irreversibly
+python manage.py dedupe_users --check || exit 1
+
+# Create MongoDB indexes declared on the models
+python manage.py ensure_indexes
+
 # Collect static files
 python manage.py collectstatic --noinput
 